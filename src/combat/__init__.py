@@ -0,0 +1 @@
+"""Combat (战斗) related features (HUD detection / state)."""
@@ -0,0 +1,78 @@
+"""Row-profile presence test for the skill bar outline (replaces the 4x upscale + contour search)."""
+
+from __future__ import annotations
+
+import threading
+import zlib
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# 1080p 下技能 HUD 裁剪图的高度, 更高分辨率先按面积缩小到这个高度再比较, 保证各分辨率结果一致
+_BASE_HEIGHT = 22
+
+
+def longest_row_runs(mask: np.ndarray) -> np.ndarray:
+    """每一行中连续 True 的最长长度, 全部向量化计算。"""
+    rows, width = mask.shape
+    if width == 0:
+        return np.zeros(rows, dtype=np.intp)
+    idx = np.arange(width)
+    last_false = np.maximum.accumulate(np.where(mask, -1, idx), axis=1)
+    return (idx - last_false).max(axis=1)
+
+
+def has_bar_outline(hud: np.ndarray, min_width_ratio: float = 0.25, edge_threshold: int = 30,
+                    min_rows: int = 2) -> bool:
+    """
+    在 1080p 尺度下用行投影判断技能条边框是否存在:
+    灰度图先按面积缩小到 1080p 的裁剪高度, 再做相邻行差分, 统计每一行上连续边缘像素的最长长度,
+    至少 min_rows 行超过裁剪宽度的 min_width_ratio (即存在上下两条足够长的水平边) 则认为有矩形边框。
+    与旧版 has_rectangles 的判断条件 (外轮廓宽度 > 25% 且有一定高度) 对应, 单独一条水平分界线不算。
+    不先缩小的话, 高分辨率下一条分界线会被插值拉宽成相邻两行, 被误判为边框。
+    """
+    if hud is None or hud.size == 0:
+        return False
+    gray = cv2.cvtColor(np.ascontiguousarray(hud[..., :3]), cv2.COLOR_BGR2GRAY)
+    if gray.shape[0] > _BASE_HEIGHT:
+        width = max(1, round(gray.shape[1] * _BASE_HEIGHT / gray.shape[0]))
+        gray = cv2.resize(gray, (width, _BASE_HEIGHT), interpolation=cv2.INTER_AREA)
+    if gray.shape[0] < 2:
+        return False
+    edges = cv2.absdiff(gray[1:], gray[:-1]) >= edge_threshold
+    runs = longest_row_runs(edges)
+    return int(np.count_nonzero(runs > gray.shape[1] * min_width_ratio)) >= min_rows
+
+
+class BarOutlineDetector:
+    """
+    has_bar_outline 加上按裁剪图内容 (crc32 + 尺寸) 缓存的结果, 画面静止时 (暂停、菜单) 直接命中缓存。
+    感知线程和操作线程可能同时调用, 缓存读写加锁。
+    """
+
+    def __init__(self, cache_size: int = 32, **kwargs):
+        self.cache_size = cache_size
+        self.kwargs = kwargs
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, hud: np.ndarray) -> bool:
+        if hud is None or hud.size == 0:
+            return False
+        key = (hud.shape, zlib.crc32(np.ascontiguousarray(hud)))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+        result = has_bar_outline(hud, **self.kwargs)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
@@ -0,0 +1,57 @@
+"""Batched template matching for the combat HUD icons (skill_1..4, ult_1..4, skill_e)."""
+
+from __future__ import annotations
+
+import numpy as np
+from ok import Box
+
+from src.image.feature_window import match_in_window, search_window
+
+# 特征名 -> 阈值，0 表示使用 FeatureSet 的默认阈值（与原先逐个 find_one 的参数一致）
+HUD_FEATURES: dict[str, float] = {
+    'skill_1': 0,
+    'skill_2': 0,
+    'skill_3': 0,
+    'skill_4': 0,
+    'ult_1': 0,
+    'ult_2': 0,
+    'ult_3': 0,
+    'ult_4': 0,
+    'skill_e': 0.7,
+}
+
+
+class HudMatcher:
+    """
+    一次裁剪整块技能 HUD（所有模板搜索窗口的并集），在这一张裁剪图上依次匹配全部模板，返回 {特征名: Box | None}。
+    每个模板的搜索窗口、阈值与 FeatureSet.find_one_feature 默认行为一致，只省去逐个调用的额外开销。
+    """
+
+    def __init__(self, feature_set, features: dict[str, float] | None = None):
+        self.feature_set = feature_set
+        self.features = dict(HUD_FEATURES if features is None else features)
+
+    def match(self, frame: np.ndarray) -> dict[str, Box | None]:
+        results: dict[str, Box | None] = {name: None for name in self.features}
+        if frame is None:
+            return results
+
+        targets = []
+        for name, threshold in self.features.items():
+            feature = self.feature_set.get_feature_by_name(frame, name)
+            if feature is None:
+                continue
+            targets.append((name, threshold or self.feature_set.default_threshold, feature,
+                            search_window(self.feature_set, feature)))
+        if not targets:
+            return results
+
+        ux1 = min(w[0] for *_, w in targets)
+        uy1 = min(w[1] for *_, w in targets)
+        ux2 = max(w[2] for *_, w in targets)
+        uy2 = max(w[3] for *_, w in targets)
+        hud = frame[uy1:uy2, ux1:ux2, :3]
+
+        for name, threshold, feature, window in targets:
+            results[name] = match_in_window(hud, feature, window, threshold, name, origin=(ux1, uy1))
+        return results
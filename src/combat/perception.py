@@ -0,0 +1,100 @@
+"""Background perception worker that keeps publishing the latest CombatState."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from ok import Logger
+
+from src.combat.state import CombatState
+
+logger = Logger.get_logger(__name__)
+
+
+class PerceptionWorker:
+    """
+    感知线程：按截图速率不断截图并完整计算 CombatState，只保留最新一份。
+    动作线程通过 latest(max_age, not_before) 直接取用最新状态，不再等待检测函数执行完；
+    not_before 传最近一次按键的时间，按键前截到的状态 (技能图标、技能点还是按键前的样子) 不会被使用。
+    截图都在 capture_lock 下进行，操作线程需要自己截图时也要持有这把锁，避免两个线程同时调用截图方法。
+    """
+
+    def __init__(self, task, capture: Callable, min_interval: float = 0.0):
+        self.task = task
+        self.capture = capture
+        self.min_interval = min_interval
+        self.capture_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._latest: CombatState | None = None
+        self.frames = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        with self._lock:
+            self._latest = None
+        self._thread = threading.Thread(target=self._run, name='combat_perception', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def latest(self, max_age: float, not_before: float = 0.0) -> CombatState | None:
+        """返回不早于 max_age 秒前、且在 not_before 之后截图的最新状态，过期或还没有结果时返回 None。"""
+        with self._lock:
+            state = self._latest
+        return self._usable(state, max_age, not_before)
+
+    def wait_latest(self, max_age: float, not_before: float = 0.0, timeout: float = 0.0) -> CombatState | None:
+        """同 latest, 当前没有可用状态时最多等待 timeout 秒, 直到感知线程发布一份新的。"""
+        deadline = time.time() + timeout
+        with self._published:
+            while True:
+                state = self._usable(self._latest, max_age, not_before)
+                remaining = deadline - time.time()
+                if state is not None or remaining <= 0 or not self.running:
+                    return state
+                self._published.wait(remaining)
+
+    @staticmethod
+    def _usable(state: CombatState | None, max_age: float, not_before: float) -> CombatState | None:
+        if state is None or state.timestamp < not_before or state.age() > max_age:
+            return None
+        return state
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            start = time.time()
+            frame = None
+            try:
+                with self.capture_lock:
+                    captured_at = time.time()
+                    frame = self.capture()
+                if frame is not None:
+                    state = CombatState(self.task, frame, timestamp=captured_at)
+                    state.evaluate()
+                    with self._published:
+                        self._latest = state
+                        self._published.notify_all()
+                    self.frames += 1
+            except Exception as e:
+                logger.error('combat perception error', e)
+                self._stop_event.wait(0.1)
+            remaining = self.min_interval - (time.time() - start)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+            elif frame is None:
+                self._stop_event.wait(0.005)
@@ -0,0 +1,73 @@
+"""Declarative skill rotation with per-skill cooldowns, priorities and point costs."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SkillSpec:
+    """单个技能: 按键, 优先级 (越小越先放), 消耗技能点数, 自身冷却 (秒)。"""
+    key: str
+    priority: int = 0
+    cost: int = 1
+    cooldown: float = 0.0
+
+
+class SkillRotation:
+    """
+    非阻塞的技能循环。技能点达到 start_points 时开始一轮, 这一轮内每个技能放一次,
+    每次调用 next_skill 只根据当前技能点和时间判断现在能不能放、放哪个, 不再在循环里轮询等待:
+    在本轮尚未释放的技能中, 选优先级最高且技能点足够、自身冷却和公共间隔 (global_cooldown) 都已结束的一个。
+    所有技能放完后回到充能状态, 等待下一次技能点达到 start_points。
+    """
+
+    def __init__(self, skills: list[SkillSpec], start_points: int = 2, global_cooldown: float = 1.0):
+        self.skills = sorted(skills, key=lambda s: s.priority)
+        self.start_points = start_points
+        self.global_cooldown = global_cooldown
+        self._last_cast: dict[str, float] = {}
+        self._last_any = float('-inf')
+        self._pending: list[SkillSpec] = []
+        self.casts = 0
+
+    @classmethod
+    def from_sequence(cls, sequence, start_points: int = 2, global_cooldown: float = 1.0,
+                      cooldowns: dict[str, float] | None = None) -> "SkillRotation":
+        """按配置字符串 (如 "123") 的顺序生成优先级, 每个技能消耗 1 点。"""
+        cooldowns = cooldowns or {}
+        skills = [SkillSpec(key, priority=i, cooldown=cooldowns.get(key, 0.0)) for i, key in enumerate(sequence)]
+        return cls(skills, start_points=start_points, global_cooldown=global_cooldown)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._pending)
+
+    def reset(self):
+        """中断当前一轮 (脱战或战斗状态丢失时), 冷却计时保留。"""
+        self._pending = []
+
+    def ready(self, skill: SkillSpec, points: int, now: float) -> bool:
+        return (points >= skill.cost
+                and now - self._last_any >= self.global_cooldown
+                and now - self._last_cast.get(skill.key, float('-inf')) >= skill.cooldown)
+
+    def next_skill(self, points: int, now: float) -> str | None:
+        """返回当前应该释放的技能按键, 没有可放的技能时返回 None (此时应普攻)。"""
+        if not self._pending:
+            if points < self.start_points or not self.skills:
+                return None
+            self._pending = list(self.skills)
+        for skill in self._pending:
+            if self.ready(skill, points, now):
+                return skill.key
+        return None
+
+    def on_cast(self, key: str, now: float):
+        self._last_cast[key] = now
+        self._last_any = now
+        self.casts += 1
+        for i, skill in enumerate(self._pending):
+            if skill.key == key:
+                del self._pending[i]
+                break
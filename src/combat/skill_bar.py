@@ -0,0 +1,110 @@
+"""Vectorized skill bar (技能点) analyzer for the combat HUD."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from src.image.color_probe import ColorProbe
+
+yellow_skill_color = {
+    'r': (230, 255),
+    'g': (180, 255),
+    'b': (0, 85)
+}
+
+white_skill_color = {
+    'r': (190, 255),
+    'g': (190, 255),
+    'b': (190, 255)
+}
+
+# 黄色技能条和白色标记在同一次查表中判断
+skill_bar_probe = ColorProbe({'yellow': yellow_skill_color, 'white': white_skill_color})
+
+
+@dataclass(frozen=True)
+class SkillBarLayout:
+    """
+    技能条在 HUD 裁剪图内的相对坐标（像素）。
+    bar_spans: 三段黄色技能条的 (x1, x2)；white_span: 左侧白色标记的 (x1, x2)；row_span: 检测行 (y1, y2)。
+    """
+    bar_spans: tuple[tuple[int, int], ...]
+    white_span: tuple[int, int]
+    row_span: tuple[int, int]
+
+
+@dataclass(frozen=True)
+class SkillBarState:
+    bars: tuple[bool, ...]
+    white_left: bool
+
+    @property
+    def count(self) -> int:
+        """与旧版 get_skill_bar_count 一致：从左到右连续满格数，0 格且无白色标记时返回 -1。"""
+        count = 0
+        for full in self.bars:
+            if not full:
+                break
+            count += 1
+        if count == 0 and not self.white_left:
+            return -1
+        return count
+
+
+def _span_row_counts(mask: np.ndarray, spans: Sequence[tuple[int, int]]) -> np.ndarray:
+    # 列方向前缀和，一次性得到每行、每个区间内的命中像素数 -> shape (rows, len(spans))
+    prefix = np.zeros((mask.shape[0], mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(mask, axis=1, out=prefix[:, 1:])
+    x1 = np.array([s[0] for s in spans], dtype=np.intp)
+    x2 = np.array([s[1] for s in spans], dtype=np.intp)
+    return prefix[:, x2] - prefix[:, x1]
+
+
+def _has_consecutive_rows(valid: np.ndarray, min_rows: int = 2) -> np.ndarray:
+    # valid: (rows, spans)，返回每个区间是否存在连续 min_rows 行满足
+    if valid.shape[0] < min_rows:
+        return np.zeros(valid.shape[1], dtype=bool)
+    run = valid[min_rows - 1:].copy()
+    for offset in range(1, min_rows):
+        run &= valid[min_rows - 1 - offset:valid.shape[0] - offset]
+    return run.any(axis=0)
+
+
+def analyze_skill_bar(hud: np.ndarray, layout: SkillBarLayout, bar_threshold: float = 0.9,
+                      white_threshold: float = 0.1) -> SkillBarState:
+    """
+    对整块技能 HUD 裁剪图做一次向量化分析，同时返回三段黄条与左侧白色标记的状态。
+    一次查表得到黄/白两种颜色的掩码，按行统计命中比例（替代逐行 np.unique），连续 2 行达标即认为该段有效。
+    """
+    y1, y2 = layout.row_span
+    band = hud[max(0, y1):max(0, y2)]
+    spans = len(layout.bar_spans)
+    if band.size == 0:
+        return SkillBarState(bars=(False,) * spans, white_left=False)
+
+    width = band.shape[1]
+    bar_spans = [_clip_span(s, width) for s in layout.bar_spans]
+    white_span = _clip_span(layout.white_span, width)
+
+    bits = skill_bar_probe.classify(band)
+    yellow_counts = _span_row_counts((bits & skill_bar_probe.bits['yellow']) != 0, bar_spans)
+    widths = np.array([x2 - x1 for x1, x2 in bar_spans], dtype=np.float32)
+    bars = _has_consecutive_rows((yellow_counts >= widths * bar_threshold) & (widths > 0))
+
+    white_left = False
+    if spans == 0 or not bars[0]:
+        white_counts = _span_row_counts((bits & skill_bar_probe.bits['white']) != 0, [white_span])
+        white_width = white_span[1] - white_span[0]
+        white_left = white_width > 0 and bool(
+            _has_consecutive_rows(white_counts >= white_width * white_threshold)[0])
+
+    return SkillBarState(bars=tuple(bool(b) for b in bars), white_left=white_left)
+
+
+def _clip_span(span: tuple[int, int], width: int) -> tuple[int, int]:
+    x1 = min(max(0, int(span[0])), width)
+    x2 = min(max(x1, int(span[1])), width)
+    return x1, x2
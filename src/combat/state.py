@@ -0,0 +1,64 @@
+"""Per-frame combat state snapshot shared by all combat predicates."""
+
+from __future__ import annotations
+
+import time
+from functools import cached_property
+
+_SLOT_KEYS = ('1', '2', '3', '4')
+
+
+class CombatState:
+    """
+    单帧战斗状态快照。各字段在第一次访问时才调用 task 上对应的检测函数并缓存，
+    同一帧内的重复判断（in_combat / 退出判断 / E / 大招）不再重复做模板匹配和 OCR。
+    task 需提供 detect_skill_bar_count / detect_hud_icons / detect_lv，均接收 frame 参数，
+    保证延迟计算的字段也作用于同一帧。detect_hud_icons 一次返回全部 HUD 图标的匹配结果 {特征名: Box | None}。
+    """
+
+    def __init__(self, task, frame, timestamp: float | None = None):
+        self.task = task
+        self.frame = frame
+        # 截图时间 (感知线程传入开始截图的时间), 用于判断状态是否早于最近一次按键
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+    def evaluate(self) -> "CombatState":
+        """一次性计算全部字段（感知线程发布前调用，动作线程只读取已算好的值）。"""
+        _ = self.skill_bar_count, self.hud_icons, self.lv_visible
+        return self
+
+    @cached_property
+    def skill_bar_count(self) -> int:
+        return self.task.detect_skill_bar_count(self.frame)
+
+    @cached_property
+    def hud_icons(self) -> dict:
+        return self.task.detect_hud_icons(self.frame)
+
+    @property
+    def in_team(self) -> bool:
+        return all(self.hud_icons.get(f'skill_{i}') for i in _SLOT_KEYS)
+
+    @cached_property
+    def lv_visible(self) -> bool:
+        return bool(self.task.detect_lv(self.frame))
+
+    @property
+    def e_ready(self) -> bool:
+        return bool(self.hud_icons.get('skill_e'))
+
+    @property
+    def ready_ult(self) -> str | None:
+        for ult in _SLOT_KEYS:
+            if self.hud_icons.get('ult_' + ult):
+                return ult
+        return None
+
+    def in_combat(self, required_yellow: int = 0) -> bool:
+        return self.skill_bar_count >= required_yellow and self.in_team and not self.lv_visible
+
+    def combat_ended(self) -> bool:
+        return self.skill_bar_count < 0 and (self.lv_visible or not self.in_team)
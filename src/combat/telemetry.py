@@ -0,0 +1,116 @@
+"""Per-iteration stage timing telemetry for the combat loop."""
+
+from __future__ import annotations
+
+import csv
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+
+# 固定列顺序，未出现的阶段记 0，便于不同场次的 CSV 对比
+STAGES: tuple[str, ...] = (
+    'has_rectangles',
+    'color_probe',
+    'hud_match',
+    'lv_glyph',
+    'ocr_lv',
+    'action',
+    'sleep',
+)
+
+_PERCENTILES = (50, 95, 99)
+
+
+class CombatTelemetry:
+    """
+    记录每轮战斗循环中各阶段的耗时（秒），保存最近 window 轮用于计算 p50/p95/p99，
+    并保留全部轮次用于战斗结束时导出 CSV（耗时单位为毫秒）。enabled=False 时 measure 为空操作。
+    """
+
+    def __init__(self, enabled: bool = True, window: int = 500):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._current: dict[str, float] = {}
+            self._iteration_start = time.perf_counter()
+            self._history: dict[str, deque] = {stage: deque(maxlen=self.window) for stage in
+                                               STAGES + ('iteration',)}
+            self.rows: list[dict] = []
+
+    def measure(self, stage: str):
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(stage)
+
+    @contextmanager
+    def _measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._current[stage] = self._current.get(stage, 0.0) + elapsed
+
+    def end_iteration(self):
+        """结束当前轮次：把各阶段累计耗时写入滚动窗口和 CSV 行，并开始新的一轮。"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            current, self._current = self._current, {}
+            total = now - self._iteration_start
+            self._iteration_start = now
+            row = {'time': time.time(), 'iteration': total}
+            for stage in STAGES + tuple(s for s in current if s not in STAGES):
+                value = current.get(stage, 0.0)
+                row[stage] = value
+                self._history.setdefault(stage, deque(maxlen=self.window)).append(value)
+            self._history['iteration'].append(total)
+            self.rows.append(row)
+
+    @property
+    def iterations(self) -> int:
+        return len(self.rows)
+
+    def percentiles(self, stage: str) -> tuple[float, ...] | None:
+        with self._lock:
+            values = list(self._history.get(stage, ()))
+        if not values:
+            return None
+        return tuple(float(v) for v in np.percentile(values, _PERCENTILES))
+
+    def summary(self) -> dict[str, str]:
+        """返回 {阶段: "p50/p95/p99 ms"}，只包含出现过耗时的阶段。"""
+        result = {}
+        for stage in ('iteration',) + STAGES:
+            p = self.percentiles(stage)
+            if p is None or p[-1] <= 0:
+                continue
+            result[stage] = '/'.join(f'{v * 1000:.1f}' for v in p) + 'ms'
+        return result
+
+    def dump_csv(self, path: str | Path) -> Path | None:
+        if not self.rows:
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            rows = list(self.rows)
+        fieldnames = ['time', 'iteration'] + list(STAGES)
+        for row in rows:
+            fieldnames.extend(k for k in row if k not in fieldnames)
+        with path.open('w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval=0)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({k: (f'{v * 1000:.3f}' if k != 'time' else f'{v:.3f}') for k, v in row.items()})
+        return path
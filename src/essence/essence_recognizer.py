@@ -24,6 +24,7 @@ _PUNCT_TRANSLATION_TABLE = str.maketrans(
 _ONLY_ASCII_RE = re.compile(r"^[A-Za-z0-9]+$")
 _ONLY_NUMBER_RE = re.compile(r"^\d+(\.\d+)?$")
 _INT_RE = re.compile(r"\d+")
+_LEVEL_RE = re.compile(r"\+(\d+)")
 _CN_RE = re.compile(r"[\u4e00-\u9fff]+")
 _CN_OR_DIGIT_RE = re.compile(r"[\u4e00-\u9fff0-9]+")
 
@@ -235,14 +236,24 @@ def parse_essence_panel(
     )
 
 
-def ocr_essence_panel(task) -> list[Box]:
+def _ocr(task, box: Box, frame=None, frame_processor=None) -> list[Box]:
+    """
+    frame 为 None 时用 task.ocr 识别当前帧；传入 frame 时用 task.ocr_frame，
+    只做 OCR、不碰 executor 的暂停/当前帧，流水线的后台线程走这条路径。
+    """
+    if frame is None:
+        return task.ocr(box=box, frame_processor=frame_processor)
+    return task.ocr_frame(frame, box, frame_processor=frame_processor)
+
+
+def ocr_essence_panel(task, frame=None) -> list[Box]:
     """
     OCR the essence panel at top-right.
-    task 需提供 box_of_screen / ocr 等 ok-script Task API。
+    task 需提供 box_of_screen / ocr / ocr_frame 等 Task API; frame 为 None 时使用 task 的当前帧。
     """
     # 右侧面板的“附加技能/词条”区域会略低于 0.50，向下多留一些避免漏掉第 3 条
     panel_box = task.box_of_screen(0.65, 0.05, 0.99, 0.63, name="essence_panel")
-    return task.ocr(box=panel_box)
+    return _ocr(task, panel_box, frame)
 
 
 def _levels_frame_processor(cv_image):
@@ -259,12 +270,61 @@ def _levels_frame_processor(cv_image):
     return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
 
 
-def ocr_essence_levels(task) -> list[Box]:
+def _essence_levels_box(task) -> Box:
+    return task.box_of_screen(0.90, 0.28, 0.99, 0.63, name="essence_levels")
+
+
+# "+x" 在词条名的下一行、分隔竖线的右侧；纵向范围以词条名文本框的高度为单位 (按 1440p 截图量得)
+_LEVEL_X_START = 0.948
+_LEVEL_ROW_TOP = 0.6
+_LEVEL_ROW_BOTTOM = 1.9
+
+
+def _parse_level(box) -> int | None:
+    text = _normalize_text(getattr(box, "name", ""))
+    # 优先取 "+" 后面的数字，分隔竖线可能被识别成 1
+    match = _LEVEL_RE.search(text)
+    level = int(match.group(1)) if match else _parse_int(text)
+    if level is None or level <= 0 or level > 20:
+        return None
+    return level
+
+
+def ocr_essence_levels(task, frame=None) -> list[Box]:
     """
     OCR the "+x" levels on the right side.
     """
-    level_box = task.box_of_screen(0.90, 0.28, 0.99, 0.63, name="essence_levels")
-    return task.ocr(box=level_box, frame_processor=_levels_frame_processor)
+    return _ocr(task, _essence_levels_box(task), frame, frame_processor=_levels_frame_processor)
+
+
+def _level_boxes(task, panel: _EssencePanelParse) -> list[Box]:
+    region = _essence_levels_box(task)
+    x1 = max(region.x, round(task.width * _LEVEL_X_START))
+    x2 = region.x + region.width
+    boxes = []
+    for entry_box in panel.entry_boxes:
+        y1 = max(region.y, round(entry_box.y + entry_box.height * _LEVEL_ROW_TOP))
+        y2 = min(region.y + region.height, round(entry_box.y + entry_box.height * _LEVEL_ROW_BOTTOM))
+        if x2 <= x1 or y2 <= y1:
+            return []
+        boxes.append(Box(x1, y1, x2 - x1, y2 - y1, name="essence_level"))
+    return boxes
+
+
+def recognize_essence_levels(task, panel: _EssencePanelParse, frame=None) -> tuple[EssenceEntry, ...]:
+    """
+    面板 OCR 通常检测不到右侧的 "+x" 小字，但给出了每个词条的位置。
+    按词条位置算出各自的等级小框，只做一次批量识别 (不再检测)，代替对整块等级区域的第二遍检测+识别；
+    OCR 库不支持单独识别时退回整块等级区域的 OCR。
+    """
+    boxes = _level_boxes(task, panel)
+    recognized = task.ocr_recognize(task.frame if frame is None else frame, boxes) if boxes else None
+    if recognized is None:
+        return _attach_levels(panel, ocr_essence_levels(task, frame))
+    return tuple(
+        EssenceEntry(name=entry_name, level=_parse_level(b))
+        for entry_name, b in zip(panel.entry_names, recognized, strict=False)
+    )
 
 
 def _attach_levels(
@@ -272,9 +332,8 @@ def _attach_levels(
 ) -> tuple[EssenceEntry, ...]:
     candidates: list[tuple[Box, int]] = []
     for b in level_boxes:
-        text = _normalize_text(getattr(b, "name", ""))
-        level = _parse_int(text)
-        if level is None or level <= 0 or level > 20:
+        level = _parse_level(b)
+        if level is None:
             continue
         candidates.append((b, level))
 
@@ -299,14 +358,13 @@ def _attach_levels(
     return tuple(entries)
 
 
-def read_essence_info(task) -> EssenceInfo | None:
-    panel_texts = ocr_essence_panel(task)
+def read_essence_info(task, frame=None) -> EssenceInfo | None:
+    panel_texts = ocr_essence_panel(task, frame)
     panel = parse_essence_panel(panel_texts)
     if not panel:
         return None
 
-    level_boxes = ocr_essence_levels(task)
-    entries = _attach_levels(panel, level_boxes)
+    entries = recognize_essence_levels(task, panel, frame)
 
     return EssenceInfo(
         name=panel.name,
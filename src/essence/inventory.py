@@ -0,0 +1,178 @@
+"""Persistent essence inventory (SQLite) used to skip unchanged cells on rescans."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.essence.essence_recognizer import EssenceEntry, EssenceInfo
+from src.image.ocr_cache import difference_hash
+
+DEFAULT_INVENTORY_PATH = Path("configs") / "essence_inventory.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS essences (
+    position TEXT NOT NULL,
+    thumb_hash TEXT NOT NULL,
+    info_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    source TEXT,
+    entries TEXT NOT NULL,
+    is_gold INTEGER NOT NULL,
+    graduated INTEGER NOT NULL,
+    lock_state TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (position, thumb_hash)
+);
+CREATE INDEX IF NOT EXISTS essences_info_key ON essences (info_key);
+CREATE INDEX IF NOT EXISTS essences_first_seen ON essences (first_seen);
+CREATE TABLE IF NOT EXISTS essence_copies (
+    info_key TEXT NOT NULL,
+    copy INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (info_key, copy)
+);
+INSERT INTO essence_copies
+SELECT info_key, ROW_NUMBER() OVER (PARTITION BY info_key ORDER BY first_seen), first_seen FROM essences
+WHERE NOT EXISTS (SELECT 1 FROM essence_copies);
+"""
+
+
+def thumbnail_hash(cell: np.ndarray) -> str:
+    """格子缩略图的 dHash (十六进制), 截图压缩噪声不影响, 图标/品质/锁定标记变化会改变。"""
+    if cell is None or cell.size == 0:
+        return ""
+    return difference_hash(cell).hex()
+
+
+@dataclass(frozen=True)
+class InventoryRecord:
+    position: str
+    thumb_hash: str
+    info: EssenceInfo
+    graduated: bool
+    lock_state: str | None
+    first_seen: float
+    last_seen: float
+
+
+def can_reuse(record: InventoryRecord | None, is_gold_candidate: bool) -> bool:
+    """
+    库存命中能否代替点击和 OCR。同类基质共用一个图标, 列表前面插入/删除基质后,
+    某个位置的缩略图可能和另一个基质留下的记录完全一致; 金色基质可能需要上锁/解锁,
+    必须重新读面板, 只有格子和记录都不是金色时才直接使用记录。
+    """
+    return record is not None and not is_gold_candidate and not record.info.is_gold
+
+
+class EssenceInventory:
+    """
+    以 (格子位置, 缩略图哈希) 为主键保存每个格子上次识别到的基质信息、是否毕业和锁定状态。
+    重新扫描时位置和缩略图都没变的格子可以直接使用记录 (见 can_reuse), 不再点击和 OCR;
+    首次出现时间按 (EssenceInfo.key(), 第几个副本) 单独存在 essence_copies 表里, 格子记录被覆盖时也不删除,
+    基质因列表移动换了位置后仍保留原来的时间; 完全相同的基质按本次扫描中出现的顺序编号,
+    多出来的副本会算作新增。一个实例对应一次扫描, 复用实例时先调用 begin_scan()。
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_INVENTORY_PATH):
+        self.path = Path(path)
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self._copies: Counter[str] = Counter()
+
+    def begin_scan(self) -> None:
+        """开始新一轮扫描, 重新给相同基质的副本编号。"""
+        self._copies.clear()
+
+    def _first_seen(self, key: str, now: float) -> float:
+        """本次扫描中第 n 个 key 相同的基质对应第 n 个副本, 返回该副本的首次出现时间。"""
+        self._copies[key] += 1
+        copy = self._copies[key]
+        self._conn.execute("INSERT OR IGNORE INTO essence_copies VALUES (?, ?, ?)", (key, copy, now))
+        return self._conn.execute(
+            "SELECT first_seen FROM essence_copies WHERE info_key = ? AND copy = ?", (key, copy)
+        ).fetchone()[0]
+
+    @staticmethod
+    def _to_record(row) -> InventoryRecord:
+        position, thumb_hash, _, name, source, entries, is_gold, graduated, lock_state, first_seen, last_seen = row
+        info = EssenceInfo(
+            name=name,
+            source=source,
+            entries=tuple(EssenceEntry(name=n, level=level) for n, level in json.loads(entries)),
+            is_gold=bool(is_gold),
+        )
+        return InventoryRecord(position, thumb_hash, info, bool(graduated), lock_state, first_seen, last_seen)
+
+    def lookup(self, position: str, thumb_hash: str) -> InventoryRecord | None:
+        if not thumb_hash:
+            return None
+        row = self._conn.execute(
+            "SELECT * FROM essences WHERE position = ? AND thumb_hash = ?", (position, thumb_hash)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._to_record(row)
+
+    def record(
+        self,
+        position: str,
+        thumb_hash: str,
+        info: EssenceInfo,
+        *,
+        graduated: bool,
+        lock_state: str | None,
+        now: float | None = None,
+    ) -> None:
+        if not thumb_hash:
+            return
+        now = time.time() if now is None else now
+        key = info.key()
+        entries = json.dumps([[e.name, e.level] for e in info.entries], ensure_ascii=False)
+        with self._conn:
+            first_seen = self._first_seen(key, now)
+            # 同一位置换成了别的基质时, 旧缩略图的记录已失效
+            self._conn.execute("DELETE FROM essences WHERE position = ? AND thumb_hash != ?", (position, thumb_hash))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO essences VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (position, thumb_hash, key, info.name, info.source, entries, int(info.is_gold), int(graduated),
+                 lock_state, first_seen, now),
+            )
+
+    def touch(self, position: str, thumb_hash: str, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        row = self._conn.execute(
+            "SELECT info_key FROM essences WHERE position = ? AND thumb_hash = ?", (position, thumb_hash)
+        ).fetchone()
+        if row is None:
+            return
+        with self._conn:
+            self._conn.execute(
+                "UPDATE essences SET first_seen = ?, last_seen = ? WHERE position = ? AND thumb_hash = ?",
+                (self._first_seen(row[0], now), now, position, thumb_hash),
+            )
+
+    def added_since(self, timestamp: float) -> list[InventoryRecord]:
+        rows = self._conn.execute(
+            "SELECT * FROM essences WHERE first_seen >= ? ORDER BY first_seen", (timestamp,)
+        ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM essences").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
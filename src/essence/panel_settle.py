@@ -0,0 +1,71 @@
+"""Detect when the essence info panel has finished redrawing after a cell click."""
+
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+_SIGNATURE_SCALE = 0.25
+
+
+def panel_signature(crop: np.ndarray) -> np.ndarray | None:
+    """面板区域缩小到 1/4 的灰度图, 比较两帧时取平均绝对差。"""
+    if crop is None or crop.size == 0:
+        return None
+    if crop.ndim == 3:
+        crop = cv2.cvtColor(np.ascontiguousarray(crop[..., :3]), cv2.COLOR_BGR2GRAY)
+    return cv2.resize(crop, None, fx=_SIGNATURE_SCALE, fy=_SIGNATURE_SCALE, interpolation=cv2.INTER_AREA)
+
+
+def signature_difference(a: np.ndarray | None, b: np.ndarray | None) -> float:
+    if a is None or b is None or a.shape != b.shape:
+        return float('inf')
+    return float(cv2.absdiff(a, b).mean())
+
+
+class PanelSettleDetector:
+    """
+    点击格子后逐帧调用 update:
+    - 先等面板与上一个格子的面板不同 (平均差 >= change_threshold), 上一个面板未知时跳过这一步;
+    - 再等连续 stable_frames 帧之间几乎没有变化 (平均差 <= stable_threshold), 且这些帧的截图时间跨度
+      不少于 min_span 秒, 认为重绘完成。截图间隔比游戏帧短时可能两次截到同一个淡入中的画面,
+      只看帧数会把半透明的面板当成已经稳定。
+    面板一直没有变化 (点到的就是当前选中的格子, 或两个基质完全相同) 时由调用方的超时兜底。
+    """
+
+    def __init__(self, change_threshold: float = 3.0, stable_threshold: float = 0.8, stable_frames: int = 2,
+                 min_span: float = 0.03):
+        self.change_threshold = change_threshold
+        self.stable_threshold = stable_threshold
+        self.stable_frames = stable_frames
+        self.min_span = min_span
+        self.previous: np.ndarray | None = None
+        self.changed = False
+        self._last: np.ndarray | None = None
+        self._stable = 0
+        self._stable_since = 0.0
+
+    def start(self, previous: np.ndarray | None):
+        self.previous = previous
+        self.changed = previous is None
+        self._last = None
+        self._stable = 0
+        self._stable_since = 0.0
+
+    def update(self, signature: np.ndarray | None, timestamp: float | None = None) -> bool:
+        """timestamp 为这一帧的截图时间 (秒), 默认取当前时间。"""
+        if signature is None:
+            return False
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self.changed and signature_difference(signature, self.previous) >= self.change_threshold:
+            self.changed = True
+        if self.changed and signature_difference(signature, self._last) <= self.stable_threshold:
+            self._stable += 1
+        else:
+            self._stable = 0
+            self._stable_since = timestamp
+        self._last = signature
+        return (self.changed and self._stable >= max(1, self.stable_frames - 1)
+                and timestamp - self._stable_since >= self.min_span)
@@ -0,0 +1,68 @@
+"""Page-level quality classification of the essence grid: one template pass per quality feature per page."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class QualityMap:
+    """
+    gold: rows x cols 的布尔矩阵, 对应格子内任一金色品质模板的最高分达到阈值;
+    scores: 每个格子内所有模板的最高匹配分数 (没有完整放得下模板的格子为 0)。
+    """
+    gold: np.ndarray
+    scores: np.ndarray
+
+    def is_gold(self, row: int, col: int) -> bool:
+        if 0 <= row < self.gold.shape[0] and 0 <= col < self.gold.shape[1]:
+            return bool(self.gold[row, col])
+        return False
+
+    @property
+    def gold_count(self) -> int:
+        return int(self.gold.sum())
+
+
+def classify_quality_grid(frame: np.ndarray, cells: np.ndarray, templates, threshold: float) -> QualityMap:
+    """
+    cells: (rows, cols, 4) 的格子搜索框 x, y, width, height (像素);
+    templates: [(mat, mask)], 与 find_one 使用的模板相同 (已按分辨率缩放)。
+
+    先裁出所有格子的外接矩形, 每个模板在这块区域上只做一次 matchTemplate, 再对每个格子取
+    "模板完全落在格子内" 的那部分结果的最大值, 与在每个格子里分别 find_one 的结果一致。
+    """
+    rows, cols = cells.shape[:2]
+    scores = np.zeros((rows, cols), dtype=np.float32)
+    if frame is None or cells.size == 0 or not templates:
+        return QualityMap(scores > 0, scores)
+
+    frame_h, frame_w = frame.shape[:2]
+    x1 = np.clip(cells[..., 0], 0, frame_w)
+    y1 = np.clip(cells[..., 1], 0, frame_h)
+    x2 = np.clip(cells[..., 0] + cells[..., 2], 0, frame_w)
+    y2 = np.clip(cells[..., 1] + cells[..., 3], 0, frame_h)
+    ox, oy = int(x1.min()), int(y1.min())
+    strip = np.ascontiguousarray(frame[oy:int(y2.max()), ox:int(x2.max()), :3])
+
+    for mat, mask in templates:
+        th, tw = mat.shape[:2]
+        if th > strip.shape[0] or tw > strip.shape[1]:
+            continue
+        result = cv2.matchTemplate(strip, mat, cv2.TM_CCOEFF_NORMED, mask=mask)
+        np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+        # 结果图中 (u, v) 表示模板左上角位于 strip 的 (u, v); 模板完全落在格子内的左上角范围是
+        # [x1, x2 - tw] x [y1, y2 - th]
+        ux1, uy1 = x1 - ox, y1 - oy
+        ux2, uy2 = x2 - ox - tw + 1, y2 - oy - th + 1
+        for r in range(rows):
+            for c in range(cols):
+                if ux2[r, c] <= ux1[r, c] or uy2[r, c] <= uy1[r, c]:
+                    continue
+                value = result[uy1[r, c]:uy2[r, c], ux1[r, c]:ux2[r, c]].max()
+                if value > scores[r, c]:
+                    scores[r, c] = value
+    return QualityMap(scores >= threshold, scores)
@@ -0,0 +1,94 @@
+"""Background OCR of captured essence panel frames so the scan can click the next cell meanwhile."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ScannedCell:
+    row: int
+    col: int
+    cx: float
+    cy: float
+    pos: str
+    thumb_hash: str = ""
+
+
+class EssenceOcrPipeline:
+    """
+    单线程 OCR 工作队列: submit 提交某个格子点击后截到的面板帧, 主线程随即去点下一个格子;
+    ready / drain 按提交顺序取回结果 (队头未完成时 ready 不会跳过它), 保证结果的处理顺序与逐格扫描一致。
+    队列中的格子数达到 depth 时 submit 前需要先 wait_one, 以免点击远远领先于 OCR。
+    ocr_time 为 OCR 本身的耗时, blocked_time 为主线程等待结果的耗时。
+    """
+
+    def __init__(self, read_func: Callable[[np.ndarray], Any], depth: int = 2):
+        self.read_func = read_func
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="essence-ocr")
+        self._pending: deque[tuple[ScannedCell, Future]] = deque()
+        self.ocr_time = 0.0
+        self.blocked_time = 0.0
+        self.submitted = 0
+
+    def _read(self, frame: np.ndarray):
+        start = time.perf_counter()
+        try:
+            return self.read_func(frame)
+        finally:
+            self.ocr_time += time.perf_counter() - start
+
+    def submit(self, cell: ScannedCell, frame: np.ndarray):
+        self._pending.append((cell, self._executor.submit(self._read, frame)))
+        self.submitted += 1
+
+    def submit_result(self, cell: ScannedCell, result):
+        """加入一个不需要 OCR 的结果 (如库存记录), 与其他结果一样按顺序取回。"""
+        future: Future = Future()
+        future.set_result(result)
+        self._pending.append((cell, future))
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= self.depth
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _pop(self) -> tuple[ScannedCell, Any]:
+        cell, future = self._pending.popleft()
+        start = time.perf_counter()
+        try:
+            return cell, future.result()
+        finally:
+            self.blocked_time += time.perf_counter() - start
+
+    def ready(self) -> Iterator[tuple[ScannedCell, Any]]:
+        """按顺序取出已经完成的结果, 不阻塞。"""
+        while self._pending and self._pending[0][1].done():
+            yield self._pop()
+
+    def wait_one(self) -> tuple[ScannedCell, Any] | None:
+        return self._pop() if self._pending else None
+
+    def drain(self) -> Iterator[tuple[ScannedCell, Any]]:
+        """按顺序等待并取出全部结果。"""
+        while self._pending:
+            yield self._pop()
+
+    def cancel(self):
+        """丢弃尚未处理的结果 (扫描提前结束时)。"""
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=True)
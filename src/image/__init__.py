@@ -0,0 +1 @@
+"""Shared image helpers (color probing) used by several tasks."""
@@ -0,0 +1,117 @@
+"""LUT based color probe: classify an ROI against several RGB range dicts in one vectorized pass."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+_CHANNELS = ('b', 'g', 'r')
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """
+    一次探测的结果。fractions: {颜色名: 命中像素比例}；row_counts: {颜色名: 每行命中像素数}；
+    dominant: 命中比例最高的颜色名（全部为 0 时为 None）。
+    """
+    fractions: dict[str, float]
+    row_counts: dict[str, np.ndarray]
+    width: int
+    dominant: str | None
+
+    def row_fractions(self, name: str) -> np.ndarray:
+        if self.width == 0:
+            return np.zeros(len(self.row_counts[name]), dtype=np.float32)
+        return self.row_counts[name] / np.float32(self.width)
+
+    def longest_run(self, name: str, row_threshold: float) -> int:
+        """命中比例 >= row_threshold 的最长连续行数。"""
+        return longest_run(self.row_fractions(name) >= row_threshold)
+
+
+class ColorProbe:
+    """
+    把若干 {'r': (lo, hi), 'g': ..., 'b': ...} 颜色范围编译成三个通道各一张 256 项查找表（即按位打包的 3D 查找表），
+    每个颜色占一个 bit（最多 8 个）。三个通道各查一次表后按位与，即得到每个像素命中了哪些颜色，
+    一次查表同时完成全部颜色的判断，不再对每个颜色、每一行分别比较。
+    """
+
+    def __init__(self, colors: dict[str, dict]):
+        if len(colors) > 8:
+            raise ValueError(f'ColorProbe supports at most 8 colors, got {len(colors)}')
+        self.names = tuple(colors)
+        self.bits = {name: 1 << i for i, name in enumerate(self.names)}
+        self.luts = tuple(np.zeros(256, dtype=np.uint8) for _ in _CHANNELS)
+        for name, color_range in colors.items():
+            for lut, channel in zip(self.luts, _CHANNELS):
+                lo, hi = color_range[channel]
+                lut[max(0, lo):min(255, hi) + 1] |= self.bits[name]
+
+    def classify(self, roi: np.ndarray) -> np.ndarray:
+        """返回与 roi 同尺寸的 uint8 位图，第 i 位表示像素落在第 i 个颜色范围内。"""
+        if roi is None or roi.size == 0:
+            return np.zeros(roi.shape[:2] if roi is not None else (0, 0), dtype=np.uint8)
+        b, g, r = cv2.split(np.ascontiguousarray(roi[..., :3]))
+        lut_b, lut_g, lut_r = self.luts
+        return cv2.bitwise_and(cv2.bitwise_and(cv2.LUT(b, lut_b), cv2.LUT(g, lut_g)), cv2.LUT(r, lut_r))
+
+    def mask(self, roi: np.ndarray, name: str) -> np.ndarray:
+        return (self.classify(roi) & self.bits[name]) != 0
+
+    def fraction(self, roi: np.ndarray, name: str) -> float:
+        if roi is None or roi.size == 0:
+            return 0.0
+        return float(np.count_nonzero(self.mask(roi, name))) / (roi.shape[0] * roi.shape[1])
+
+    def probe(self, roi: np.ndarray) -> ProbeResult:
+        bits = self.classify(roi)
+        rows, width = bits.shape[:2]
+        total = rows * width
+        fractions = {}
+        row_counts = {}
+        for name in self.names:
+            bit = self.bits[name]
+            if total:
+                counts = cv2.reduce(cv2.bitwise_and(bits, bit), 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)[:, 0] // bit
+            else:
+                counts = np.zeros(rows, dtype=np.int32)
+            row_counts[name] = counts
+            fractions[name] = float(counts.sum()) / total if total else 0.0
+        dominant = max(self.names, key=fractions.get, default=None)
+        if dominant is not None and fractions[dominant] == 0:
+            dominant = None
+        return ProbeResult(fractions=fractions, row_counts=row_counts, width=width, dominant=dominant)
+
+
+def probe_for(color_range: dict, name: str = 'color') -> ColorProbe:
+    """单个颜色范围的 ColorProbe，按范围缓存，避免每次调用都重新生成查找表。"""
+    return _cached_probe(name, tuple(tuple(color_range[c]) for c in _CHANNELS))
+
+
+@lru_cache(maxsize=64)
+def _cached_probe(name: str, ranges: tuple) -> ColorProbe:
+    return ColorProbe({name: dict(zip(_CHANNELS, ranges))})
+
+
+def longest_run(valid: np.ndarray) -> int:
+    """布尔序列中最长连续 True 的长度。"""
+    if valid.size == 0 or not valid.any():
+        return 0
+    padded = np.concatenate(([0], valid.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[0::2]).max())
+
+
+def grayscale_fraction(roi: np.ndarray, threshold: int = 10) -> float:
+    """
+    灰色像素比例：三个通道两两差值都小于 threshold，等价于 max(b,g,r) - min(b,g,r) < threshold，
+    用两次逐像素 max/min 代替拆通道后三次 absdiff。
+    """
+    if roi is None or roi.size == 0:
+        return 0.0
+    b, g, r = cv2.split(np.ascontiguousarray(roi[..., :3]))
+    spread = cv2.subtract(cv2.max(cv2.max(b, g), r), cv2.min(cv2.min(b, g), r))
+    return float(np.count_nonzero(spread < threshold)) / (roi.shape[0] * roi.shape[1])
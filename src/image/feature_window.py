@@ -0,0 +1,46 @@
+"""Template matching inside the same search window FeatureSet.find_one_feature uses, without per-call overhead."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+from ok import Box
+
+
+def search_window(feature_set, feature, horizontal_variance: float = 0,
+                  vertical_variance: float = 0) -> tuple[int, int, int, int]:
+    """
+    与 FeatureSet.find_one_feature 相同的搜索范围: 特征框向四周扩展 分辨率 * variance, 0 表示默认值;
+    特征按分辨率缩放过 (scaling != 1) 且最终 variance 为 0 时, 同样向四周留 1 像素。
+    """
+    horizontal_variance = horizontal_variance or feature_set.default_horizontal_variance
+    vertical_variance = vertical_variance or feature_set.default_vertical_variance
+    x_offset = feature_set.width * horizontal_variance
+    y_offset = feature_set.height * vertical_variance
+    if feature.scaling != 1:
+        if horizontal_variance == 0:
+            x_offset = 1
+        if vertical_variance == 0:
+            y_offset = 1
+    x1 = max(0, round(feature.x - x_offset))
+    y1 = max(0, round(feature.y - y_offset))
+    x2 = min(feature_set.width, round(feature.x + feature.width + x_offset))
+    y2 = min(feature_set.height, round(feature.y + feature.height + y_offset))
+    return x1, y1, x2, y2
+
+
+def match_in_window(image: np.ndarray, feature, window: tuple[int, int, int, int], threshold: float, name: str,
+                    origin: tuple[int, int] = (0, 0)) -> Box | None:
+    """在 image 的 window 范围内匹配单个模板 (image 可以是从 origin 开始的裁剪图), 返回原图坐标的 Box。"""
+    x1, y1, x2, y2 = window
+    ox, oy = origin
+    search_area = image[y1 - oy:y2 - oy, x1 - ox:x2 - ox]
+    template = feature.mat
+    if template.shape[0] > search_area.shape[0] or template.shape[1] > search_area.shape[1]:
+        return None
+    result = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED, mask=feature.mask)
+    np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    if max_val < threshold:
+        return None
+    return Box(x1 + max_loc[0], y1 + max_loc[1], feature.width, feature.height, max_val, name)
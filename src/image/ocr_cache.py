@@ -0,0 +1,103 @@
+"""Content-addressed OCR result cache keyed on a perceptual hash of the cropped region."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def difference_hash(image: np.ndarray, width: int = 32, height: int = 16, margin: int = 4) -> bytes:
+    """
+    dHash: 缩小为 (width+1) x height 的灰度图, 右侧像素比左侧亮 margin 以上记 1, 得到 width*height 位指纹。
+    margin 使纯色区域稳定为 0, 截图压缩噪声和轻微亮度变化基本不影响指纹, 文字内容变化则会改变指纹。
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(np.ascontiguousarray(image[..., :3]), cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (width + 1, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return np.packbits(small[:, 1:] - small[:, :-1] > margin).tobytes()
+
+
+def hamming_distance(a: bytes, b: bytes) -> int:
+    if len(a) != len(b):
+        return len(a) * 8
+    return int(np.unpackbits(np.bitwise_xor(np.frombuffer(a, np.uint8), np.frombuffer(b, np.uint8))).sum())
+
+
+class OcrCache:
+    """
+    OCR 结果缓存: 以裁剪区域的 dHash 为键, LRU 保留最近 max_size 条, 超过 ttl 秒的结果视为过期。
+    指纹完全相同时直接命中, 否则在缓存中找汉明距离不超过 max_distance 位的条目 (条目很少, 逐个比较即可);
+    区域内文字只占一小部分时, 不同文字的指纹也可能很接近, 这种区域应传 max_distance=0 只做精确匹配。
+    hits / misses 统计命中情况, saved_time 按未命中时记录的平均 OCR 耗时估算节省的时间。
+    """
+
+    def __init__(self, max_size: int = 16, ttl: float = 3.0, max_distance: int = 8):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries: OrderedDict[bytes, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.ocr_time = 0.0
+
+    @staticmethod
+    def key(image: np.ndarray) -> bytes | None:
+        if image is None or image.size == 0:
+            return None
+        return difference_hash(image)
+
+    def get(self, key: bytes | None):
+        if key is None:
+            return None
+        with self._lock:
+            self._expire(time.time())
+            if key not in self._entries and self.max_distance > 0 and self._entries:
+                nearest = min(self._entries, key=lambda k: hamming_distance(k, key))
+                if hamming_distance(nearest, key) <= self.max_distance:
+                    key = nearest
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def put(self, key: bytes | None, value, cost: float = 0.0):
+        """保存一次 OCR 结果, cost 为这次 OCR 的耗时 (秒), 用于估算节省的时间。"""
+        with self._lock:
+            self.ocr_time += cost
+            if key is None:
+                return
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _expire(self, now: float):
+        expired = [k for k, (saved, _) in self._entries.items() if now - saved > self.ttl]
+        for k in expired:
+            del self._entries[k]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved_time(self) -> float:
+        if not self.misses:
+            return 0.0
+        return self.hits * self.ocr_time / self.misses
+
+    def summary(self) -> str:
+        return f'{self.hits}/{self.hits + self.misses} ({self.hit_rate:.0%}), 节省约 {self.saved_time:.1f}s'
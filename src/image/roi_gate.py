@@ -0,0 +1,68 @@
+"""Skip trigger-task detectors while the screen regions they depend on are unchanged."""
+
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+_SIGNATURE_SIZE = (16, 8)
+
+
+def roi_signature(crop: np.ndarray) -> bytes:
+    """区域的降采样签名: 缩小到 16x8 灰度后按 8 级量化, 截图压缩噪声不会改变签名, 界面元素出现/消失会改变。"""
+    if crop is None or crop.size == 0:
+        return b''
+    if crop.ndim == 3:
+        crop = cv2.cvtColor(np.ascontiguousarray(crop[..., :3]), cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(crop, _SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    return (small >> 5).tobytes()
+
+
+class RoiGate:
+    """
+    记录上一次检测结果为否定时各区域的签名。下次触发时若所有区域签名都没变, 说明检测结果不会不同, 直接跳过;
+    任意区域变化、距上次完整检测超过 max_skip 秒或出现肯定结果后 (reset), 恢复正常检测。
+    """
+
+    def __init__(self, max_skip: float = 2.0):
+        self.max_skip = max_skip
+        self._signatures: tuple[bytes, ...] | None = None
+        self._negative_time = 0.0
+        self.skipped = 0
+        self.evaluated = 0
+
+    @staticmethod
+    def signatures(frame: np.ndarray, boxes) -> tuple[bytes, ...]:
+        return tuple(roi_signature(box.crop_frame(frame)) for box in boxes)
+
+    def unchanged(self, frame: np.ndarray, boxes) -> bool:
+        if frame is None or self._signatures is None or time.time() - self._negative_time > self.max_skip:
+            self.evaluated += 1
+            return False
+        if self.signatures(frame, boxes) == self._signatures:
+            self.skipped += 1
+            return True
+        self.evaluated += 1
+        return False
+
+    def changed(self, frame: np.ndarray, boxes) -> bool:
+        """有上次否定结果的签名且当前任意区域与之不同 (相关界面可能出现了), 不计入跳过统计。"""
+        if frame is None or self._signatures is None:
+            return False
+        return self.signatures(frame, boxes) != self._signatures
+
+    def mark_negative(self, frame: np.ndarray, boxes):
+        if frame is None:
+            return
+        self._signatures = self.signatures(frame, boxes)
+        self._negative_time = time.time()
+
+    def reset(self):
+        self._signatures = None
+
+    @property
+    def skip_rate(self) -> float:
+        total = self.skipped + self.evaluated
+        return self.skipped / total if total else 0.0
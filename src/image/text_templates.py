@@ -0,0 +1,215 @@
+"""
+Static UI strings promoted from OCR to template matching.
+
+模板保存在 assets/text_templates.json (索引) 和 assets/text_templates/*.png (裁剪图), 与 coco_detection.json 放在一起。
+运行时 BaseEfTask.ocr 先查这里: 要匹配的字符串全部注册过模板时先用模板匹配, 有命中就直接作为结果,
+没有命中 (或 match 里有正则) 时照常 OCR, 模板和实际界面样式不一致时也不会比原来少识别。
+
+从参考截图生成模板:
+    python -m src.image.text_templates <截图> <文字> <x> <y> <width> <height> [--threshold 0.85]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+DEFAULT_TEXT_TEMPLATES = Path('assets') / 'text_templates.json'
+DEFAULT_THRESHOLD = 0.85
+
+
+@dataclass
+class TextTemplate:
+    text: str
+    file: str
+    ref_height: int
+    threshold: float = DEFAULT_THRESHOLD
+    image: np.ndarray | None = None
+
+    def to_json(self) -> dict:
+        return {'file': self.file, 'ref_height': self.ref_height, 'threshold': self.threshold}
+
+
+@dataclass
+class TextMatch:
+    text: str
+    x: int
+    y: int
+    width: int
+    height: int
+    confidence: float
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        return cv2.cvtColor(np.ascontiguousarray(image[..., :3]), cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def _as_matchers(match) -> list | None:
+    if match is None:
+        return None
+    if isinstance(match, (str, re.Pattern)):
+        return [match]
+    return list(match)
+
+
+def _peaks(result: np.ndarray, threshold: float, width: int, height: int) -> list[tuple[int, int, float]]:
+    """matchTemplate 结果中所有不小于 threshold 的峰值, 每找到一个就把与其重叠的位置清零 (非极大值抑制)。"""
+    peaks = []
+    while True:
+        _, max_val, _, (px, py) = cv2.minMaxLoc(result)
+        if max_val < threshold:
+            return peaks
+        peaks.append((px, py, float(max_val)))
+        result[max(0, py - height + 1):py + height, max(0, px - width + 1):px + width] = 0
+
+
+class TextTemplateStore:
+    """
+    {文字: [模板]} 索引。模板按截图时的分辨率保存, 匹配时按画面高度等比缩放 (游戏为 16:9), 缩放结果按高度缓存。
+    """
+
+    def __init__(self, index_path: str | Path = DEFAULT_TEXT_TEMPLATES):
+        self.index_path = Path(index_path)
+        self.folder = self.index_path.with_suffix('')
+        self.templates: dict[str, list[TextTemplate]] = {}
+        self._scaled: dict[tuple[str, int, int], np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        self.templates.clear()
+        self._scaled.clear()
+        if not self.index_path.exists():
+            return
+        with self.index_path.open('r', encoding='utf-8') as f:
+            index = json.load(f)
+        for text, entries in index.items():
+            for entry in entries:
+                if not (self.folder / entry['file']).exists():
+                    continue
+                image = cv2.imdecode(np.fromfile(str(self.folder / entry['file']), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+                if image is None:
+                    continue
+                self.templates.setdefault(text, []).append(
+                    TextTemplate(text, entry['file'], int(entry['ref_height']),
+                                 float(entry.get('threshold', DEFAULT_THRESHOLD)), image))
+
+    def save(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        index = {text: [t.to_json() for t in templates] for text, templates in self.templates.items()}
+        with self.index_path.open('w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+    def register(self, text: str, frame: np.ndarray, x: int, y: int, width: int, height: int,
+                 threshold: float = DEFAULT_THRESHOLD) -> TextTemplate:
+        """从 frame 上裁剪 (x, y, width, height) 作为 text 的模板, 写入图片; 需要调用 save 保存索引。"""
+        crop = _gray(frame[y:y + height, x:x + width]).copy()
+        if crop.size == 0:
+            raise ValueError(f'empty template box for {text}')
+        templates = self.templates.setdefault(text, [])
+        file = f'{len(self.index_files())}_{frame.shape[0]}p.png'
+        self.folder.mkdir(parents=True, exist_ok=True)
+        cv2.imencode('.png', crop)[1].tofile(str(self.folder / file))
+        template = TextTemplate(text, file, frame.shape[0], threshold, crop)
+        templates.append(template)
+        return template
+
+    def index_files(self) -> list[str]:
+        return [t.file for templates in self.templates.values() for t in templates]
+
+    def covers(self, match) -> bool:
+        """
+        match 中的每一项都是注册过模板的字符串时返回 True。正则不算: 模板只能回答注册过的文字,
+        正则能匹配的其他文字仍然需要 OCR。
+        """
+        matchers = _as_matchers(match)
+        if not matchers or not self.templates:
+            return False
+        return all(self._texts_for(m) for m in matchers)
+
+    def _texts_for(self, matcher) -> list[str]:
+        if isinstance(matcher, str) and matcher in self.templates:
+            return [matcher]
+        return []
+
+    def _scaled_template(self, template: TextTemplate, index: int, frame_height: int) -> np.ndarray:
+        key = (template.text, index, frame_height)
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            scale = frame_height / template.ref_height
+            if abs(scale - 1) < 1e-3:
+                scaled = template.image
+            else:
+                size = (max(1, round(template.image.shape[1] * scale)), max(1, round(template.image.shape[0] * scale)))
+                scaled = cv2.resize(template.image, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+            with self._lock:
+                self._scaled[key] = scaled
+        return scaled
+
+    def match(self, frame: np.ndarray, match, x: int = 0, y: int = 0, to_x: int | None = None,
+              to_y: int | None = None) -> list[TextMatch]:
+        """
+        在 frame 的 (x, y) - (to_x, to_y) 像素范围内匹配 match 对应的模板, 与 OCR 一样返回每一处出现的位置, 按 y 排序。
+        同一文字有多个模板时使用第一个有命中的模板。
+        """
+        matchers = _as_matchers(match) or []
+        to_x = frame.shape[1] if to_x is None else to_x
+        to_y = frame.shape[0] if to_y is None else to_y
+        region = _gray(frame[y:to_y, x:to_x])
+        results: list[TextMatch] = []
+        texts = dict.fromkeys(text for m in matchers for text in self._texts_for(m))
+        for text in texts:
+            for i, template in enumerate(self.templates[text]):
+                scaled = self._scaled_template(template, i, frame.shape[0])
+                if scaled.shape[0] > region.shape[0] or scaled.shape[1] > region.shape[1]:
+                    continue
+                result = cv2.matchTemplate(region, scaled, cv2.TM_CCOEFF_NORMED)
+                np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+                peaks = _peaks(result, template.threshold, scaled.shape[1], scaled.shape[0])
+                results.extend(TextMatch(text, x + px, y + py, scaled.shape[1], scaled.shape[0], score)
+                               for px, py, score in peaks)
+                if peaks:
+                    break
+        results.sort(key=lambda r: r.y)
+        return results
+
+
+@lru_cache(maxsize=None)
+def text_template_store(index_path: str = str(DEFAULT_TEXT_TEMPLATES)) -> TextTemplateStore:
+    """进程内共享的模板索引 (各任务共用同一份缩放缓存)。"""
+    return TextTemplateStore(index_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从参考截图裁剪静态界面文字作为模板')
+    parser.add_argument('screenshot')
+    parser.add_argument('text')
+    parser.add_argument('x', type=int)
+    parser.add_argument('y', type=int)
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--index', default=str(DEFAULT_TEXT_TEMPLATES))
+    args = parser.parse_args(argv)
+
+    frame = cv2.imdecode(np.fromfile(args.screenshot, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        parser.error(f'cannot read {args.screenshot}')
+    store = TextTemplateStore(args.index)
+    template = store.register(args.text, frame, args.x, args.y, args.width, args.height, args.threshold)
+    store.save()
+    print(f'{args.text} -> {store.folder / template.file}')
+
+
+if __name__ == '__main__':
+    main()
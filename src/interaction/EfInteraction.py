@@ -10,6 +10,9 @@ import ctypes
 from ok.device.intercation import PostMessageInteraction
 from ok.util.logger import Logger
 
+from src.interaction.timeline import InputScheduler, InputTimeline
+from src.interaction.win32_backend import Win32InputBackend
+
 logger = Logger.get_logger(__name__)
 
 
@@ -25,39 +28,34 @@ class EfInteraction(PostMessageInteraction):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.cursor_position = None
+        self._input_scheduler = None
+
+    @property
+    def input_scheduler(self):
+        if self._input_scheduler is None:
+            self._input_scheduler = InputScheduler(Win32InputBackend(None, interaction=self))
+        return self._input_scheduler
 
     def click(self, x=-1, y=-1, move_back=False, name=None, down_time=0.001, move=True, key="left"):
-        self.try_activate()
-        move_Cursor = False
-        if x < 0:
-            click_pos = win32api.MAKELONG(round(self.capture.width * 0.5), round(self.capture.height * 0.5))
-        else:
-            self.cursor_position = GetCursorPos()
-            abs_x, abs_y = self.capture.get_abs_cords(x, y)
-            click_pos = win32api.MAKELONG(x, y)
-            win32api.SetCursorPos((abs_x, abs_y))
-            move_Cursor = True
-            time.sleep(0.001)
-        if key == "left":
-            btn_down = win32con.WM_LBUTTONDOWN
-            btn_mk = win32con.MK_LBUTTON
-            btn_up = win32con.WM_LBUTTONUP
-        elif key == "middle":
-            btn_down = win32con.WM_MBUTTONDOWN
-            btn_mk = win32con.MK_MBUTTON
-            btn_up = win32con.WM_MBUTTONUP
-        else:
-            btn_down = win32con.WM_RBUTTONDOWN
-            btn_mk = win32con.MK_RBUTTON
-            btn_up = win32con.WM_RBUTTONUP
-        self.post(btn_down, btn_mk, click_pos
-                  )
-        time.sleep(down_time)
-        self.post(btn_up, 0, click_pos
-                  )
-        if x >= 0 and move_Cursor:
-            time.sleep(0.1)
-            SetCursorPos(self.cursor_position)
+        self.clicks([(x, y)], down_time=down_time, key=key)
+
+    def clicks(self, positions, interval=0.0, down_time=0.001, key="left"):
+        """
+        在一条时间线中依次点击多个窗口坐标 (x < 0 表示窗口中心), 点击之间间隔 interval 秒。
+        整批只激活一次窗口, 光标在最后一次点击后 0.1 秒才移回原位。
+        """
+        timeline = InputTimeline().activate()
+        at = 0.0
+        for x, y in positions:
+            if x < 0:
+                click_pos = win32api.MAKELONG(round(self.capture.width * 0.5), round(self.capture.height * 0.5))
+                timeline.button(click_pos, key, down_time, at)
+            else:
+                abs_x, abs_y = self.capture.get_abs_cords(x, y)
+                timeline.click(abs_x, abs_y, win32api.MAKELONG(x, y), key, down_time, at, restore_after=0.1)
+                at += 0.001
+            at += down_time + interval
+        return self.input_scheduler.run(timeline)
 
     def send(self, msg, wparam, lparam):
         win32gui.SendMessage(self.hwnd, msg, wparam, lparam)
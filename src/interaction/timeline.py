@@ -0,0 +1,220 @@
+"""Timed input batches (key / mouse / cursor events) dispatched through a pluggable backend."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+# 调度器支持的事件类型, 后端需要实现同名方法
+EVENT_KINDS = ('activate', 'key_down', 'key_up', 'mouse_move', 'set_cursor', 'cursor_save', 'cursor_restore',
+               'button_down', 'button_up')
+
+
+@dataclass(frozen=True)
+class InputEvent:
+    at: float
+    kind: str
+    args: tuple = ()
+
+
+class InputTimeline:
+    """
+    一批带时间偏移 (秒, 相对于开始执行的时刻) 的输入事件。各个 builder 方法返回 self, 可以链式调用;
+    同一时刻的事件按添加顺序执行。
+    """
+
+    def __init__(self):
+        self._events: list[tuple[float, int, InputEvent]] = []
+
+    def add(self, at: float, kind: str, *args) -> "InputTimeline":
+        if kind not in EVENT_KINDS:
+            raise ValueError(f'unknown input event {kind}')
+        self._events.append((at, len(self._events), InputEvent(at, kind, args)))
+        return self
+
+    @property
+    def events(self) -> list[InputEvent]:
+        return [event for _, _, event in sorted(self._events)]
+
+    @property
+    def duration(self) -> float:
+        return max((at for at, _, _ in self._events), default=0.0)
+
+    def activate(self, at: float = 0.0, settle: float = 0.0) -> "InputTimeline":
+        """激活窗口; 后端确实执行了激活时, 之后的事件整体推迟 settle 秒。"""
+        return self.add(at, 'activate', settle)
+
+    def press(self, keys, duration: float, at: float = 0.0) -> "InputTimeline":
+        """同时按下 keys, duration 秒后全部抬起。"""
+        for key in keys:
+            self.add(at, 'key_down', key)
+        for key in keys:
+            self.add(at + duration, 'key_up', key)
+        return self
+
+    def mouse_delta(self, dx: int, dy: int, steps: int = 1, interval: float = 0.0, at: float = 0.0) -> "InputTimeline":
+        """鼠标相对移动, 分 steps 次发送, 每次间隔 interval 秒。"""
+        steps = max(1, steps)
+        step_dx, step_dy = round(dx / steps), round(dy / steps)
+        for i in range(steps):
+            self.add(at + i * interval, 'mouse_move', step_dx, step_dy)
+        return self
+
+    def button(self, lparam, key: str = 'left', down_time: float = 0.001, at: float = 0.0) -> "InputTimeline":
+        """在窗口坐标 lparam 处发送鼠标按下/抬起消息, 不移动光标。"""
+        self.add(at, 'button_down', key, lparam)
+        return self.add(at + down_time, 'button_up', key, lparam)
+
+    def click(self, x: int, y: int, lparam, key: str = 'left', down_time: float = 0.001, at: float = 0.0,
+              restore_after: float | None = None) -> "InputTimeline":
+        """
+        移动光标到屏幕坐标 (x, y) 后发送按下/抬起消息; restore_after 不为 None 时在抬起后 restore_after 秒把光标移回原处。
+        """
+        if restore_after is not None:
+            self.add(at, 'cursor_save')
+        self.add(at, 'set_cursor', x, y)
+        self.button(lparam, key, down_time, at + 0.001)
+        if restore_after is not None:
+            self.add(at + 0.001 + down_time + restore_after, 'cursor_restore')
+        return self
+
+
+def coalesce(events: list[InputEvent]) -> list[InputEvent]:
+    """
+    去掉多余的事件:
+    - 同一批中窗口只需要激活一次;
+    - cursor_restore 之后紧接着 cursor_save (中间没有其他光标操作) 时两者都不需要, 光标在最后统一移回;
+    - 已经保存过且尚未恢复时再次 cursor_save 是多余的。
+    """
+    result: list[InputEvent] = []
+    activated = False
+    saved = False
+    for event in events:
+        if event.kind == 'activate':
+            if activated:
+                continue
+            activated = True
+        elif event.kind == 'cursor_save':
+            if saved:
+                continue
+            last_cursor = next((e for e in reversed(result) if e.kind in ('cursor_save', 'cursor_restore',
+                                                                          'set_cursor')), None)
+            if last_cursor is not None and last_cursor.kind == 'cursor_restore':
+                result.remove(last_cursor)
+                saved = True
+                continue
+            saved = True
+        elif event.kind == 'cursor_restore':
+            if not saved:
+                continue
+            saved = False
+        result.append(event)
+    return result
+
+
+@dataclass
+class DispatchReport:
+    """一次调度的统计: lateness 为每个事件实际执行时刻比计划晚的秒数, overhead 为后端调用本身的耗时。"""
+    events: int = 0
+    dropped: int = 0
+    lateness: list[float] = field(default_factory=list)
+    overhead: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def max_lateness(self) -> float:
+        return max(self.lateness, default=0.0)
+
+    @property
+    def mean_lateness(self) -> float:
+        return sum(self.lateness) / len(self.lateness) if self.lateness else 0.0
+
+    def summary(self) -> str:
+        return (f'{self.events} events ({self.dropped} coalesced) in {self.elapsed * 1000:.1f}ms, '
+                f'lateness mean {self.mean_lateness * 1e6:.0f}us max {self.max_lateness * 1e6:.0f}us, '
+                f'backend {self.overhead * 1000:.2f}ms')
+
+
+class InputScheduler:
+    """
+    按时间线执行输入事件。离下一个事件较远时用 sleep (默认 time.sleep, 任务中可传入 BaseTask.sleep 以响应暂停/停止),
+    最后 spin 秒内忙等, 使事件间隔精确到亚毫秒; 所有偏移都相对于开始时刻计算, 误差不会逐个累积。
+    clock 默认 time.perf_counter, 测试中可与 sleep 一起换成模拟时钟。
+    """
+
+    def __init__(self, backend, sleep=time.sleep, spin: float = 0.002, clock=time.perf_counter):
+        self.backend = backend
+        self.sleep = sleep
+        self.spin = spin
+        self.clock = clock
+        self.last_report: DispatchReport | None = None
+
+    def _wait_until(self, deadline: float):
+        remaining = deadline - self.clock()
+        if remaining > self.spin:
+            self.sleep(remaining - self.spin)
+        while self.clock() < deadline:
+            pass
+
+    def run(self, timeline: InputTimeline | list[InputEvent]) -> DispatchReport:
+        events = timeline.events if isinstance(timeline, InputTimeline) else sorted(timeline, key=lambda e: e.at)
+        merged = coalesce(events)
+        report = DispatchReport(events=len(merged), dropped=len(events) - len(merged))
+        start = self.clock()
+        delay = 0.0
+        for event in merged:
+            deadline = start + delay + event.at
+            self._wait_until(deadline)
+            before = self.clock()
+            report.lateness.append(max(0.0, before - deadline))
+            settle = getattr(self.backend, event.kind)(*event.args)
+            report.overhead += self.clock() - before
+            if event.kind == 'activate' and settle:
+                delay += settle
+        report.elapsed = self.clock() - start
+        self.last_report = report
+        return report
+
+
+class RecordingBackend:
+    """记录收到的事件及时刻的后端, 不发送任何输入, 用于测试和离线回放。"""
+
+    def __init__(self, activation_settle: float = 0.0, clock=time.perf_counter):
+        self.activation_settle = activation_settle
+        self.clock = clock
+        self.records: list[tuple[float, str, tuple]] = []
+
+    def _record(self, kind, *args):
+        self.records.append((self.clock(), kind, args))
+
+    def activate(self, settle=0.0):
+        self._record('activate', settle)
+        return min(settle, self.activation_settle)
+
+    def key_down(self, key):
+        self._record('key_down', key)
+
+    def key_up(self, key):
+        self._record('key_up', key)
+
+    def mouse_move(self, dx, dy):
+        self._record('mouse_move', dx, dy)
+
+    def set_cursor(self, x, y):
+        self._record('set_cursor', x, y)
+
+    def cursor_save(self):
+        self._record('cursor_save')
+
+    def cursor_restore(self):
+        self._record('cursor_restore')
+
+    def button_down(self, key, lparam):
+        self._record('button_down', key, lparam)
+
+    def button_up(self, key, lparam):
+        self._record('button_up', key, lparam)
+
+    @property
+    def kinds(self) -> list[str]:
+        return [kind for _, kind, _ in self.records]
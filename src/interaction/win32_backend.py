@@ -0,0 +1,85 @@
+"""Win32 backend for src.interaction.timeline (keybd_event / mouse_event / SetCursorPos / PostMessage)."""
+
+import ctypes
+
+import win32con
+import win32gui
+from win32api import GetCursorPos, SetCursorPos
+
+user32 = ctypes.windll.user32
+
+MOUSEEVENTF_MOVE = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+
+KEY_CODES = {
+    "w": 0x57,
+    "a": 0x41,
+    "s": 0x53,
+    "d": 0x44,
+}
+
+BUTTON_MESSAGES = {
+    "left": (win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, win32con.WM_LBUTTONUP),
+    "middle": (win32con.WM_MBUTTONDOWN, win32con.MK_MBUTTON, win32con.WM_MBUTTONUP),
+    "right": (win32con.WM_RBUTTONDOWN, win32con.MK_RBUTTON, win32con.WM_RBUTTONUP),
+}
+
+
+class Win32InputBackend:
+    """
+    hwnd: 游戏窗口句柄, 用于前台激活和按键/鼠标消息
+    interaction: 可选, PostMessageInteraction; 提供时激活使用它的 try_activate, 鼠标按键通过它的 post 发送
+    """
+
+    def __init__(self, hwnd, interaction=None):
+        self.hwnd = hwnd
+        self.interaction = interaction
+        self.cursor_position = None
+
+    def activate(self, settle=0.0):
+        if self.interaction is not None:
+            self.interaction.try_activate()
+            return 0.0
+        try:
+            # 只有不在前台才激活
+            if win32gui.GetForegroundWindow() != self.hwnd:
+                win32gui.ShowWindow(self.hwnd, 5)  # 5表示SW_SHOW，显示并激活窗口
+                win32gui.SetForegroundWindow(self.hwnd)
+                return settle
+        except Exception as e:
+            print("窗口激活失败:", e)
+        return 0.0
+
+    def key_down(self, key):
+        user32.keybd_event(KEY_CODES[key.lower()], 0, 0, 0)
+
+    def key_up(self, key):
+        user32.keybd_event(KEY_CODES[key.lower()], 0, KEYEVENTF_KEYUP, 0)
+
+    def mouse_move(self, dx, dy):
+        user32.mouse_event(MOUSEEVENTF_MOVE, dx, dy, 0, 0)
+
+    def set_cursor(self, x, y):
+        SetCursorPos((x, y))
+
+    def cursor_save(self):
+        self.cursor_position = GetCursorPos()
+
+    def cursor_restore(self):
+        if self.cursor_position is not None:
+            SetCursorPos(self.cursor_position)
+            self.cursor_position = None
+
+    def _post(self, msg, wparam, lparam):
+        if self.interaction is not None:
+            self.interaction.post(msg, wparam, lparam)
+        else:
+            win32gui.PostMessage(self.hwnd, msg, wparam, lparam)
+
+    def button_down(self, key, lparam):
+        down, mk, _ = BUTTON_MESSAGES.get(key, BUTTON_MESSAGES["right"])
+        self._post(down, mk, lparam)
+
+    def button_up(self, key, lparam):
+        _, _, up = BUTTON_MESSAGES.get(key, BUTTON_MESSAGES["right"])
+        self._post(up, 0, lparam)
@@ -0,0 +1 @@
+"""Camera / movement helpers used by the delivery and liaison navigation tasks."""
@@ -0,0 +1,144 @@
+"""Closed-loop camera alignment: online mouse gain estimate plus local target tracking between frames."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class TrackedTarget:
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float = 1.0
+
+    @property
+    def center(self) -> tuple[float, float]:
+        return self.x + self.width / 2, self.y + self.height / 2
+
+
+class AxisGain:
+    """
+    单个轴的增益估计: 鼠标移动 1 个单位, 目标在画面上反向移动 gain 个像素。
+    每次移动后用实际观测到的位移更新 (指数平均), 过小的移动和方向相反的观测 (跟踪错位) 不参与更新。
+    """
+
+    def __init__(self, initial: float = 1.0, smoothing: float = 0.6, min_gain: float = 0.05, max_gain: float = 20.0,
+                 min_command: int = 8):
+        self.gain = initial
+        self.smoothing = smoothing
+        self.min_gain = min_gain
+        self.max_gain = max_gain
+        self.min_command = min_command
+        self.samples = 0
+
+    def observe(self, command: float, shift: float) -> bool:
+        if abs(command) < self.min_command:
+            return False
+        measured = -shift / command
+        if measured <= 0:
+            return False
+        measured = min(self.max_gain, max(self.min_gain, measured))
+        if self.samples == 0:
+            self.gain = measured
+        else:
+            self.gain += (measured - self.gain) * self.smoothing
+        self.samples += 1
+        return True
+
+
+class VisualServo:
+    """
+    把目标中心对准画面中心的比例控制器:
+    - command: 误差 / 估计增益 * damping 得到鼠标位移, 未得到任何增益观测前最多移动 probe_step, 之后最多 max_step;
+    - predict: 按当前增益预测移动后目标所在的位置, 供下一帧在附近局部跟踪;
+    - observe: 用跟踪到的实际位移更新两个轴的增益。
+    """
+
+    def __init__(self, tolerance: float = 50, initial_gain: float = 1.0, damping: float = 0.85,
+                 probe_step: int = 100, max_step: int = 600, mouse_steps: int = 3):
+        self.tolerance = tolerance
+        self.damping = damping
+        self.probe_step = probe_step
+        self.max_step = max_step
+        self.mouse_steps = mouse_steps
+        self.gain_x = AxisGain(initial_gain)
+        self.gain_y = AxisGain(initial_gain)
+
+    @staticmethod
+    def error(target_center, screen_center) -> tuple[float, float]:
+        return target_center[0] - screen_center[0], target_center[1] - screen_center[1]
+
+    def converged(self, target_center, screen_center) -> bool:
+        dx, dy = self.error(target_center, screen_center)
+        return abs(dx) <= self.tolerance and abs(dy) <= self.tolerance
+
+    def _axis_command(self, error: float, axis: AxisGain) -> int:
+        limit = self.max_step if axis.samples else self.probe_step
+        command = error / axis.gain * self.damping
+        command = max(-limit, min(limit, command))
+        # active_and_send_mouse_delta 分 mouse_steps 次发送, 每次取整, 这里返回实际会发出的总量
+        return round(command / self.mouse_steps) * self.mouse_steps
+
+    def command(self, target_center, screen_center) -> tuple[int, int]:
+        dx, dy = self.error(target_center, screen_center)
+        return self._axis_command(dx, self.gain_x), self._axis_command(dy, self.gain_y)
+
+    def predict(self, target: TrackedTarget, command: tuple[int, int]) -> TrackedTarget:
+        return TrackedTarget(round(target.x - command[0] * self.gain_x.gain),
+                             round(target.y - command[1] * self.gain_y.gain),
+                             target.width, target.height, target.score)
+
+    def search_margin(self, command: tuple[int, int], base: int) -> int:
+        """局部跟踪的搜索半径: 增益未知时预测误差可能与移动量相当, 之后只需覆盖增益估计的残余误差。"""
+        uncertainty = 0.0
+        for axis, value in ((self.gain_x, command[0]), (self.gain_y, command[1])):
+            if axis.samples:
+                uncertainty = max(uncertainty, abs(value) * axis.gain * 0.3)
+            else:
+                uncertainty = max(uncertainty, abs(value) * axis.max_gain / 4)
+        return base + round(uncertainty)
+
+    def observe(self, before: TrackedTarget, after: TrackedTarget, command: tuple[int, int]):
+        bx, by = before.center
+        ax, ay = after.center
+        self.gain_x.observe(command[0], ax - bx)
+        self.gain_y.observe(command[1], ay - by)
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        return cv2.cvtColor(np.ascontiguousarray(image[..., :3]), cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def crop_template(frame: np.ndarray, target: TrackedTarget) -> np.ndarray | None:
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, target.x), max(0, target.y)
+    x2, y2 = min(w, target.x + target.width), min(h, target.y + target.height)
+    if x2 - x1 < 4 or y2 - y1 < 4:
+        return None
+    return _gray(frame[y1:y2, x1:x2]).copy()
+
+
+def track_local(frame: np.ndarray, template: np.ndarray | None, predicted: TrackedTarget, margin: int,
+                threshold: float = 0.75) -> TrackedTarget | None:
+    """只在预测位置周围 margin 像素内匹配上一帧裁下的目标图, 代替整屏的 find_feature / OCR。"""
+    if frame is None or template is None:
+        return None
+    h, w = frame.shape[:2]
+    th, tw = template.shape[:2]
+    x1, y1 = max(0, predicted.x - margin), max(0, predicted.y - margin)
+    x2, y2 = min(w, predicted.x + tw + margin), min(h, predicted.y + th + margin)
+    if x2 - x1 < tw or y2 - y1 < th:
+        return None
+    result = cv2.matchTemplate(_gray(frame[y1:y2, x1:x2]), template, cv2.TM_CCOEFF_NORMED)
+    np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    if max_val < threshold:
+        return None
+    return TrackedTarget(x1 + max_loc[0], y1 + max_loc[1], tw, th, max_val)
@@ -0,0 +1 @@
+"""Auto pick (自动拾取) related features (prompt keyword matching)."""
@@ -0,0 +1,108 @@
+"""Pick prompt keyword lists (loaded from CSV) compiled into a single regex."""
+
+from __future__ import annotations
+
+import csv
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+WHITE = 'white'
+BLACK = 'black'
+
+# CSV 中的类别名 -> 内部类别; 顺序即优先级, 同一行提示同时包含黑名单和白名单关键词时按黑名单处理
+CATEGORIES = {
+    '黑名单': BLACK,
+    '白名单': WHITE,
+}
+
+DEFAULT_KEYWORDS_CSV = Path('assets') / 'pick_keywords.csv'
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    keyword: str
+    category: str
+
+
+def load_pick_keywords(csv_path: str | Path) -> dict[str, list[str]]:
+    """读取 关键词,类别 两列的 CSV, 返回 {类别: [关键词]}, 未知类别和空行忽略。"""
+    path = Path(csv_path)
+    keywords: dict[str, list[str]] = {category: [] for category in CATEGORIES.values()}
+    if not path.exists():
+        return keywords
+
+    with path.open('r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if not row:
+                continue
+            normalized = {str(k).strip(): (str(v).strip() if v is not None else '') for k, v in row.items() if k}
+            keyword = normalized.get('关键词', '')
+            category = CATEGORIES.get(normalized.get('类别', ''))
+            if keyword and category and keyword not in keywords[category]:
+                keywords[category].append(keyword)
+    return keywords
+
+
+def _trie_pattern(words) -> str:
+    """把关键词按公共前缀合并成正则 (如 采集|采药 -> 采(?:集|药)), 匹配时每个位置只沿一条前缀分支比较。"""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # 贪婪的 ? 先尝试更长的关键词, 失败时保留较短关键词本身的匹配
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    把各类别的关键词编译成一个正则: ^(?=.*?(?P<c0>...))|^(?=.*?(?P<c1>...))|...
+    一次 search 即可按类别优先级找到命中的关键词和类别, 每个类别的关键词用前缀树合并,
+    关键词再多, 每个字符位置也只需比较共同前缀, 不再逐个关键词做子串查找。
+    """
+
+    def __init__(self, keywords: dict[str, list[str]]):
+        self.keywords = {category: list(words) for category, words in keywords.items()}
+        self._groups: dict[str, str] = {}
+        alternatives = []
+        for i, (category, words) in enumerate(self.keywords.items()):
+            words = [w for w in words if w]
+            if not words:
+                continue
+            group = f'c{i}'
+            self._groups[group] = category
+            alternatives.append(f'^(?=.*?(?P<{group}>{_trie_pattern(words)}))')
+        self.pattern = re.compile('|'.join(alternatives), re.S) if alternatives else None
+
+    @classmethod
+    def from_csv(cls, csv_path: str | Path) -> "KeywordMatcher":
+        return cls(load_pick_keywords(csv_path))
+
+    def match(self, text: str) -> KeywordMatch | None:
+        if self.pattern is None or not text:
+            return None
+        m = self.pattern.search(text)
+        if m is None:
+            return None
+        for group, category in self._groups.items():
+            keyword = m.group(group)
+            if keyword is not None:
+                return KeywordMatch(keyword, category)
+        return None
+
+    def category(self, text: str) -> str | None:
+        matched = self.match(text)
+        return matched.category if matched else None
@@ -0,0 +1 @@
+"""Screen (界面) identification shared by the login / world helpers."""
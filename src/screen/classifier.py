@@ -0,0 +1,114 @@
+"""Classify the current screen (world / login popup / reward / check-in) from one frame."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+from ok import Box
+
+from src.image.feature_window import match_in_window, search_window
+
+
+class Screen(Enum):
+    WORLD = 'world'
+    LOGIN_POPUP = 'login_popup'
+    REWARD = 'reward'
+    CHECK_IN = 'check_in'
+    UNKNOWN = 'unknown'
+
+
+@dataclass(frozen=True)
+class ScreenFeature:
+    name: str
+    threshold: float = 0
+    horizontal_variance: float = 0
+    vertical_variance: float = 0
+
+
+# 识别各界面用到的特征, 参数与原先各处 find_one 的调用一致
+SCREEN_FEATURES: dict[str, ScreenFeature] = {f.name: f for f in (
+    ScreenFeature('esc'),
+    ScreenFeature('b'),
+    ScreenFeature('c'),
+    ScreenFeature('top_left_tab'),
+    ScreenFeature('monthly_card'),
+    ScreenFeature('logout'),
+    ScreenFeature('reward_ok', horizontal_variance=0.1, vertical_variance=0.1),
+    ScreenFeature('one_click_claim', horizontal_variance=0.1, vertical_variance=0.1),
+    ScreenFeature('check_in_close', threshold=0.75, horizontal_variance=0.1, vertical_variance=0.1),
+)}
+
+# 判断顺序即优先级 (与 wait_login 原先的判断顺序一致); all=True 表示需要全部特征同时出现
+SCREEN_RULES: tuple[tuple[Screen, tuple[str, ...], bool], ...] = (
+    (Screen.WORLD, ('esc', 'b', 'c'), True),
+    (Screen.LOGIN_POPUP, ('monthly_card', 'logout'), False),
+    (Screen.REWARD, ('reward_ok', 'one_click_claim'), False),
+    (Screen.CHECK_IN, ('check_in_close',), False),
+)
+
+
+class ScreenState:
+    """
+    单帧的界面识别结果。每个特征在同一帧上最多匹配一次并缓存, in_world / wait_login / is_main /
+    in_combat_world 共用同一份结果; screen 按 SCREEN_RULES 的优先级逐个匹配, 命中即停止。
+    各特征的搜索范围分散在整个画面上, 每个模板本来就只在自己的窗口里匹配一次, 合并成一次批量匹配省不下模板匹配,
+    反而要多匹配本可以跳过的模板, 所以这里按需匹配, 没有识别出界面时匹配次数不超过原先 wait_login 的逐个 find_one。
+    """
+
+    def __init__(self, feature_set, frame: np.ndarray):
+        self.feature_set = feature_set
+        self.frame = frame
+        self.matches: dict[str, Box | None] = {}
+        self._screen: tuple[Screen, Box | None] | None = None
+
+    def match(self, name: str) -> Box | None:
+        if name in self.matches:
+            return self.matches[name]
+        box = None
+        spec = SCREEN_FEATURES.get(name, ScreenFeature(name))
+        if self.frame is not None:
+            feature = self.feature_set.get_feature_by_name(self.frame, name)
+            if feature is not None:
+                window = search_window(self.feature_set, feature, spec.horizontal_variance, spec.vertical_variance)
+                box = match_in_window(self.frame[..., :3], feature, window,
+                                      spec.threshold or self.feature_set.default_threshold, name)
+        self.matches[name] = box
+        return box
+
+    def _classify(self) -> tuple[Screen, Box | None]:
+        if self._screen is None:
+            self._screen = (Screen.UNKNOWN, None)
+            for screen, names, require_all in SCREEN_RULES:
+                if require_all:
+                    box = None
+                    for name in names:
+                        box = self.match(name)
+                        if not box:
+                            break
+                    if box:
+                        self._screen = (screen, self.matches[names[0]])
+                        break
+                else:
+                    box = next((b for b in (self.match(name) for name in names) if b), None)
+                    if box:
+                        self._screen = (screen, box)
+                        break
+        return self._screen
+
+    @property
+    def screen(self) -> Screen:
+        return self._classify()[0]
+
+    @property
+    def box(self) -> Box | None:
+        """识别出该界面的特征框 (WORLD 为 esc 图标, 弹窗为需要点击的按钮)。"""
+        return self._classify()[1]
+
+    def evaluate(self) -> "ScreenState":
+        """一次匹配全部界面特征。"""
+        for name in SCREEN_FEATURES:
+            self.match(name)
+        self._classify()
+        return self
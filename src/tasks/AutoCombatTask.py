@@ -1,9 +1,20 @@
 import re
 import time
+from pathlib import Path
+
 import cv2
 import numpy as np
 from qfluentwidgets import FluentIcon
 from ok import TriggerTask, Logger
+from src.combat.bar_outline import BarOutlineDetector
+from src.combat.hud_matcher import HudMatcher
+from src.combat.lv_badge import has_lv_badge
+from src.combat.perception import PerceptionWorker
+from src.combat.rotation import SkillRotation
+from src.combat.skill_bar import SkillBarLayout, analyze_skill_bar
+from src.combat.state import CombatState
+from src.combat.telemetry import CombatTelemetry
+from src.trigger.scheduler import AdaptiveTrigger
 from src.tasks.BaseEfTask import BaseEfTask
 
 logger = Logger.get_logger(__name__)
@@ -20,37 +31,74 @@ class AutoCombatTask(BaseEfTask, TriggerTask):
         self.default_config.update({
             "技能释放": "123",
             "启动技能点数": 2,
-            "后台结束战斗通知": True
+            "技能间隔(秒)": 1.0,
+            "后台结束战斗通知": True,
+            "并行感知": False,
+            "感知状态最大延迟(秒)": 0.15,
+            "战斗耗时统计": False,
         })
         self.config_description.update({
             "技能释放": "满技能时, 开始释放技能, 如123, 建议只放3个技能",
             "启动技能点数": "当技能点达到该数值时，开始执行技能序列, 1-3",
+            "技能间隔(秒)": "技能序列中两次技能释放之间的最短间隔",
+            "并行感知": "战斗中用独立线程持续识别战斗状态, 操作线程直接使用最新结果, 减少按键反应延迟",
+            "感知状态最大延迟(秒)": "并行感知时, 超过该时间的识别结果视为过期, 改为当前帧同步识别",
+            "战斗耗时统计": "统计每轮战斗循环各阶段耗时(p50/p95/p99)并显示, 战斗结束时导出CSV到logs/combat",
         })
         self.lv_regex = re.compile(r"(?i)lv|\d{2}")
         self.last_op_time = 0
-        self.last_skill_time = 0
+        # 最近一次发送按键/点击的时间, 并行感知时早于它截图的状态视为过期
+        self._last_input_time = 0.0
+        self._skill_bar_layouts = {}
+        self._combat_state = None
+        self._perception = None
+        self._hud_matcher = None
+        self._bar_outline = BarOutlineDetector()
+        # 进入战斗的反应速度优先, 退避间隔最多 0.3 秒
+        self.adaptive_trigger = AdaptiveTrigger(max_interval=0.3)
+        self.telemetry = CombatTelemetry(enabled=False)
+        self.telemetry_folder = Path('logs') / 'combat'
+        self._last_telemetry_info = 0
 
     def run(self):
         if not self.in_combat(required_yellow=1):
+            if self.combat_state.skill_bar_count >= 0:
+                # 技能条已出现, 即将进入战斗, 恢复全速检测
+                self.adaptive_trigger.hit()
+            else:
+                self.adaptive_trigger.miss()
             return
 
-        raw_skill_config = self.config.get("技能释放", "123")
-        start_trigger_count = self.config.get("启动技能点数", 2)
-        skill_sequence = self._parse_skill_sequence(raw_skill_config)
+        if self.config.get("并行感知"):
+            self._perception = PerceptionWorker(self, capture=self.executor.method.get_frame)
+            self._perception.start()
+        self.telemetry.enabled = bool(self.config.get("战斗耗时统计"))
+        self.telemetry.reset()
+        try:
+            self.combat_loop()
+        finally:
+            if self._perception is not None:
+                self._perception.stop()
+                self.log_debug(f"perception worker stopped after {self._perception.frames} frames")
+                self._perception = None
+            self._dump_telemetry()
+
+    def combat_loop(self):
+        rotation = self.build_rotation()
 
         if self.debug:
-            self.screenshot('enter_combat')
+            self.screenshot('enter_combat', frame=self.combat_state.frame)
 
         self.click(key='middle')
 
         while True:
-            # Check combat status and resource
-            skill_count = self.get_skill_bar_count()
+            self._tick_telemetry()
+            state = self.combat_state
 
             # Exit condition
-            if skill_count < 0 and (self.ocr_lv() or not self.in_team()):
+            if state.combat_ended():
                 if self.debug:
-                    self.screenshot('out_of_combat')
+                    self.screenshot('out_of_combat', frame=state.frame)
                 self.log_info("自动战斗结束!", notify=self.config.get("后台结束战斗通知") and self.in_bg())
                 break
 
@@ -58,61 +106,78 @@ class AutoCombatTask(BaseEfTask, TriggerTask):
             if self.use_e_skill() or self.use_ult():
                 continue
 
-            # Logic: If we meet the start trigger, we execute the ENTIRE sequence
-            if skill_count >= start_trigger_count:
-                self.log_debug(f"Triggering sequence at {skill_count} points")
-
-                # Execute the full sequence
-                for skill_key in skill_sequence:
-                    # Break loop if combat ends mid-sequence
-                    if not self.in_combat():
-                        break
-
-                    # Wait for conditions: 1. Enough Points (1), 2. Skill Cooldown (1s)
-                    # While waiting, we perform normal attacks (weave)
-                    while True:
-                        current_points = self.get_skill_bar_count()
-                        time_since_last_skill = time.time() - self.last_skill_time
-
-                        # Break condition: Have point AND cooldown ready
-                        if current_points >= 1 and time_since_last_skill >= 1.0:
-                            break
-
-                        # High priority interrupts inside the wait loop
-                        if self.use_e_skill() or self.use_ult():
-                            continue
-
-                        # If combat ended
-                        if current_points < 0 and (self.ocr_lv() or not self.in_team()):
-                            break
+            # 技能条短暂识别不到时中断当前一轮, 与原先序列执行中 in_combat 失败即退出一致
+            if not state.in_combat():
+                rotation.reset()
 
-                        self.perform_attack_weave()
-                        self.sleep(0.05)
-
-                    # Double check combat didn't end during the wait loop
-                    if not self.in_combat():
-                        break
-
-                    # Execute the skill
+            skill_key = rotation.next_skill(state.skill_bar_count, time.time())
+            if skill_key is not None:
+                with self.telemetry.measure('action'):
                     self.send_key(skill_key)
-                    self.last_skill_time = time.time()
-                    self.last_op_time = time.time()  # Update op time to prevent immediate click
-                    self.log_debug(f"Used skill {skill_key}")
-
-                self.log_debug("Sequence finished, returning to charge mode")
-
+                now = time.time()
+                rotation.on_cast(skill_key, now)
+                self.last_op_time = now  # Update op time to prevent immediate click
+                self.log_debug(f"Used skill {skill_key} at {state.skill_bar_count} points")
             else:
-                # Charging phase: Just attack
+                # Charging phase or waiting for points/cooldown: weave normal attacks
                 self.perform_attack_weave()
 
             self.sleep(0.05)
 
+    def build_rotation(self) -> SkillRotation:
+        """根据配置生成技能循环: 技能点达到启动点数后按配置顺序各放一次, 两次技能之间至少间隔技能间隔秒。"""
+        skill_sequence = self._parse_skill_sequence(self.config.get("技能释放", "123"))
+        return SkillRotation.from_sequence(skill_sequence,
+                                           start_points=self.config.get("启动技能点数", 2),
+                                           global_cooldown=self.config.get("技能间隔(秒)", 1.0))
+
     def perform_attack_weave(self):
         """Performs a normal attack if the 0.3s operation interval permits."""
         if time.time() - self.last_op_time > 0.3:
-            self.click(move=False)
+            with self.telemetry.measure('action'):
+                self.click(move=False)
             self.last_op_time = time.time()
 
+    def sleep(self, timeout):
+        with self.telemetry.measure('sleep'):
+            return super().sleep(timeout)
+
+    def send_key(self, key, *args, **kwargs):
+        self._last_input_time = time.time()
+        return super().send_key(key, *args, **kwargs)
+
+    def send_key_down(self, key, *args, **kwargs):
+        self._last_input_time = time.time()
+        return super().send_key_down(key, *args, **kwargs)
+
+    def send_key_up(self, key, *args, **kwargs):
+        self._last_input_time = time.time()
+        return super().send_key_up(key, *args, **kwargs)
+
+    def click(self, *args, **kwargs):
+        self._last_input_time = time.time()
+        return super().click(*args, **kwargs)
+
+    def _tick_telemetry(self):
+        """结束上一轮循环的计时, 每秒刷新一次状态栏中的 p50/p95/p99。"""
+        if not self.telemetry.enabled:
+            return
+        self.telemetry.end_iteration()
+        if time.time() - self._last_telemetry_info >= 1:
+            self._last_telemetry_info = time.time()
+            for stage, text in self.telemetry.summary().items():
+                self.info_set(f'耗时 {stage}', text)
+
+    def _dump_telemetry(self):
+        if not self.telemetry.enabled or not self.telemetry.iterations:
+            return
+        path = self.telemetry_folder / time.strftime('combat_%Y%m%d_%H%M%S.csv')
+        try:
+            self.telemetry.dump_csv(path)
+            self.log_info(f"战斗耗时统计已导出: {path} ({self.telemetry.iterations} 轮)")
+        except OSError as e:
+            self.log_error(f"战斗耗时统计导出失败: {path}", e)
+
     def _parse_skill_sequence(self, raw_config: str) -> list[str]:
         if not raw_config:
             return []
@@ -124,16 +189,56 @@ class AutoCombatTask(BaseEfTask, TriggerTask):
                 sequence.append(char)
         return sequence if sequence else ['1', '2', '3']
 
+    @property
+    def combat_state(self) -> CombatState:
+        """
+        当前帧的战斗状态快照, 帧变化(next_frame/sleep/按键后重新截图)时自动重建。
+        开启并行感知时使用感知线程发布的最新状态, 按键之前截图的状态不用, 最多等一个延迟上限让感知线程给出新状态;
+        仍然没有时才在截图锁下同步识别, 不与感知线程同时截图。
+        """
+        if self._perception is not None:
+            max_age = self.config.get("感知状态最大延迟(秒)", 0.15)
+            state = self._perception.wait_latest(max_age, not_before=self._last_input_time, timeout=max_age)
+            if state is not None:
+                return state
+            with self._perception.capture_lock:
+                frame = self.frame
+        else:
+            frame = self.frame
+        if self._combat_state is None or self._combat_state.frame is not frame:
+            self._combat_state = CombatState(self, frame)
+        return self._combat_state
+
+    def next_frame(self):
+        self._combat_state = None
+        return super().next_frame()
+
     def use_ult(self):
-        ults = ['1', '2', '3', '4']
-        for ult in ults:
-            if self.find_one("ult_" + ult):
+        ult = self.combat_state.ready_ult
+        if ult:
+            with self.telemetry.measure('action'):
                 self.send_key_down(ult)
-                self.wait_until(lambda: not self.in_combat())
-                self.send_key_up(ult)
-                self.wait_in_combat(time_out=8)
-                self.last_op_time = time.time()
+            self.wait_combat_state(lambda: not self.in_combat())
+            self.send_key_up(ult)
+            self.wait_in_combat(time_out=8)
+            self.last_op_time = time.time()
+            return True
+        return False
+
+    def wait_combat_state(self, condition, time_out=0):
+        """
+        等待战斗状态满足 condition。开启并行感知时只读取感知线程的结果, 不走 wait_until (它会在操作线程上截图);
+        time_out 为 0 时与 wait_until 一样使用框架的默认超时。
+        """
+        if self._perception is None:
+            return self.wait_until(condition, time_out=time_out)
+        if time_out == 0:
+            time_out = self.executor.wait_scene_timeout
+        start = time.time()
+        while time.time() - start < time_out:
+            if condition():
                 return True
+            self.sleep(0.02)
         return False
 
     def wait_in_combat(self, time_out=3, click=False):
@@ -147,115 +252,85 @@ class AutoCombatTask(BaseEfTask, TriggerTask):
                 self.sleep(0.1)
 
     def ocr_lv(self):
-        lv = self.ocr(0.02, 0.89, 0.23, 0.93, match=self.lv_regex, name='lv_text')
-        if len(lv) > 0:
-            return True
-        lv = self.ocr(0.02, 0.89, 0.23, 0.93, frame_processor=isolate_white_text_to_black, match=self.lv_regex,
-                      name='lv_text')
-        return len(lv) > 0
+        return self.combat_state.lv_visible
 
     def use_e_skill(self):
-        if self.find_one('skill_e', threshold=0.7):
-            self.send_key('e')
+        if self.combat_state.e_ready:
+            with self.telemetry.measure('action'):
+                self.send_key('e')
             self.last_op_time = time.time()
             return True
         return False
 
     def in_combat(self, required_yellow=0):
-        return self.get_skill_bar_count() >= required_yellow and self.in_team() and not self.ocr_lv()
+        return self.combat_state.in_combat(required_yellow)
 
     def in_team(self):
-        return self.find_one('skill_1') and self.find_one('skill_2') and self.find_one('skill_3') and self.find_one(
-            'skill_4')
+        return self.combat_state.in_team
 
     def get_skill_bar_count(self):
+        return self.combat_state.skill_bar_count
+
+    def detect_lv(self, frame):
+        # 先用二值化字形检测筛选, 只有疑似出现 Lv 标识时才跑 OCR 确认
+        lv_box = self.box_of_screen(0.02, 0.89, 0.23, 0.93, name='lv_text')
+        with self.telemetry.measure('lv_glyph'):
+            if not has_lv_badge(lv_box.crop_frame(frame)):
+                return False
+        with self.telemetry.measure('ocr_lv'):
+            return self.ocr_lv_text(frame)
+
+    def ocr_lv_text(self, frame):
+        # 感知线程里调用, 用 ocr_frame 只做 OCR, 不碰 executor 的暂停/当前帧
+        lv_box = self.box_of_screen(0.02, 0.89, 0.23, 0.93, name='lv_text')
+        if self.ocr_frame(frame, lv_box, match=self.lv_regex):
+            return True
+        return len(self.ocr_frame(frame, lv_box, frame_processor=isolate_white_text_to_black, match=self.lv_regex)) > 0
+
+    def detect_hud_icons(self, frame):
+        """一次裁剪技能 HUD, 批量匹配 skill_1..4 / ult_1..4 / skill_e。"""
+        if self._hud_matcher is None:
+            self._hud_matcher = HudMatcher(self.executor.feature_set)
+        with self.telemetry.measure('hud_match'):
+            return self._hud_matcher.match(frame)
+
+    def detect_skill_bar_count(self, frame):
         skill_area_box = self.box_of_screen_scaled(3840, 2160, 1586, 1940, 2266, 1983)
         # self.draw_boxes('skill_area', skill_area_box, color='yellow', debug=True)
         # self.log_debug(f'skill_area_box {skill_area_box}')
-        skill_area = skill_area_box.crop_frame(self.frame)
+        skill_area = skill_area_box.crop_frame(frame)
         # self.screenshot('skill_area', frame=skill_area)
-        if not has_rectangles(skill_area):
-            return -1
+        with self.telemetry.measure('has_rectangles'):
+            if not self._bar_outline(skill_area):
+                return -1
 
-        count = 0
-        y_start, y_end = 1958, 1970
+        with self.telemetry.measure('color_probe'):
+            return analyze_skill_bar(skill_area, self._skill_bar_layout(skill_area_box)).count
 
+    def _skill_bar_layout(self, skill_area_box):
+        """把 4K 坐标下的三段技能条和左侧白色标记换算成 HUD 裁剪图内的相对坐标, 按分辨率缓存。"""
+        key = (self.width, self.height)
+        layout = self._skill_bar_layouts.get(key)
+        if layout is not None:
+            return layout
+
+        y_start, y_end = 1958, 1970
         bars = [
             (1604, 1796),
             (1824, 2013),
             (2043, 2231)
         ]
 
-        for x1, x2 in bars:
-            if self.check_is_pure_color_in_4k(x1, y_start, x2, y_end, yellow_skill_color):
-                count += 1
-            else:
-                break
+        def relative(x1, x2):
+            box = self.box_of_screen_scaled(3840, 2160, x1, y_start, x2, y_end)
+            return (box.x - skill_area_box.x, box.x + box.width - skill_area_box.x), (
+                box.y - skill_area_box.y, box.y + box.height - skill_area_box.y)
 
-        if count == 0:
-            has_white_left = self.check_is_pure_color_in_4k(1604, y_start, 1614, y_end, white_skill_color,
-                                                            threshold=0.1)
-            if not has_white_left:
-                count = -1
-        return count
-
-    def check_is_pure_color_in_4k(self, x1, y1, x2, y2, color_range=None, threshold=0.9):
-        skill_area_box = self.box_of_screen_scaled(3840, 2160, x1, y1, x2, y2)
-        bar = skill_area_box.crop_frame(self.frame)
-
-        if bar.size == 0:
-            return False
-
-        height, width, _ = bar.shape
-        consecutive_matches = 0
-
-        for i in range(height):
-            row_pixels = bar[i]
-            unique_colors, counts = np.unique(row_pixels, axis=0, return_counts=True)
-            most_frequent_index = np.argmax(counts)
-            dominant_count = counts[most_frequent_index]
-            dominant_color = unique_colors[most_frequent_index]
-
-            is_valid_row = (dominant_count / width) >= threshold
-
-            if is_valid_row and color_range:
-                b, g, r = dominant_color
-                if not (color_range['r'][0] <= r <= color_range['r'][1] and
-                        color_range['g'][0] <= g <= color_range['g'][1] and
-                        color_range['b'][0] <= b <= color_range['b'][1]):
-                    is_valid_row = False
-
-            if is_valid_row:
-                consecutive_matches += 1
-                if consecutive_matches >= 2:
-                    return True
-            else:
-                consecutive_matches = 0
-
-        return False
-
-
-def has_rectangles(frame):
-    if frame is None:
-        return False
-
-    original_h, original_w = frame.shape[:2]
-    scale_factor = 4
-    resized = cv2.resize(frame, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_CUBIC)
-    gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 100)
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-    closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
-    contours, _ = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    min_width = (original_w * scale_factor) * 0.25
-
-    for cnt in contours:
-        x, y, w, h = cv2.boundingRect(cnt)
-        if w > min_width and w > h and h > 10:
-            return True
-
-    return False
+        bar_spans = tuple(relative(x1, x2)[0] for x1, x2 in bars)
+        white_span, row_span = relative(1604, 1614)
+        layout = SkillBarLayout(bar_spans=bar_spans, white_span=white_span, row_span=row_span)
+        self._skill_bar_layouts[key] = layout
+        return layout
 
 
 lower_white_none_inclusive = np.array([222, 222, 222], dtype=np.uint8)
@@ -266,16 +341,3 @@ def isolate_white_text_to_black(cv_image):
     match_mask = cv2.inRange(cv_image, black, lower_white_none_inclusive)
     output_image = cv2.cvtColor(match_mask, cv2.COLOR_GRAY2BGR)
     return output_image
-
-
-yellow_skill_color = {
-    'r': (230, 255),
-    'g': (180, 255),
-    'b': (0, 85)
-}
-
-white_skill_color = {
-    'r': (190, 255),
-    'g': (190, 255),
-    'b': (190, 255)
-}
@@ -7,6 +7,8 @@ logger = Logger.get_logger(__name__)
 
 
 class AutoLoginTask(BaseEfTask, TriggerTask):
+    gate_features = (('esc', 0, 0), ('b', 0, 0), ('c', 0, 0), ('monthly_card', 0, 0), ('logout', 0, 0),
+                     ('reward_ok', 0.1, 0.1), ('one_click_claim', 0.1, 0.1), ('check_in_close', 0.1, 0.1))
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -18,6 +20,11 @@ class AutoLoginTask(BaseEfTask, TriggerTask):
 
     def run(self):
         if self._logged_in:
+            self.adaptive_trigger.miss()
             return
-        else:
-            return self.wait_login()
+        if self.roi_gate_unchanged():
+            return
+        result = self.wait_login()
+        if result is None:
+            self.roi_gate_negative()
+        return result
@@ -1,16 +1,18 @@
 import time
 
-import cv2
-import numpy as np
 from qfluentwidgets import FluentIcon
 
 from ok import Logger, TriggerTask
+from src.image.color_probe import ColorProbe, grayscale_fraction
+from src.image.ocr_cache import OcrCache
+from src.pick.keywords import BLACK, DEFAULT_KEYWORDS_CSV, WHITE, KeywordMatcher
 from src.tasks.BaseEfTask import BaseEfTask
 
 logger = Logger.get_logger(__name__)
 
 
 class AutoPickTask(BaseEfTask, TriggerTask):
+    gate_features = (('top_left_tab', 0, 0), ('pick_f', 0, 0.05))
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -20,43 +22,56 @@ class AutoPickTask(BaseEfTask, TriggerTask):
         self.default_config = {'_enabled': True}
         self.last_box_name = None
         self.last_pick_time = 0
-        self.white_list = {'采集', '萤壳虫', '打开', '荞花', '灰芦麦', '灼壳虫', '苦叶椒', "柱状菌", "酮化灌木",
-                           '柑实', "触碰", '激活', '芽针', '多齿叶', '砂叶'
-                           }
-        self.black_list = {
-            '协议核心', '激活箱子'
-        }
+        self.default_config.update({
+            "_拾取关键词CSV": str(DEFAULT_KEYWORDS_CSV),
+        })
+        self._keyword_matcher = None
+        self._keyword_csv = None
+        # 提示文字区域大部分是游戏世界背景, 相近指纹可能是另一条提示, 只复用指纹完全相同的结果
+        self.ocr_cache = OcrCache(max_distance=0)
 
     def run(self):
+        if self.roi_gate_unchanged():
+            return
         if self.in_combat_world():
+            last_names = None
+            found_f = False
             while button_f := self.find_f():
+                found_f = True
                 text_zone = button_f.copy(x_offset=button_f.width * 6, width_offset=button_f.width * 12,
                                           y_offset=-button_f.height, height_offset=button_f.height * 12)
-                texts = self.wait_ocr(box=text_zone)
+                texts = self.ocr_text_zone(text_zone)
                 if not texts:
                     self.log_error('pick can not ocr texts')
                     return
 
-                if any(text in texts[0].name for text in self.black_list):
+                names = [text.name for text in texts]
+                if names == last_names:
+                    # 批量拾取后提示列表没有变化, 不再重复按 F
                     return
+                kinds = [self.classify_prompt(name) for name in names]
 
-                if any(text in texts[0].name for text in self.white_list):
+                if WHITE in kinds:
                     if self.debug:
                         self.screenshot('pick')
-                    self.log_debug('pick white_list {}'.format(texts[0].name))
-                    self.pick()
+                    self.log_debug(f'pick white_list {[n for n, k in zip(names, kinds) if k == WHITE]} in {names}')
+                    self.run_pick_actions(plan_pick_actions(kinds))
+                    last_names = names
                     self.sleep(0.2)
+                    continue
+
+                if kinds[0] == BLACK:
                     return
-                start = time.time()
+                deadline = time.time() + 0.3
                 icon_zone = button_f.copy(x_offset=button_f.width * 3.3, width_offset=button_f.width * 0.8,
                                           y_offset=-button_f.height * 0.2, height_offset=button_f.height * 0.85,
                                           name='choice')
-                white_percent = 0
-                while time.time() - start < 0.3:
-                    white_percent = self.calculate_color_percentage(white_color, icon_zone)
-                    if white_percent > 0.1:
-                        break
-                    self.sleep(0.01)
+                # 图标区域没有新像素时不重复计算, 直到区域变化或超时
+                white_percent = pick_icon_probe.fraction(icon_zone.crop_frame(self.frame), 'white')
+                while white_percent <= 0.1 and self.wait_for_roi_change(icon_zone, deadline - time.time()):
+                    white_percent = pick_icon_probe.fraction(icon_zone.crop_frame(self.frame), 'white')
+                icon_zone.confidence = white_percent
+                self.draw_boxes(icon_zone.name, icon_zone)
                 text_count = len(texts)
                 self.log_debug(f'pick_up text_count {text_count} / {white_percent}')
                 if white_percent < 0.1:
@@ -67,12 +82,74 @@ class AutoPickTask(BaseEfTask, TriggerTask):
                     self.pick(text_count)
                     return
                 self.sleep(0.2)
+            if not found_f:
+                self.roi_gate_negative()
+        else:
+            self.roi_gate_negative()
+
+    def ocr_text_zone(self, text_zone):
+        """拾取提示文字 OCR, 文字区域内容不变 (dHash 相同) 时直接复用上次结果, 不再调用 OCR。"""
+        texts = self.ocr_cache.get(self.ocr_cache.key(text_zone.crop_frame(self.frame)))
+        if texts is None:
+            start = time.time()
+            texts = self.wait_ocr(box=text_zone)
+            if texts:
+                self.ocr_cache.put(self.ocr_cache.key(text_zone.crop_frame(self.frame)), texts,
+                                   cost=time.time() - start)
+        self.info_set('拾取OCR缓存命中', self.ocr_cache.summary())
+        return texts
+
+    @property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """拾取白名单/黑名单关键词, 从 assets/pick_keywords.csv (可在配置中修改路径) 读取并编译, 路径变化时重新加载。"""
+        csv_path = str(self.config.get("_拾取关键词CSV", str(DEFAULT_KEYWORDS_CSV)))
+        if self._keyword_matcher is None or csv_path != self._keyword_csv:
+            self._keyword_matcher = KeywordMatcher.from_csv(csv_path)
+            self._keyword_csv = csv_path
+            self.log_debug(f'pick keywords loaded from {csv_path}: '
+                           f'{ {k: len(v) for k, v in self._keyword_matcher.keywords.items()} }')
+        return self._keyword_matcher
+
+    def classify_prompt(self, name):
+        return self.keyword_matcher.category(name)
+
+    def run_pick_actions(self, actions):
+        for action in actions:
+            if action == PICK:
+                self.send_key('f', after_sleep=0.1)
+            else:
+                self.scroll_relative(0.5, 0.5, -1)
+                self.sleep(0.05)
 
     def pick(self, count=1):
         for _ in range(count):
             self.send_key('f', after_sleep=0.1)
 
 
+PICK = 'f'
+SCROLL_DOWN = 'scroll_down'
+
+
+def plan_pick_actions(kinds):
+    """
+    根据每一行提示的分类 (自上而下, 第一行为当前选中项) 一次生成全部按键:
+    选中项是白名单时按 F, 拾取后下面的行上移一行、选中位置不变; 否则向下滚动一格跳过。
+    只处理到最后一个白名单行为止。
+    """
+    actions = []
+    cursor = 0
+    picked = 0
+    for index, kind in enumerate(kinds):
+        if kind != WHITE:
+            continue
+        target = index - picked
+        actions.extend([SCROLL_DOWN] * (target - cursor))
+        actions.append(PICK)
+        cursor = target
+        picked += 1
+    return actions
+
+
 white_color = {
     'r': (230, 255),
     'g': (230, 255),
@@ -86,11 +163,8 @@ gray_color = {
 }
 
 
+pick_icon_probe = ColorProbe({'white': white_color, 'gray': gray_color})
+
+
 def is_mostly_grayscale(frame, threshold=10):
-    b, g, r = cv2.split(frame)
-    diff_rg = cv2.absdiff(r, g)
-    diff_gb = cv2.absdiff(g, b)
-    diff_br = cv2.absdiff(b, r)
-    gray_mask = (diff_rg < threshold) & (diff_gb < threshold) & (diff_br < threshold)
-    gray_percentage = (np.sum(gray_mask) / frame.size * 3)
-    return gray_percentage
+    return grayscale_fraction(frame, threshold)
@@ -9,6 +9,7 @@ logger = Logger.get_logger(__name__)
 
 
 class AutoSkipDialogTask(BaseEfTask, TriggerTask):
+    gate_features = (('skip_dialog_esc', 0.05, 0),)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -17,6 +18,8 @@ class AutoSkipDialogTask(BaseEfTask, TriggerTask):
         self.icon = FluentIcon.ACCEPT
 
     def run(self):
+        if self.roi_gate_unchanged():
+            return
         if self.find_one('skip_dialog_esc', horizontal_variance=0.05):
             self.send_key('esc', after_sleep=0.1)
             start = time.time()
@@ -30,3 +33,5 @@ class AutoSkipDialogTask(BaseEfTask, TriggerTask):
                     self.log_debug('AutoSkipDialogTask no confirm break')
                     break
                 self.next_frame()
+        else:
+            self.roi_gate_negative()
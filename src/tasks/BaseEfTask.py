@@ -1,53 +1,69 @@
-from ok import BaseTask
-import ctypes
+from ok import BaseTask, Box, relative_box, sort_boxes
 import math
 import random
 import time
-import win32gui
+import zlib
+
+import numpy as np
 
 from src.essence.essence_recognizer import EssenceInfo, read_essence_info
+from src.image.feature_window import search_window
+from src.image.roi_gate import RoiGate
+from src.image.text_templates import text_template_store
+from src.interaction.timeline import InputScheduler, InputTimeline
+from src.interaction.win32_backend import Win32InputBackend
+from src.navigation.servo import TrackedTarget, VisualServo, crop_template, track_local
+from src.screen.classifier import Screen, ScreenState
+from src.trigger.scheduler import AdaptiveTrigger
 
-user32 = ctypes.windll.user32
-MOUSEEVENTF_MOVE = 0x0001
 TOLERANCE = 50
 
 
 class BaseEfTask(BaseTask):
+    # 触发任务依赖的画面区域: (特征名, horizontal_variance, vertical_variance), 与 find_one 的搜索范围一致
+    gate_features: tuple[tuple[str, float, float], ...] = ()
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._logged_in = False
+        self.roi_gate = RoiGate()
+        self._gate_boxes = {}
+        self.adaptive_trigger = AdaptiveTrigger()
+        self._last_trigger_info = 0
+        self._screen_state = None
+        self._input_scheduler = None
+
+    def should_trigger(self):
+        """
+        在框架的 trigger_interval 之外, 按连续未命中次数和检测耗时自适应降低触发频率;
+        退避期间 gate_features 的区域一有变化就恢复全速, 避免拾取/对话出现后要等满退避间隔才响应。
+        """
+        if not super().should_trigger():
+            return False
+        if self.adaptive_trigger.backoff_interval > 0 and self.gate_features and \
+                self.roi_gate.changed(self.frame, self.gate_boxes()):
+            # 依赖的区域变了 (可能出现了拾取提示/对话), 不等退避间隔, 立即恢复全速
+            self.adaptive_trigger.hit()
+        if not self.adaptive_trigger.should_run():
+            return False
+        now = time.time()
+        if now - self._last_trigger_info >= 1:
+            self._last_trigger_info = now
+            self.info_set('触发频率', f'{self.adaptive_trigger.rate(now):.1f}/s '
+                                      f'(间隔 {self.adaptive_trigger.interval * 1000:.0f}ms)')
+        return True
+
+    def input_scheduler_for(self, hwnd=None) -> InputScheduler:
+        """按窗口句柄缓存的输入调度器, 长时间等待使用 self.sleep, 可以响应任务暂停/停止。"""
+        hwnd = self.hwnd.hwnd if hwnd is None else hwnd
+        if self._input_scheduler is None or self._input_scheduler.backend.hwnd != hwnd:
+            self._input_scheduler = InputScheduler(Win32InputBackend(hwnd), sleep=self.sleep)
+        return self._input_scheduler
 
     def move_keys(self, keys, duration):
-        hwnd=self.hwnd.hwnd
-        try:
-            current_hwnd = win32gui.GetForegroundWindow()
-            # 只有不在前台才激活
-            if current_hwnd != hwnd:
-                win32gui.ShowWindow(hwnd, 5)  # 5表示SW_SHOW，显示并激活窗口
-                win32gui.SetForegroundWindow(hwnd)  # 将窗口设置为前台窗口
-                time.sleep(0.5)  # 等待窗口激活
-
-        except Exception as e:
-            print("窗口激活失败:", e)  # 捕获并打印窗口激活过程中的异常
-        key_map = {
-            "w": 0x57,
-            "a": 0x41,
-            "s": 0x53,
-            "d": 0x44,
-        }
-
-        KEYEVENTF_KEYUP = 0x0002
-
-        # 全部按下
-        for k in keys:
-            user32.keybd_event(key_map[k.lower()], 0, 0, 0)
-
-        self.sleep(duration)
-
-        # 全部抬起
-        for k in keys:
-            user32.keybd_event(key_map[k.lower()], 0, KEYEVENTF_KEYUP, 0)
+        # 窗口不在前台时先激活, 等待 0.5 秒后同时按下全部按键, duration 秒后全部抬起
+        timeline = InputTimeline().activate(settle=0.5).press(keys, duration)
+        self.input_scheduler_for().run(timeline)
 
     def calc_direction_step(
         self, from_pos, to_pos, max_step=100, min_step=40, slow_radius=120, deadzone=4
@@ -85,25 +101,14 @@ class BaseEfTask(BaseTask):
         """
         if only_activate:
             activate=True
+        timeline = InputTimeline()
         if activate:
-            try:
-                current_hwnd = win32gui.GetForegroundWindow()
-                # 只有不在前台才激活
-                if current_hwnd != hwnd:
-                    win32gui.ShowWindow(hwnd, 5)  # 5表示SW_SHOW，显示并激活窗口
-                    win32gui.SetForegroundWindow(hwnd)  # 将窗口设置为前台窗口
-                    time.sleep(delay)  # 等待窗口激活
-
-            except Exception as e:
-                print("窗口激活失败:", e)  # 捕获并打印窗口激活过程中的异常
-
-        # 分 steps 次移动，平滑
+            # 只有不在前台才激活, 激活后等待 delay 秒
+            timeline.activate(settle=delay)
         if not only_activate:
-            for i in range(steps):
-                step_dx = round(dx / steps)
-                step_dy = round(dy / steps)
-                user32.mouse_event(MOUSEEVENTF_MOVE, step_dx, step_dy, 0, 0)
-                time.sleep(delay)
+            # 分 steps 次移动，平滑
+            timeline.mouse_delta(dx, dy, steps=steps, interval=delay)
+        self.input_scheduler_for(hwnd).run(timeline)
 
     def move_to_target_once(self,hwnd, ocr_obj, screen_center_func):
         """
@@ -140,83 +145,176 @@ class BaseEfTask(BaseTask):
     #         self.send_key(direction, down_time=0.05, after_sleep=0.5)
     #     self.center_camera()
 
-    def align_ocr_or_find_target_to_center(self, match_or_name,box=None,threshold=0.8, max_time=100,ocr=True,raise_if_fail=True,is_num=False):
+    @property
+    def text_templates(self):
+        return text_template_store()
+
+    def ocr(self, x=0, y=0, to_x=1, to_y=1, match=None, width=0, height=0, box=None, name=None,
+            threshold=0, frame=None, target_height=0, use_grayscale=False, log=False,
+            screenshot=False, frame_processor=None, lib='default'):
+        """
+        要匹配的字符串全部注册过文字模板 (assets/text_templates.json) 时先用模板匹配, 有命中就不再 OCR;
+        没有命中或不能用模板时照常 OCR。
+        """
+        if frame_processor is None and self.text_templates.covers(match):
+            image = frame if frame is not None else self.frame
+            if image is None:
+                return []
+            if box and isinstance(box, str):
+                box = self.get_box_by_name(box)
+            if box is None:
+                box = relative_box(image.shape[1], image.shape[0], x, y, to_x, to_y, width, height, name)
+            results = [Box(m.x, m.y, m.width, m.height, m.confidence, m.text)
+                       for m in self.text_templates.match(image, match, box.x, box.y,
+                                                          box.x + box.width, box.y + box.height)]
+            if log:
+                self.log_debug(f'text template {match} in {box}: {results}')
+            if results:
+                self.draw_boxes(box.name, results, 'red')
+                return results
+        return super().ocr(x, y, to_x=to_x, to_y=to_y, match=match, width=width, height=height, box=box, name=name,
+                           threshold=threshold, frame=frame, target_height=target_height,
+                           use_grayscale=use_grayscale, log=log, screenshot=screenshot,
+                           frame_processor=frame_processor, lib=lib)
+
+    def ocr_frame(self, frame, box: Box, frame_processor=None, match=None, threshold=0, lib='default') -> list[Box]:
+        """
+        只对给定 frame 的 box 区域做 OCR: 不检查暂停, 不读取或重置 executor 的当前帧, 也不画框,
+        可以在后台线程 (基质面板 OCR 流水线、战斗感知线程) 中调用; 暂停仍由主线程的 sleep / next_frame 处理。
+        match 与 ocr 相同, 只返回匹配的结果。
+        """
+        image = box.crop_frame(frame)
+        if image is None or image.size == 0:
+            return []
+        if frame_processor is not None:
+            image = frame_processor(image)
+        detected_boxes, _ = self.ocr_fun(lib)(box, image, match, 1.0, threshold or self.ocr_default_threshold, lib)
+        return sort_boxes(detected_boxes)
+
+    def ocr_recognize(self, frame, boxes: list[Box], lib='default') -> list[Box] | None:
+        """
+        只识别不检测: 每个 box 当作一行文字, 所有 box 一次批量识别, 返回与 boxes 同序的 Box (name 为识别结果)。
+        和 ocr_frame 一样不碰 executor 状态; 当前 OCR 库不支持单独识别时返回 None, 由调用方改用 ocr_frame。
+        """
+        if self.ocr_fun(lib) != self.onnx_ocr:
+            return None
+        images = [box.crop_frame(frame) for box in boxes]
+        if not images or any(image is None or image.size == 0 for image in images):
+            return None
+        results = self.executor.ocr_lib(lib).ocr(images, det=False)[0]
+        recognized = [Box(box.x, box.y, box.width, box.height, float(score), text)
+                      for box, (text, score) in zip(boxes, results)]
+        self.fix_texts(recognized)
+        return recognized
+
+    def capture_text_template(self, text, box=None, threshold=0.85):
+        """在当前画面上 OCR 找到 text, 把它的区域保存为文字模板, 之后等待该文字时不再需要 OCR。"""
+        frame = self.frame
+        results = super().ocr(box=box, match=text, frame=frame)
+        if not results:
+            return None
+        found = results[0]
+        template = self.text_templates.register(text, frame, found.x, found.y, found.width, found.height, threshold)
+        self.text_templates.save()
+        self.log_info(f'文字模板 {text} -> {template.file}')
+        return template
+
+    def _find_align_target(self, match_or_name, box, threshold, ocr, time_out):
+        """
+        整块查找对中目标 (OCR 或特征匹配), 返回 TrackedTarget 或 None。
+        time_out 为 0 时只在当前帧上查找一次 (跟丢后重新查找用); wait_until/wait_ocr 的 0 表示默认超时, 不能直接传。
+        """
+        if ocr:
+            if time_out > 0:
+                result = self.wait_ocr(match=match_or_name, box=box, time_out=time_out, log=True)
+            else:
+                result = self.ocr(match=match_or_name, box=box, log=True)
+        else:
+            box = self.box_of_screen(
+                (1920 - 1550) / 1920,
+                150 / 1080,
+                1550 / 1920,
+                (1080 - 150) / 1080,
+            )
+
+            def find():
+                return self.find_feature(feature_name=match_or_name, threshold=threshold, box=box)
+
+            result = self.wait_until(find, time_out=time_out) if time_out > 0 else find()
+        if not result:
+            return None
+        if isinstance(result, list):
+            result = result[0]
+        return TrackedTarget(result.x, result.y, result.width, result.height, result.confidence)
+
+    def align_ocr_or_find_target_to_center(self, match_or_name, box=None, threshold=0.8, max_time=100, ocr=True,
+                                           raise_if_fail=True, is_num=False, settle_time=0.15):
         """
         将OCR识别的目标或图像特征目标对准屏幕中心
         参数:
             match_or_name: 目标匹配名称或特征名称
-            max_time: 最大尝试次数，默认为50次
+            max_time: 最大尝试次数（每次移动镜头算一次），默认为100次
             ocr: 是否使用OCR模式，默认为True
+            settle_time: 每次移动镜头后等待画面稳定的时间
+        闭环对中: 首次整块查找目标, 之后每次移动后按在线估计的增益 (像素/鼠标位移) 预测目标位置,
+        只在预测位置附近匹配上一帧裁下的目标图, 跟丢时才重新整块查找。
         异常:
             如果在最大尝试次数内无法对中目标，抛出"对中失败"异常
         """
-
-        last_target=None
-        last_target_fail_count = 0
+        servo = VisualServo(tolerance=TOLERANCE)
+        # 数字模式下 (滑索距离) 需要对准的是数字上方的滑索架
+        y_offset = -int(self.height * ((525 - 486) / 1080)) if is_num else 0
+        margin = max(20, int(self.width * 0.02))
+        target = None
+        template = None
+        lost_count = 0
+        observed = False  # target 是否来自本帧的实际识别 (而不是按增益预测的位置)
         for i in range(max_time):
-            if ocr:
-                # 使用OCR模式识别目标，设置超时时间为2秒，并启用日志记录
-                result = self.wait_ocr(match=match_or_name,box=box, time_out=2, log=True)
-            else:
-                self.sleep(2)
-                # 使用图像特征识别模式查找目标
-                box = self.box_of_screen(
-                    (1920 - 1550) / 1920,
-                    150 / 1080,
-                    1550 / 1920,
-                    (1080 - 150) / 1080,
-                )
-                result = self.find_feature(feature_name=match_or_name,threshold=threshold, box=box)
-            if result:
-                # OCR 成功
-                if isinstance(result, list):
-                    result = result[0]
-                if is_num:
-                    result.y = result.y - int(self.height * ((525 - 486) / 1080))
-
-                target_center = (
-                    result.x + result.width // 2,
-                    result.y + result.height // 2,
-                )
-                screen_center_pos = self.screen_center()
-                last_target = result
-                last_target_fail_count = 0
-                # 计算偏移量
-                dx = target_center[0] - screen_center_pos[0]
-                dy = target_center[1] - screen_center_pos[1]
-
-                # 如果目标在容忍范围内
-                if abs(dx) <= TOLERANCE and abs(dy) <= TOLERANCE:
-                    return True
-                else:
-                    self.move_to_target_once(
-                        self.hwnd.hwnd, result, self.screen_center
-                    )
-
-            else:
-                # 每次 OCR 失败，直接随机移动
-                max_offset = 50  # 最大随机偏移
-                if last_target and last_target_fail_count < 5:
-                    self.move_to_target_once(
-                        self.hwnd.hwnd, last_target, self.screen_center
-                    )
-                    last_target_fail_count += 1
-                else:
-                    last_target = None
-                    last_target_fail_count = 0
-                    dx = random.randint(-max_offset//2, max_offset)
-                    dy = random.randint(-max_offset//2, max_offset)
-
-                    # 移动鼠标
+            if target is None:
+                target = self._find_align_target(match_or_name, box, threshold, ocr, time_out=2)
+                if target is None:
+                    # 找不到目标，随机移动镜头后重新查找
+                    max_offset = 50
                     self.active_and_send_mouse_delta(
                         self.hwnd.hwnd,
-                        dx,
-                        dy,
+                        random.randint(-max_offset // 2, max_offset),
+                        random.randint(-max_offset // 2, max_offset),
                         activate=True,
                         delay=0.1,
                     )
+                    continue
+                template = crop_template(self.frame, target)
+                lost_count = 0
+                observed = True
+
+            target_x, target_y = target.center
+            target_center = (target_x, target_y + y_offset)
+            # 只有实际看到目标时才判定对中, 跟随预测位置时只继续移动
+            if observed and servo.converged(target_center, self.screen_center()):
+                self.info_set('对中帧数', i + 1)
+                return True
 
-                # OCR 成功后不需要处理，下一次失败仍然随机
+            command = servo.command(target_center, self.screen_center())
+            self.active_and_send_mouse_delta(self.hwnd.hwnd, *command)
+            predicted = servo.predict(target, command)
+            self.sleep(settle_time)
+
+            tracked = track_local(self.frame, template, predicted, servo.search_margin(command, margin))
+            if tracked is None:
+                tracked = self._find_align_target(match_or_name, box, threshold, ocr, time_out=0)
+            if tracked is not None:
+                servo.observe(target, tracked, command)
+                template = crop_template(self.frame, tracked)
+                target = tracked
+                lost_count = 0
+                observed = True
+            elif lost_count < 5:
+                # 暂时跟丢，按预测位置继续移动
+                target = predicted
+                lost_count += 1
+                observed = False
+            else:
+                target = None
 
         if raise_if_fail:
             raise Exception("对中失败")
@@ -250,8 +348,19 @@ class BaseEfTask(BaseTask):
     def find_confirm(self):
         return self.find_one('skip_dialog_confirm', horizontal_variance=0.05, vertical_variance=0.05)
 
+    @property
+    def screen_state(self) -> ScreenState:
+        """当前帧的界面识别结果, 帧变化时重建, 同一帧内各个判断共用已匹配的特征。"""
+        frame = self.frame
+        if self._screen_state is None or self._screen_state.frame is not frame:
+            self._screen_state = ScreenState(self.executor.feature_set, frame)
+        return self._screen_state
+
+    def current_screen(self) -> Screen:
+        return self.screen_state.screen
+
     def in_combat_world(self):
-        in_combat_world = self.find_one('top_left_tab')
+        in_combat_world = self.screen_state.match('top_left_tab')
         if in_combat_world:
             self._logged_in = True
         return in_combat_world
@@ -266,7 +375,8 @@ class BaseEfTask(BaseTask):
         self.info_set('current task', f'in main esc={esc}')
 
     def in_world(self):
-        in_world = self.find_one('esc') and self.find_one('b') and self.find_one('c')
+        state = self.screen_state
+        in_world = state.box if state.screen == Screen.WORLD else None
         if in_world:
             self._logged_in = True
         return in_world
@@ -292,20 +402,73 @@ class BaseEfTask(BaseTask):
             count += 1
     def wait_login(self):
         if not self._logged_in:
-            if self.in_world():
+            state = self.screen_state
+            screen = state.screen
+            if screen == Screen.WORLD:
                 self._logged_in = True
                 return True
-            elif self.find_one('monthly_card') or self.find_one('logout'):
+            elif screen == Screen.LOGIN_POPUP:
                 self.click(after_sleep=1)
                 return False
-            elif close := (self.find_one(
-                    'reward_ok', horizontal_variance=0.1, vertical_variance=0.1, ) or self.find_one(
-                'one_click_claim', horizontal_variance=0.1, vertical_variance=0.1) or self.find_one('check_in_close',
-                                                                                                    horizontal_variance=0.1,
-                                                                                                    vertical_variance=0.1,
-                                                                                                    threshold=0.75)):
-                self.click(close, after_sleep=1)
+            elif screen in (Screen.REWARD, Screen.CHECK_IN):
+                self.click(state.box, after_sleep=1)
                 return False
 
-    def read_essence_info(self) -> EssenceInfo | None:
-        return read_essence_info(self)
+    def roi_checksum(self, box, frame=None) -> int:
+        """区域像素的 crc32, 用于快速判断两帧之间该区域是否有变化。"""
+        crop = box.crop_frame(self.frame if frame is None else frame)
+        if crop is None or crop.size == 0:
+            return 0
+        return zlib.crc32(np.ascontiguousarray(crop))
+
+    def wait_for_roi_change(self, box, timeout, interval=1 / 60, baseline=None) -> bool:
+        """
+        等待截图中 box 区域的像素发生变化 (与 baseline 或当前帧的校验和不同)。
+        每隔 interval 秒 (约一帧) 截图一次, 只比较校验和; 区域变化时返回 True, 此时 self.frame 即变化后的帧,
+        超时返回 False。用于替代在同一帧上反复计算的短间隔轮询。
+        """
+        if baseline is None:
+            baseline = self.roi_checksum(box)
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            self.sleep(min(interval, remaining))
+            if self.roi_checksum(box) != baseline:
+                return True
+
+    def gate_boxes(self) -> list:
+        """gate_features 对应的搜索区域 (按分辨率缓存)。"""
+        key = (self.width, self.height)
+        boxes = self._gate_boxes.get(key)
+        if boxes is None:
+            feature_set = self.executor.feature_set
+            boxes = []
+            for name, horizontal_variance, vertical_variance in self.gate_features:
+                feature = feature_set.get_feature_by_name(self.frame, name)
+                if feature is None:
+                    continue
+                x1, y1, x2, y2 = search_window(feature_set, feature, horizontal_variance, vertical_variance)
+                boxes.append(Box(x1, y1, x2 - x1, y2 - y1, name=f'gate_{name}'))
+            self._gate_boxes[key] = boxes
+        return boxes
+
+    def roi_gate_unchanged(self) -> bool:
+        """上次检测为否定后, 依赖的区域都没有变化时返回 True, 触发任务可直接跳过本轮检测。"""
+        if not self.gate_features:
+            return False
+        if self.roi_gate.unchanged(self.frame, self.gate_boxes()):
+            self.adaptive_trigger.miss()
+            return True
+        return False
+
+    def roi_gate_negative(self):
+        """本轮检测结果为否定 (没有需要处理的界面), 记录当前区域签名, 并计入自适应触发的未命中次数。"""
+        self.adaptive_trigger.miss()
+        if self.gate_features:
+            self.roi_gate.mark_negative(self.frame, self.gate_boxes())
+
+    def read_essence_info(self, frame=None) -> EssenceInfo | None:
+        """frame 为 None 时识别当前帧; 传入 frame 时只做 OCR (ocr_frame), 可以在后台线程调用。"""
+        return read_essence_info(self, frame)
@@ -1,12 +1,18 @@
+import time
 from pathlib import Path
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Final
 
+import numpy as np
 import pywintypes
 from qfluentwidgets import FluentIcon
 
 from src.tasks.BaseEfTask import BaseEfTask
+from src.essence.inventory import DEFAULT_INVENTORY_PATH, EssenceInventory, InventoryRecord, can_reuse, thumbnail_hash
+from src.essence.panel_settle import PanelSettleDetector, panel_signature
+from src.essence.quality_grid import QualityMap, classify_quality_grid
+from src.essence.scan_pipeline import EssenceOcrPipeline, ScannedCell
 from src.essence.weapon_data import load_weapon_data, match_weapon_requirements
 
 
@@ -22,6 +28,9 @@ _INFO_LOCK_SUCCESS: Final = "上锁成功"
 _INFO_LOCK_SKIPPED: Final = "已锁定跳过"
 _INFO_GRADUATED_ESSENCE: Final = "已毕业基质"
 _INFO_GRADUATED_WEAPONS: Final = "已毕业武器"
+_INFO_SETTLE_SAVED: Final = "面板等待节省"
+_INFO_CACHED: Final = "增量跳过"
+_INFO_ADDED: Final = "本次新增"
 
 
 _FEATURE_ESSENCE_UI_MARKER: Final = "essence_ui_marker"
@@ -148,6 +157,8 @@ class EssenceScanStats:
     graduated: int = 0
     lock_success: int = 0
     lock_skipped: int = 0
+    settle_saved: float = 0.0
+    cached: int = 0
     matched_weapons: set[str] = field(default_factory=set)
 
     def update_info(self, task: "EssenceScanTask") -> None:
@@ -158,6 +169,14 @@ class EssenceScanStats:
         task.info_set(_INFO_GRADUATED_WEAPONS, str(len(self.matched_weapons)))
 
 
+@dataclass
+class EssenceScanProgress:
+    gold_seen_any: bool = False
+    # 流水线模式下结果滞后于点击：已点击过模板判定为金色的格子即视为“预计已出现金色”
+    gold_expected: bool = False
+    gold_on_page: int = 0
+
+
 class EssenceScanTask(BaseEfTask):
     """
     一次性遍历武器基质列表，识别右侧信息面板，匹配毕业基质并自动上锁。
@@ -175,6 +194,8 @@ class EssenceScanTask(BaseEfTask):
             {
                 "上锁毕业基质": True,
                 "非毕业基质取消上锁": False,
+                "流水线识别": True,
+                "增量扫描": True,
                 # 以下为内部参数，前面加 "_" 以在 GUI 配置页隐藏
                 "_武器数据CSV": str(Path("assets") / "weapon_data.csv"),
                 "_参考分辨率": [str(_DEFAULT_REF_RESOLUTION[0]), str(_DEFAULT_REF_RESOLUTION[1])],
@@ -188,12 +209,16 @@ class EssenceScanTask(BaseEfTask):
                 "_滑动距离像素": _DEFAULT_SCROLL_PIXELS,
                 "_滑动后等待秒": _DEFAULT_SCROLL_WAIT_SEC,
                 "_最大翻页": _DEFAULT_MAX_PAGES,
+                "_基质库存数据库": str(DEFAULT_INVENTORY_PATH),
             }
         )
         self.config_description.update(
             {
                 "上锁毕业基质": "命中毕业词条后自动点击右侧小锁上锁",
                 "非毕业基质取消上锁": "非毕业基质会尝试取消上锁（已上锁的会解锁）",
+                "增量扫描": "记录每个格子的识别结果和锁定状态并统计本次新增的基质。同类基质图标相同且格子上不显示词条等级，"
+                "金色格子无法确认是哪个基质，不会跳过、始终重新识别；只跳过缩略图未变化的非金色格子",
+                "流水线识别": "点击下一个格子的同时在后台识别上一个格子的面板，上锁/解锁在识别完成后回到该格子补做",
             }
         )
 
@@ -297,6 +322,193 @@ class EssenceScanTask(BaseEfTask):
                 return True
         return False
 
+    def _cell_box(self, settings: EssenceScanSettings, row: int, col: int, *, name: str = "essence_cell"):
+        grid_x, grid_y = settings.grid_origin
+        dx, dy = settings.grid_step
+        icon_w, icon_h = settings.icon_size
+        cx = grid_x + col * dx
+        cy = grid_y + row * dy
+        return self._ref_box(
+            settings,
+            cx - icon_w / 2,
+            cy - icon_h / 2,
+            cx + icon_w / 2,
+            cy + icon_h / 2,
+            name=name,
+        )
+
+    def _page_quality_map(self, settings: EssenceScanSettings) -> QualityMap:
+        """
+        用当前一帧判断整页格子的品质: 每个金色品质模板在网格区域上只匹配一次, 结果按格子切片取最大值,
+        与逐格 _is_gold_cell 的判断一致。
+        """
+        frame = self.frame
+        cells = np.zeros((settings.grid_rows, settings.grid_cols, 4), dtype=np.int32)
+        for row in range(settings.grid_rows):
+            for col in range(settings.grid_cols):
+                box = self._cell_box(settings, row, col)
+                cells[row, col] = (box.x, box.y, box.width, box.height)
+        templates = []
+        for feature_name in _FEATURE_ESSENCE_QUALITY_GOLD:
+            try:
+                feature = self.executor.feature_set.get_feature_by_name(frame, feature_name)
+            except Exception:
+                feature = None
+            if feature is not None:
+                templates.append((feature.mat, feature.mask))
+        return classify_quality_grid(frame, cells, templates, _ESSENCE_QUALITY_THRESHOLD)
+
+    def _panel_signature(self):
+        return panel_signature(self.box_of_screen(0.65, 0.05, 0.99, 0.63, name="essence_panel").crop_frame(self.frame))
+
+    def _click_cell_and_wait_panel(self, settings: EssenceScanSettings, cx: float, cy: float) -> float:
+        """
+        点击格子后逐帧比较右侧面板, 面板与点击前不同且稳定 (至少两帧, 跨度不少于 30ms) 后立即返回;
+        _点击等待秒 只作为上限。返回实际等待的秒数。
+        """
+        detector = PanelSettleDetector()
+        detector.start(self._panel_signature())
+        self._click_ref(settings, cx, cy)
+        start = time.time()
+        deadline = start + settings.click_wait_sec
+        while time.time() < deadline:
+            self.sleep(min(1 / 60, max(0.0, deadline - time.time())))
+            if detector.update(self._panel_signature()):
+                break
+        return time.time() - start
+
+    def _reselect_cell(self, settings: EssenceScanSettings, cell: ScannedCell):
+        """流水线模式下结果返回时面板已切到后面的格子，上锁/解锁前先重新选中该格子。"""
+        self._click_cell_and_wait_panel(settings, cell.cx, cell.cy)
+        self.next_frame()
+
+    def _process_essence(
+        self,
+        settings: EssenceScanSettings,
+        requirements,
+        stats: EssenceScanStats,
+        progress: EssenceScanProgress,
+        cell: ScannedCell,
+        info,
+        *,
+        lock_enabled: bool,
+        unlock_non_graduate: bool,
+        reselect: bool,
+        inventory: EssenceInventory | None = None,
+        cached: bool = False,
+    ) -> bool:
+        """
+        处理一个格子的面板识别结果，返回是否应停止扫描。
+        cached 表示 info 来自库存记录（非金色格子且缩略图未变化），只更新统计，不做任何点击。
+        """
+        if not info:
+            self.log_debug(f"[essence] {cell.pos} ocr empty")
+            return False
+        stop, graduated, lock_state = self._handle_essence(
+            settings,
+            requirements,
+            stats,
+            progress,
+            cell,
+            info,
+            lock_enabled=lock_enabled and not cached,
+            unlock_non_graduate=unlock_non_graduate and not cached,
+            reselect=reselect,
+        )
+        if inventory is not None:
+            if cached:
+                stats.cached += 1
+                self.info_set(_INFO_CACHED, str(stats.cached))
+                inventory.touch(cell.pos, cell.thumb_hash)
+            else:
+                inventory.record(cell.pos, cell.thumb_hash, info, graduated=graduated, lock_state=lock_state)
+        return stop
+
+    def _handle_essence(
+        self,
+        settings: EssenceScanSettings,
+        requirements,
+        stats: EssenceScanStats,
+        progress: EssenceScanProgress,
+        cell: ScannedCell,
+        info,
+        *,
+        lock_enabled: bool,
+        unlock_non_graduate: bool,
+        reselect: bool,
+    ) -> tuple[bool, bool, str | None]:
+        """返回 (是否停止扫描, 是否毕业, 处理后的锁定状态)。"""
+        pos = cell.pos
+        lock_x, lock_y = settings.lock_button
+
+        entry_text = " ".join(
+            f"{e.name}+{e.level}" if e.level is not None else e.name for e in info.entries
+        )
+        self.log_info(f"[essence] {pos} {info.name} {info.source or ''} | {entry_text}")
+
+        if not info.is_gold:
+            self.log_info(f"[essence] {pos} skip: non-gold {info.name}")
+            if progress.gold_seen_any:
+                self.log_info("[essence] stop: non-gold encountered")
+                return True, False, None
+            return False, False, None
+
+        progress.gold_seen_any = True
+        progress.gold_on_page += 1
+
+        if len(info.entries) != 3:
+            self.log_debug(f"[essence] {pos} skip: entries={len(info.entries)}")
+            return False, False, None
+
+        stats.scanned += 1
+        self.info_set(_INFO_SCANNED, str(stats.scanned))
+
+        matches = match_weapon_requirements(requirements, info.entry_names)
+        if not matches:
+            lock_state = None
+            if unlock_non_graduate:
+                if reselect:
+                    self._reselect_cell(settings, cell)
+                unlocked_ok, did_unlock = self._try_unlock(settings, lock_x, lock_y)
+                self.log_info(
+                    f"[essence] {pos} unlock did_click={did_unlock} ok={unlocked_ok}"
+                )
+                if unlocked_ok:
+                    lock_state = LockState.UNLOCKED.value
+            return False, False, lock_state
+
+        stats.graduated += 1
+        self.info_set(_INFO_GRADUATED_ESSENCE, str(stats.graduated))
+
+        weapons_text = "、".join(f"{m.weapon}({m.star})" for m in matches)
+        self.log_info(f"[essence] {pos} graduated -> {weapons_text}")
+
+        lock_state = None
+        if lock_enabled:
+            if reselect:
+                self._reselect_cell(settings, cell)
+            state_before = self._lock_state(settings, lock_x, lock_y)
+            locked_ok, did_lock = self._try_lock(settings, lock_x, lock_y)
+            state_after = self._lock_state(settings, lock_x, lock_y)
+            self.log_info(
+                f"[essence] {pos} lock {state_before.value}->{state_after.value} "
+                f"did_click={did_lock} ok={locked_ok}"
+            )
+            lock_state = state_after.value
+
+            if not locked_ok:
+                self.log_error(f"[essence] {pos} lock failed {info.name}")
+            elif did_lock:
+                stats.lock_success += 1
+                self.info_set(_INFO_LOCK_SUCCESS, str(stats.lock_success))
+            else:
+                stats.lock_skipped += 1
+                self.info_set(_INFO_LOCK_SKIPPED, str(stats.lock_skipped))
+
+        stats.matched_weapons.update(m.weapon for m in matches)
+        self.info_set(_INFO_GRADUATED_WEAPONS, str(len(stats.matched_weapons)))
+        return False, True, lock_state
+
     def _scroll_next_page(self, settings: EssenceScanSettings):
         grid_x, grid_y = settings.grid_origin
         dx, dy = settings.grid_step
@@ -333,6 +545,8 @@ class EssenceScanTask(BaseEfTask):
 
         lock_enabled = bool(self.config.get("上锁毕业基质", True))
         unlock_non_graduate = bool(self.config.get("非毕业基质取消上锁", False))
+        pipelined = bool(self.config.get("流水线识别", True))
+        incremental = bool(self.config.get("增量扫描", True))
         stats = EssenceScanStats()
         stats.update_info(self)
 
@@ -354,167 +568,203 @@ class EssenceScanTask(BaseEfTask):
         cols = settings.grid_cols
         rows = settings.grid_rows
         icon_w, icon_h = settings.icon_size
-        lock_x, lock_y = settings.lock_button
 
         last_first_cell_mean: float | None = None
-        gold_seen_any = False
+        progress = EssenceScanProgress()
+        pipeline = EssenceOcrPipeline(self.read_essence_info) if pipelined else None
+        inventory = None
+        if incremental:
+            inventory_path = Path(str(self.config.get("_基质库存数据库", str(DEFAULT_INVENTORY_PATH)))).expanduser()
+            inventory = EssenceInventory(inventory_path)
+        scan_start = time.time()
+
+        def process(cell: ScannedCell, info, reselect: bool) -> bool:
+            cached = isinstance(info, InventoryRecord)
+            if cached:
+                info = info.info
+            return self._process_essence(
+                settings,
+                requirements,
+                stats,
+                progress,
+                cell,
+                info,
+                lock_enabled=lock_enabled,
+                unlock_non_graduate=unlock_non_graduate,
+                reselect=reselect,
+                inventory=inventory,
+                cached=cached,
+            )
 
         stopped_by_user = False
-        for page in range(settings.max_pages):
-            if not self.enabled:
-                stopped_by_user = True
-                break
-
-            self.log_info(f"[essence] page {page}")
-            gold_on_page = 0
-            stop_all = False
-
-            row_start = 0 if page == 0 else 1  # 翻页会有 1 行重叠，避免重复扫描
-            for row_in_view in range(row_start, rows):
+        try:
+            for page in range(settings.max_pages):
                 if not self.enabled:
                     stopped_by_user = True
-                    stop_all = True
                     break
-                for col in range(cols):
+
+                self.log_info(f"[essence] page {page}")
+                progress.gold_on_page = 0
+                page_clicks = 0
+                page_wait = 0.0
+                stop_all = False
+
+                row_start = 0 if page == 0 else 1  # 翻页会有 1 行重叠，避免重复扫描
+                # 整页只截一帧判断全部格子的品质，点击格子只改变选中样式，不影响其他格子的判断
+                self.next_frame()
+                page_frame = self.frame
+                quality = self._page_quality_map(settings)
+                self.log_debug(f"[essence] page {page} gold cells={quality.gold_count}")
+                for row_in_view in range(row_start, rows):
                     if not self.enabled:
                         stopped_by_user = True
                         stop_all = True
                         break
+                    for col in range(cols):
+                        if not self.enabled:
+                            stopped_by_user = True
+                            stop_all = True
+                            break
 
-                    self.next_frame()
-                    cx = grid_x + col * dx
-                    cy = grid_y + row_in_view * dy
-
-                    cell_box = self._ref_box(
-                        settings,
-                        cx - icon_w / 2,
-                        cy - icon_h / 2,
-                        cx + icon_w / 2,
-                        cy + icon_h / 2,
-                        name="essence_cell",
+                        cx = grid_x + col * dx
+                        cy = grid_y + row_in_view * dy
+
+                        is_gold_candidate = quality.is_gold(row_in_view, col)
+                        gold_seen = progress.gold_seen_any or progress.gold_expected
+                        force_click = col == 0 and not gold_seen
+                        if not is_gold_candidate and not (gold_seen or force_click):
+                            continue
+
+                        global_row = page * (rows - 1) + row_in_view + 1
+                        pos = f"{global_row}-{col + 1}"
+                        thumb_hash = ""
+                        record = None
+                        if inventory is not None:
+                            thumb = self._cell_box(settings, row_in_view, col).crop_frame(page_frame)
+                            thumb_hash = thumbnail_hash(thumb)
+                            record = inventory.lookup(pos, thumb_hash)
+                            if not can_reuse(record, is_gold_candidate):
+                                record = None
+                        cell = ScannedCell(row_in_view, col, cx, cy, pos, thumb_hash)
+
+                        if record is not None:
+                            # 非金色格子且缩略图与库存记录一致：不点击、不 OCR，直接使用记录
+                            self.log_debug(f"[essence] {pos} unchanged, use inventory record")
+                            if pipeline is not None:
+                                pipeline.submit_result(cell, record)
+                                continue
+                            if process(cell, record, False):
+                                stop_all = True
+                                break
+                            continue
+
+                        if pipeline is not None:
+                            # 点击前先处理已完成的结果；队列满时等最早的一个，避免点击领先识别太多
+                            for done_cell, done_info in pipeline.ready():
+                                if process(done_cell, done_info, True):
+                                    stop_all = True
+                                    break
+                            if not stop_all and pipeline.full:
+                                stop_all = process(*pipeline.wait_one(), True)
+                            if stop_all:
+                                pipeline.cancel()
+                                break
+
+                        self.log_info(f"[essence] click {pos}")
+
+                        try:
+                            page_wait += self._click_cell_and_wait_panel(settings, cx, cy)
+                            page_clicks += 1
+                        except pywintypes.error as e:
+                            if getattr(e, "winerror", None) == 5:
+                                self.info_set(_INFO_STATUS, "错误")
+                                self.log_error(
+                                    "[essence] PostMessage access denied. Start as Administrator then retry: "
+                                    "uv run python main.py -t 2"
+                                )
+                                return
+                            raise
+                        self.next_frame()
+
+                        if pipeline is not None:
+                            if is_gold_candidate:
+                                progress.gold_expected = True
+                            pipeline.submit(cell, self.frame)
+                            continue
+
+                        if process(cell, self.read_essence_info(), False):
+                            stop_all = True
+                            break
+                    if stop_all:
+                        break
+
+                if pipeline is not None and not stop_all:
+                    # 翻页前取回本页全部结果，补做的上锁需要格子仍在当前页
+                    for done_cell, done_info in pipeline.drain():
+                        if process(done_cell, done_info, True):
+                            pipeline.cancel()
+                            stop_all = True
+                            break
+                    self.log_info(
+                        f"[essence] page {page} ocr total {pipeline.ocr_time:.2f}s, "
+                        f"waited for ocr {pipeline.blocked_time:.2f}s ({pipeline.submitted} panels)"
                     )
+                gold_on_page = progress.gold_on_page
 
-                    is_gold_candidate = self._is_gold_cell(cell_box)
-                    force_click = col == 0 and not gold_seen_any
-                    if not is_gold_candidate and not (gold_seen_any or force_click):
-                        continue
-
-                    global_row = page * (rows - 1) + row_in_view + 1
-                    pos = f"{global_row}-{col + 1}"
-                    self.log_info(f"[essence] click {pos}")
-
-                    try:
-                        self._click_ref(settings, cx, cy, after_sleep=settings.click_wait_sec)
-                    except pywintypes.error as e:
-                        if getattr(e, "winerror", None) == 5:
-                            self.info_set(_INFO_STATUS, "错误")
-                            self.log_error(
-                                "[essence] PostMessage access denied. Start as Administrator then retry: "
-                                "uv run python main.py -t 2"
-                            )
-                            return
-                        raise
-                    self.next_frame()
-
-                    info = self.read_essence_info()
-                    if not info:
-                        self.log_debug(f"[essence] {pos} ocr empty")
-                        continue
-
-                    entry_text = " ".join(
-                        f"{e.name}+{e.level}" if e.level is not None else e.name for e in info.entries
+                if page_clicks:
+                    saved = page_clicks * settings.click_wait_sec - page_wait
+                    stats.settle_saved += saved
+                    self.log_info(
+                        f"[essence] page {page} panel wait {page_wait:.2f}s for {page_clicks} clicks, saved {saved:.2f}s"
                     )
-                    self.log_info(f"[essence] {pos} {info.name} {info.source or ''} | {entry_text}")
+                    self.info_set(_INFO_SETTLE_SAVED, f"{stats.settle_saved:.1f}s")
 
-                    if not info.is_gold:
-                        self.log_info(f"[essence] {pos} skip: non-gold {info.name}")
-                        if gold_seen_any:
-                            self.log_info("[essence] stop: non-gold encountered")
-                            stop_all = True
-                            break
-                        continue
-
-                    gold_seen_any = True
-                    gold_on_page += 1
-
-                    if len(info.entries) != 3:
-                        self.log_debug(f"[essence] {pos} skip: entries={len(info.entries)}")
-                        continue
-
-                    stats.scanned += 1
-                    self.info_set(_INFO_SCANNED, str(stats.scanned))
-
-                    matches = match_weapon_requirements(requirements, info.entry_names)
-                    if not matches:
-                        if unlock_non_graduate:
-                            unlocked_ok, did_unlock = self._try_unlock(settings, lock_x, lock_y)
-                            self.log_info(
-                                f"[essence] {pos} unlock did_click={did_unlock} ok={unlocked_ok}"
-                            )
-                        continue
-
-                    stats.graduated += 1
-                    self.info_set(_INFO_GRADUATED_ESSENCE, str(stats.graduated))
-
-                    weapons_text = "、".join(f"{m.weapon}({m.star})" for m in matches)
-                    self.log_info(f"[essence] {pos} graduated -> {weapons_text}")
-
-                    if lock_enabled:
-                        state_before = self._lock_state(settings, lock_x, lock_y)
-                        locked_ok, did_lock = self._try_lock(settings, lock_x, lock_y)
-                        state_after = self._lock_state(settings, lock_x, lock_y)
-                        self.log_info(
-                            f"[essence] {pos} lock {state_before.value}->{state_after.value} "
-                            f"did_click={did_lock} ok={locked_ok}"
-                        )
-
-                        if not locked_ok:
-                            self.log_error(f"[essence] {pos} lock failed {info.name}")
-                        elif did_lock:
-                            stats.lock_success += 1
-                            self.info_set(_INFO_LOCK_SUCCESS, str(stats.lock_success))
-                        else:
-                            stats.lock_skipped += 1
-                            self.info_set(_INFO_LOCK_SKIPPED, str(stats.lock_skipped))
-
-                    stats.matched_weapons.update(m.weapon for m in matches)
-                    self.info_set(_INFO_GRADUATED_WEAPONS, str(len(stats.matched_weapons)))
                 if stop_all:
                     break
 
-            if stop_all:
-                break
-
-            # 当前页没有任何金色：一般说明已进入紫色/其他区域，停止即可（避免多轮）
-            if page > 0 and gold_on_page == 0:
-                self.log_info("[essence] stop: no gold found on page")
-                break
-
-            # 简单的“是否真正翻页”校验：如果首格均值几乎不变，说明已到列表底部或滑动无效
-            self.next_frame()
-            first_cell = self._ref_box(
-                settings,
-                grid_x - icon_w / 2,
-                grid_y - icon_h / 2,
-                grid_x + icon_w / 2,
-                grid_y + icon_h / 2,
-                name="essence_first_cell_mean",
-            ).crop_frame(self.frame)
-            first_mean = float(first_cell.mean()) if first_cell.size else 0.0
-            if (
-                last_first_cell_mean is not None
-                and abs(first_mean - last_first_cell_mean) < 0.2
-            ):
-                self.log_info("[essence] stop: reached bottom (first cell unchanged)")
-                break
-            last_first_cell_mean = first_mean
+                # 当前页没有任何金色：一般说明已进入紫色/其他区域，停止即可（避免多轮）
+                if page > 0 and gold_on_page == 0:
+                    self.log_info("[essence] stop: no gold found on page")
+                    break
 
-            self._scroll_next_page(settings)
-            self.sleep(settings.scroll_wait_sec)
-            self.next_frame()
-        else:
-            # 达到最大翻页也认为本次扫描结束（细节写入日志）
-            self.log_info(f"[essence] stop: reached max_pages={settings.max_pages}")
+                # 简单的“是否真正翻页”校验：如果首格均值几乎不变，说明已到列表底部或滑动无效
+                self.next_frame()
+                first_cell = self._ref_box(
+                    settings,
+                    grid_x - icon_w / 2,
+                    grid_y - icon_h / 2,
+                    grid_x + icon_w / 2,
+                    grid_y + icon_h / 2,
+                    name="essence_first_cell_mean",
+                ).crop_frame(self.frame)
+                first_mean = float(first_cell.mean()) if first_cell.size else 0.0
+                if (
+                    last_first_cell_mean is not None
+                    and abs(first_mean - last_first_cell_mean) < 0.2
+                ):
+                    self.log_info("[essence] stop: reached bottom (first cell unchanged)")
+                    break
+                last_first_cell_mean = first_mean
+
+                self._scroll_next_page(settings)
+                self.sleep(settings.scroll_wait_sec)
+                self.next_frame()
+            else:
+                # 达到最大翻页也认为本次扫描结束（细节写入日志）
+                self.log_info(f"[essence] stop: reached max_pages={settings.max_pages}")
+
+            if inventory is not None:
+                added = inventory.added_since(scan_start)
+                self.info_set(_INFO_ADDED, str(len(added)))
+                self.log_info(
+                    f"[essence] inventory {len(inventory)} cells, skipped {stats.cached} unchanged, "
+                    f"{len(added)} new essences"
+                )
+        finally:
+            if pipeline is not None:
+                pipeline.close()
+            if inventory is not None:
+                inventory.close()
 
         if stopped_by_user:
             self.info_set(_INFO_STATUS, "已停止")
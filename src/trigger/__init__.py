@@ -0,0 +1 @@
+"""Trigger task scheduling helpers."""
@@ -0,0 +1,80 @@
+"""Budget-aware adaptive polling interval for trigger tasks."""
+
+from __future__ import annotations
+
+import time
+
+
+class AdaptiveTrigger:
+    """
+    单个触发任务的自适应调度:
+    - 连续 miss_threshold 次没有发现目标后, 轮询间隔从 min_interval 开始指数增长, 最多到 max_interval;
+    - 一旦发现目标 (hit) 立即恢复全速;
+    - 检测耗时按指数平均估计, 间隔至少为 耗时 / cpu_budget, 保证该任务占用的 CPU 比例不超过 cpu_budget。
+    """
+
+    def __init__(self, min_interval: float = 0.05, max_interval: float = 2.0, miss_threshold: int = 5,
+                 cpu_budget: float = 0.05, smoothing: float = 0.2):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.miss_threshold = miss_threshold
+        self.cpu_budget = cpu_budget
+        self.smoothing = smoothing
+        self.misses = 0
+        self.cost = 0.0
+        self.last_run = 0.0
+        self._run_start = None
+        self._reported = True
+        self._runs: list[float] = []
+
+    @property
+    def backoff_interval(self) -> float:
+        if self.misses < self.miss_threshold:
+            return 0.0
+        exponent = min(self.misses - self.miss_threshold, 16)
+        return min(self.max_interval, self.min_interval * (2 ** exponent))
+
+    @property
+    def interval(self) -> float:
+        """当前生效的最小触发间隔 (秒), 0 表示不限制 (跟随执行器的触发频率)。"""
+        budget_interval = self.cost / self.cpu_budget if self.cpu_budget > 0 else 0.0
+        return min(self.max_interval, max(self.backoff_interval, budget_interval))
+
+    def should_run(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        if not self._reported:
+            # 上一次运行没有报告未命中, 视为命中 (此时已过了空闲时间, 不计入检测耗时)
+            self._run_start = None
+            self.hit()
+        if now - self.last_run < self.interval:
+            return False
+        self.last_run = now
+        self._run_start = time.perf_counter()
+        self._reported = False
+        self._runs.append(now)
+        if len(self._runs) > 1000:
+            self._runs = self._runs[-500:]
+        return True
+
+    def _finish(self):
+        if self._run_start is not None:
+            cost = time.perf_counter() - self._run_start
+            self.cost += (cost - self.cost) * self.smoothing
+            self._run_start = None
+        self._reported = True
+
+    def miss(self):
+        """本次运行没有发现目标。"""
+        self._finish()
+        self.misses += 1
+
+    def hit(self):
+        """发现目标 (或相关界面出现), 立即恢复全速轮询。"""
+        self._finish()
+        self.misses = 0
+
+    def rate(self, now: float | None = None, window: float = 5.0) -> float:
+        """最近 window 秒内实际的每秒运行次数。"""
+        now = time.time() if now is None else now
+        self._runs = [t for t in self._runs if now - t <= window]
+        return len(self._runs) / window
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.trigger.scheduler import AdaptiveTrigger
+
+
+class TestAdaptiveTrigger(unittest.TestCase):
+    def test_backoff_after_misses(self):
+        trigger = AdaptiveTrigger(min_interval=0.1, max_interval=1.0, miss_threshold=3, cpu_budget=0)
+        now = 0.0
+        for _ in range(3):
+            self.assertTrue(trigger.should_run(now))
+            trigger.miss()
+        self.assertEqual(trigger.interval, 0.1)
+        for _ in range(10):
+            trigger.miss()
+        self.assertEqual(trigger.interval, 1.0)
+        self.assertFalse(trigger.should_run(now + 0.5))
+        self.assertTrue(trigger.should_run(now + 1.01))
+
+    def test_hit_snaps_back(self):
+        trigger = AdaptiveTrigger(min_interval=0.1, miss_threshold=1, cpu_budget=0)
+        for _ in range(5):
+            trigger.miss()
+        self.assertGreater(trigger.interval, 0)
+        trigger.should_run(100)
+        # 没有报告未命中即视为命中
+        self.assertTrue(trigger.should_run(100))
+        self.assertEqual(trigger.interval, 0)
+
+    def test_cpu_budget(self):
+        trigger = AdaptiveTrigger(cpu_budget=0.1, max_interval=5)
+        trigger.cost = 0.02
+        self.assertAlmostEqual(trigger.interval, 0.2)
+
+    def test_rate(self):
+        trigger = AdaptiveTrigger(cpu_budget=0)
+        for i in range(10):
+            trigger.should_run(i * 0.5)
+        self.assertAlmostEqual(trigger.rate(now=4.5, window=5), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# Test case
+import glob
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.combat.bar_outline import BarOutlineDetector, has_bar_outline
+from src.config import config
+from src.tasks.AutoCombatTask import AutoCombatTask
+from tests._legacy_skill_bar import has_rectangles
+
+RESOLUTIONS = ((1920, 1080), (2560, 1440), (3840, 2160))
+
+
+class TestBarOutline(TaskTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # 截图均为 1080p, 全部放大生成 1440p / 4K 版本用于对比和测速
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.images = {}
+        for width, height in RESOLUTIONS:
+            for image in sorted(glob.glob('tests/images/*.png')):
+                frame = cv2.imread(image)
+                if (frame.shape[1], frame.shape[0]) != (width, height):
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_CUBIC)
+                path = os.path.join(cls.tmp_dir.name, f'{width}x{height}_{os.path.basename(image)}')
+                cv2.imwrite(path, frame)
+                cls.images.setdefault((width, height), []).append(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+        super().tearDownClass()
+
+    def skill_area(self):
+        return self.task.box_of_screen_scaled(3840, 2160, 1586, 1940, 2266, 1983).crop_frame(self.task.frame)
+
+    def test_agrees_with_has_rectangles(self):
+        for paths in self.images.values():
+            for image in paths:
+                self.set_image(image)
+                hud = self.skill_area()
+                self.assertEqual(has_bar_outline(hud), has_rectangles(hud), image)
+
+    def test_cache(self):
+        self.set_image('tests/images/in_combat_2.png')
+        detector = BarOutlineDetector(cache_size=2)
+        hud = self.skill_area()
+        self.assertTrue(detector(hud))
+        self.assertTrue(detector(hud.copy()))
+        self.assertEqual((detector.hits, detector.misses), (1, 1))
+
+    def test_benchmark(self):
+        rounds = 20
+        for resolution, paths in self.images.items():
+            legacy_cost = 0
+            projection_cost = 0
+            for image in paths:
+                self.set_image(image)
+                hud = self.skill_area()
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    has_rectangles(hud)
+                legacy_cost += time.perf_counter() - start
+
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    has_bar_outline(hud)
+                projection_cost += time.perf_counter() - start
+            frames = len(paths) * rounds
+            print(f'\nskill bar outline {resolution[0]}x{resolution[1]}: has_rectangles '
+                  f'{legacy_cost / frames * 1000:.3f}ms projection {projection_cost / frames * 1000:.3f}ms '
+                  f'({legacy_cost / projection_cost:.1f}x)')
+            self.assertLess(projection_cost, legacy_cost)
+
+
+if __name__ == '__main__':
+    unittest.main()
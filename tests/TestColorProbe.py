@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import glob
+import unittest
+
+import cv2
+import numpy as np
+
+from src.combat.skill_bar import white_skill_color, yellow_skill_color
+from src.image.color_probe import ColorProbe, grayscale_fraction, longest_run, probe_for
+
+
+def in_range(image, color_range):
+    lower = (color_range['b'][0], color_range['g'][0], color_range['r'][0])
+    upper = (color_range['b'][1], color_range['g'][1], color_range['r'][1])
+    return cv2.inRange(image, lower, upper) > 0
+
+
+class TestColorProbe(unittest.TestCase):
+    def test_masks_match_in_range(self):
+        probe = ColorProbe({'yellow': yellow_skill_color, 'white': white_skill_color})
+        for image in sorted(glob.glob('tests/images/*.png')):
+            roi = cv2.imread(image)[100:900, 50:1500]
+            self.assertTrue(np.array_equal(probe.mask(roi, 'yellow'), in_range(roi, yellow_skill_color)), image)
+            self.assertTrue(np.array_equal(probe.mask(roi, 'white'), in_range(roi, white_skill_color)), image)
+
+            result = probe.probe(roi)
+            self.assertAlmostEqual(result.fractions['white'], in_range(roi, white_skill_color).mean())
+            self.assertTrue(np.array_equal(result.row_counts['yellow'],
+                                           in_range(roi, yellow_skill_color).sum(axis=1)))
+
+    def test_dominant_and_runs(self):
+        roi = np.zeros((6, 10, 3), dtype=np.uint8)
+        roi[1:4] = (255, 255, 255)
+        roi[5, :3] = (0, 200, 255)
+        result = ColorProbe({'yellow': yellow_skill_color, 'white': white_skill_color}).probe(roi)
+        self.assertEqual(result.dominant, 'white')
+        self.assertEqual(result.longest_run('white', 0.9), 3)
+        self.assertEqual(result.longest_run('yellow', 0.3), 1)
+        self.assertIs(probe_for(white_skill_color), probe_for(dict(white_skill_color)))
+        self.assertIsNone(ColorProbe({'white': white_skill_color}).probe(roi[4:5]).dominant)
+
+    def test_grayscale_fraction(self):
+        frame = cv2.imread('tests/images/no_combat.png')
+        b, g, r = cv2.split(frame)
+        expected = ((cv2.absdiff(r, g) < 10) & (cv2.absdiff(g, b) < 10) & (cv2.absdiff(b, r) < 10)).mean()
+        self.assertAlmostEqual(grayscale_fraction(frame), expected)
+
+    def test_longest_run(self):
+        self.assertEqual(longest_run(np.array([1, 1, 0, 1, 1, 1, 0], dtype=bool)), 3)
+        self.assertEqual(longest_run(np.zeros(4, dtype=bool)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
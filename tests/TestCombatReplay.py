@@ -0,0 +1,39 @@
+# Test case
+import unittest
+
+from src.config import config
+from src.tasks.AutoCombatTask import AutoCombatTask
+from tests._combat_replay import CombatReplayTestCase, cast_latencies, RecordedAction
+
+# 技能点 1 -> 2 -> 2 (触发技能序列) -> 脱战
+REPLAY_SEQUENCE = (['tests/images/in_combat_5.png'] * 3 +
+                   ['tests/images/in_combat_2_bars.png'] * 20 +
+                   ['tests/images/in_combat_2.png'] * 20 +
+                   ['tests/images/no_combat.png'] * 5)
+
+
+class TestCombatReplay(CombatReplayTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    def test_replay_fixture_sequence(self):
+        report = self.replay(REPLAY_SEQUENCE)
+        print(f'\ncombat replay: {report.summary()}')
+
+        self.assertGreater(report.decisions, 0)
+        self.assertGreater(report.decisions_per_second, 0)
+        self.assertTrue(report.skill_casts, report.actions)
+        self.assertTrue(report.cast_latencies)
+        self.assertGreater(report.casts_per_minute, 0)
+        self.assertGreater(report.detector_time, 0)
+
+    def test_cast_latency(self):
+        served = [(0.0, 0), (0.1, 1), (0.2, 2), (0.3, 3)]
+        actions = [RecordedAction(0.15, 'click', 'left', 1), RecordedAction(0.25, 'send_key', '1', 2)]
+        self.assertEqual(cast_latencies(served, [1, 1, 2, 2], actions, trigger_count=2), [0.25 - 0.2])
+        self.assertEqual(cast_latencies(served, [1, 1, 1, 1], actions, trigger_count=2), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
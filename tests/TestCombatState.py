@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+from collections import Counter
+
+from src.combat.perception import PerceptionWorker
+from src.combat.state import CombatState
+
+
+class _Task:
+    def __init__(self, skill_bar_count=2, in_team=True, lv=False, e_ready=False, ult=None):
+        self.calls = Counter()
+        self.skill_bar_count = skill_bar_count
+        self.team = in_team
+        self.lv = lv
+        self.e_ready = e_ready
+        self.ult = ult
+
+    def detect_skill_bar_count(self, frame):
+        self.calls['skill_bar_count'] += 1
+        return self.skill_bar_count
+
+    def detect_hud_icons(self, frame):
+        self.calls['hud_icons'] += 1
+        icons = {f'skill_{i}': self.team for i in '1234'}
+        icons.update({f'ult_{i}': i == self.ult for i in '1234'})
+        icons['skill_e'] = self.e_ready
+        return icons
+
+    def detect_lv(self, frame):
+        self.calls['lv'] += 1
+        return self.lv
+
+
+class TestCombatState(unittest.TestCase):
+    def test_fields_are_computed_once_per_frame(self):
+        task = _Task()
+        state = CombatState(task, frame=object())
+
+        for _ in range(3):
+            self.assertTrue(state.in_combat())
+            self.assertFalse(state.combat_ended())
+            self.assertFalse(state.e_ready)
+
+        self.assertEqual(task.calls['skill_bar_count'], 1)
+        self.assertEqual(task.calls['hud_icons'], 1)
+        self.assertEqual(task.calls['lv'], 1)
+
+    def test_fields_are_lazy(self):
+        task = _Task(skill_bar_count=-1)
+        state = CombatState(task, frame=object())
+
+        self.assertFalse(state.in_combat())
+        self.assertEqual(task.calls['hud_icons'], 0)
+        self.assertEqual(task.calls['lv'], 0)
+
+    def test_hud_icons_are_shared(self):
+        task = _Task(ult='2', e_ready=True)
+        state = CombatState(task, frame=object())
+
+        self.assertEqual(state.ready_ult, '2')
+        self.assertTrue(state.e_ready)
+        self.assertTrue(state.in_team)
+        self.assertEqual(task.calls['hud_icons'], 1)
+
+    def test_combat_ended(self):
+        self.assertTrue(CombatState(_Task(skill_bar_count=-1, lv=True), frame=None).combat_ended())
+        self.assertTrue(CombatState(_Task(skill_bar_count=-1, in_team=False), frame=None).combat_ended())
+        self.assertFalse(CombatState(_Task(skill_bar_count=-1), frame=None).combat_ended())
+        self.assertFalse(CombatState(_Task(skill_bar_count=0, lv=True), frame=None).combat_ended())
+
+
+class TestPerceptionWorker(unittest.TestCase):
+    def test_publishes_evaluated_state(self):
+        task = _Task(ult='3')
+        worker = PerceptionWorker(task, capture=lambda: object(), min_interval=0.005)
+        worker.start()
+        try:
+            deadline = time.time() + 2
+            state = None
+            while state is None and time.time() < deadline:
+                state = worker.latest(max_age=1)
+                time.sleep(0.01)
+        finally:
+            worker.stop()
+
+        self.assertIsNotNone(state)
+        self.assertIn('hud_icons', state.__dict__)
+        self.assertEqual(state.__dict__['skill_bar_count'], 2)
+        self.assertEqual(state.ready_ult, '3')
+        self.assertGreater(worker.frames, 0)
+
+    def test_stale_state_is_dropped(self):
+        worker = PerceptionWorker(_Task(), capture=lambda: object(), min_interval=0.005)
+        worker.start()
+        time.sleep(0.05)
+        worker.stop()
+        time.sleep(0.02)
+
+        self.assertIsNotNone(worker.latest(max_age=1))
+        self.assertIsNone(worker.latest(max_age=0.001))
+
+    def test_state_before_input_is_rejected(self):
+        worker = PerceptionWorker(_Task(), capture=lambda: object(), min_interval=0.02)
+        worker.start()
+        try:
+            self.assertIsNotNone(worker.wait_latest(max_age=1, timeout=1))
+            pressed = time.time()
+            self.assertIsNone(worker.latest(max_age=1, not_before=pressed))
+            state = worker.wait_latest(max_age=1, not_before=pressed, timeout=1)
+        finally:
+            worker.stop()
+
+        self.assertIsNotNone(state)
+        self.assertGreaterEqual(state.timestamp, pressed)
+
+    def test_capture_holds_lock(self):
+        held = []
+        worker = PerceptionWorker(_Task(), capture=lambda: held.append(worker.capture_lock.locked()) or object(),
+                                  min_interval=0.005)
+        worker.start()
+        try:
+            worker.wait_latest(max_age=1, timeout=1)
+        finally:
+            worker.stop()
+
+        self.assertTrue(held)
+        self.assertTrue(all(held))
+
+
+if __name__ == '__main__':
+    unittest.main()
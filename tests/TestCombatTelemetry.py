@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import csv
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.combat.telemetry import STAGES, CombatTelemetry
+
+
+class TestCombatTelemetry(unittest.TestCase):
+    def test_stage_times_are_accumulated_per_iteration(self):
+        telemetry = CombatTelemetry()
+        for _ in range(3):
+            with telemetry.measure('hud_match'):
+                time.sleep(0.002)
+            with telemetry.measure('hud_match'):
+                time.sleep(0.002)
+            telemetry.end_iteration()
+
+        self.assertEqual(telemetry.iterations, 3)
+        p50, p95, p99 = telemetry.percentiles('hud_match')
+        self.assertGreaterEqual(p50, 0.004)
+        self.assertLessEqual(p50, p95)
+        self.assertLessEqual(p95, p99)
+        self.assertEqual(telemetry.percentiles('ocr_lv'), (0.0, 0.0, 0.0))
+
+        summary = telemetry.summary()
+        self.assertIn('hud_match', summary)
+        self.assertIn('iteration', summary)
+        self.assertNotIn('ocr_lv', summary)
+
+    def test_disabled_records_nothing(self):
+        telemetry = CombatTelemetry(enabled=False)
+        with telemetry.measure('sleep'):
+            pass
+        telemetry.end_iteration()
+        self.assertEqual(telemetry.iterations, 0)
+        self.assertIsNone(telemetry.dump_csv(Path(tempfile.gettempdir()) / 'unused.csv'))
+
+    def test_dump_csv(self):
+        telemetry = CombatTelemetry()
+        with telemetry.measure('sleep'):
+            time.sleep(0.001)
+        telemetry.end_iteration()
+        telemetry.end_iteration()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = telemetry.dump_csv(Path(tmp) / 'combat' / 'combat.csv')
+            with path.open(encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(list(rows[0].keys()), ['time', 'iteration'] + list(STAGES))
+        self.assertGreater(float(rows[0]['sleep']), 0)
+        self.assertEqual(float(rows[1]['sleep']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from ok.test.TaskTestCase import TaskTestCase
 
 from src.config import config
+from src.essence.essence_recognizer import (
+    _attach_levels,
+    ocr_essence_levels,
+    ocr_essence_panel,
+    parse_essence_panel,
+)
 from src.tasks.EssenceScanTask import EssenceScanTask, EssenceScanSettings
 
 
@@ -44,6 +51,48 @@ class TestEssenceGoldGrid(TaskTestCase):
         assert info is not None
         self.assertTrue(info.is_gold, f"Expected gold essence in panel, got {info.name}")
 
+    def test_page_quality_map_matches_cells(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        image_path = repo_root / "tests" / "images" / "essence_gold_row1.png"
+        if not image_path.exists():
+            self.skipTest(f"Missing test image: {image_path}")
+
+        self.set_image(str(image_path))
+
+        settings = EssenceScanSettings.from_task(self.task)
+        quality = self.task._page_quality_map(settings)
+        self.assertEqual(quality.gold.shape, (settings.grid_rows, settings.grid_cols))
+        self.assertTrue(quality.is_gold(0, 0), "Expected row 1 col 1 to be gold")
+        for row in range(settings.grid_rows):
+            for col in range(settings.grid_cols):
+                cell_box = self.task._cell_box(settings, row, col)
+                self.assertEqual(quality.is_gold(row, col), self.task._is_gold_cell(cell_box), f"{row}-{col}")
+
+    def test_levels_recognized_without_second_detection(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        image_path = repo_root / "tests" / "images" / "essence_gold_row1.png"
+        if not image_path.exists():
+            self.skipTest(f"Missing test image: {image_path}")
+
+        self.set_image(str(image_path))
+
+        # 旧流程：面板和等级区域各 OCR 一次
+        panel = parse_essence_panel(ocr_essence_panel(self.task))
+        self.assertIsNotNone(panel)
+        assert panel is not None
+        expected = _attach_levels(panel, ocr_essence_levels(self.task))
+
+        # 新流程：只有面板做检测+识别，等级只在按词条位置算出的小框上批量识别一次
+        with mock.patch.object(self.task, "ocr", wraps=self.task.ocr) as ocr, mock.patch.object(
+            self.task, "ocr_recognize", wraps=self.task.ocr_recognize
+        ) as recognize:
+            info = self.task.read_essence_info()
+        self.assertEqual(ocr.call_count, 1)
+        self.assertEqual(recognize.call_count, 1)
+        self.assertIsNotNone(info)
+        assert info is not None
+        self.assertEqual(info.entries, expected)
+        self.assertTrue(all(e.level is not None for e in info.entries), info.entries)
 
 if __name__ == "__main__":
     unittest.main()
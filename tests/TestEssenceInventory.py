@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import cv2
+import numpy as np
+
+from src.essence.essence_recognizer import EssenceEntry, EssenceInfo
+from src.essence.inventory import EssenceInventory, can_reuse, thumbnail_hash
+
+
+def _info(name="无瑕基质：流转", levels=(1, 2, 3), is_gold=True):
+    entries = tuple(EssenceEntry(name=n, level=lv) for n, lv in zip(("意志提升", "攻击提升", "流转"), levels))
+    return EssenceInfo(name=name, source="四号谷底", entries=entries, is_gold=is_gold)
+
+
+class TestEssenceInventory(unittest.TestCase):
+    def setUp(self):
+        self.inventory = EssenceInventory(":memory:")
+        frame = cv2.imread("tests/images/essence_gold_row1.png")
+        self.cell = frame[200:400, 100:300]
+        self.other = frame[200:400, 500:700]
+
+    def tearDown(self):
+        self.inventory.close()
+
+    def test_thumbnail_hash_stable(self):
+        noisy = np.clip(self.cell.astype(np.int16) + np.random.default_rng(0).integers(-1, 2, self.cell.shape), 0, 255)
+        self.assertEqual(thumbnail_hash(self.cell), thumbnail_hash(noisy.astype(np.uint8)))
+        self.assertNotEqual(thumbnail_hash(self.cell), thumbnail_hash(self.other))
+
+    def test_lookup_round_trip(self):
+        h = thumbnail_hash(self.cell)
+        self.assertIsNone(self.inventory.lookup("1-1", h))
+        self.inventory.record("1-1", h, _info(), graduated=True, lock_state="locked", now=100)
+        record = self.inventory.lookup("1-1", h)
+        self.assertIsNotNone(record)
+        self.assertEqual(record.info, _info())
+        self.assertEqual(record.lock_state, "locked")
+        self.assertTrue(record.graduated)
+        self.assertIsNone(self.inventory.lookup("1-2", h))
+        self.assertIsNone(self.inventory.lookup("1-1", thumbnail_hash(self.other)))
+
+    def test_changed_cell_replaces_record(self):
+        self.inventory.record("1-1", thumbnail_hash(self.cell), _info(), graduated=False, lock_state=None, now=100)
+        self.inventory.record("1-1", thumbnail_hash(self.other), _info(levels=(3, 3, 3)), graduated=False,
+                              lock_state=None, now=200)
+        self.assertEqual(len(self.inventory), 1)
+        self.assertIsNone(self.inventory.lookup("1-1", thumbnail_hash(self.cell)))
+
+    def test_added_since_keeps_first_seen(self):
+        self.inventory.record("1-1", "a", _info(), graduated=True, lock_state="locked", now=100)
+        # 同一个基质因前面插入新基质而移动到下一格, 首次出现时间不变
+        self.inventory.begin_scan()
+        self.inventory.record("1-2", "b", _info(), graduated=True, lock_state="locked", now=200)
+        self.inventory.record("1-1", "c", _info(levels=(2, 2, 2)), graduated=False, lock_state=None, now=200)
+        added = self.inventory.added_since(150)
+        self.assertEqual([r.position for r in added], ["1-1"])
+        self.assertEqual(added[0].info.entries[0].level, 2)
+
+    def test_added_since_after_list_shift(self):
+        w, x, n = _info(levels=(1, 1, 1)), _info(levels=(2, 2, 2)), _info(levels=(3, 3, 3))
+        self.inventory.record("1-1", "w", w, graduated=False, lock_state=None, now=100)
+        self.inventory.record("1-2", "x", x, graduated=False, lock_state=None, now=100)
+        # 在 1-1 前插入新基质 N, 按扫描顺序先覆盖 1-1 再记录移走的 W、X
+        self.inventory.begin_scan()
+        self.inventory.record("1-1", "n", n, graduated=False, lock_state=None, now=200)
+        self.inventory.record("1-2", "w", w, graduated=False, lock_state=None, now=200)
+        self.inventory.record("1-3", "x", x, graduated=False, lock_state=None, now=200)
+        self.assertEqual([r.info for r in self.inventory.added_since(150)], [n])
+        self.assertEqual(self.inventory.lookup("1-2", "w").first_seen, 100)
+
+    def test_added_since_counts_duplicate_copy(self):
+        a = _info()
+        self.inventory.record("1-1", "a", a, graduated=True, lock_state="locked", now=100)
+        # 又获得一个完全相同的基质, 排在原来那个前面
+        self.inventory.begin_scan()
+        self.inventory.record("1-1", "a", a, graduated=True, lock_state="locked", now=200)
+        self.inventory.record("1-2", "a", a, graduated=True, lock_state="locked", now=200)
+        self.assertEqual(len(self.inventory.added_since(150)), 1)
+        # 再扫一遍, 两个副本都不算新增
+        self.inventory.begin_scan()
+        self.inventory.record("1-1", "a", a, graduated=True, lock_state="locked", now=300)
+        self.inventory.touch("1-2", "a", now=300)
+        self.assertEqual(self.inventory.added_since(250), [])
+
+    def test_shifted_gold_cell_not_reused(self):
+        h = thumbnail_hash(self.cell)
+        # 同类基质图标相同: A 毕业已上锁, 前面插入同类的 N 后 A 移到 1-2, N 的缩略图命中 A 留在 1-1 的记录
+        self.inventory.record("1-1", h, _info(levels=(3, 3, 3)), graduated=True, lock_state="locked", now=100)
+        hit = self.inventory.lookup("1-1", h)
+        self.assertIsNotNone(hit)
+        self.assertFalse(can_reuse(hit, is_gold_candidate=True))
+
+        self.inventory.record("2-1", "p", _info(is_gold=False), graduated=False, lock_state=None, now=100)
+        plain = self.inventory.lookup("2-1", "p")
+        self.assertTrue(can_reuse(plain, is_gold_candidate=False))
+        self.assertFalse(can_reuse(plain, is_gold_candidate=True))
+        self.assertFalse(can_reuse(None, is_gold_candidate=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+import numpy as np
+
+from src.essence.scan_pipeline import EssenceOcrPipeline, ScannedCell
+
+CLICK_LATENCY = 0.03
+OCR_LATENCY = 0.03
+
+
+def _fake_ocr(frame):
+    time.sleep(OCR_LATENCY)
+    return int(frame[0, 0])
+
+
+def _cell(i):
+    return ScannedCell(0, i, 0, 0, f"1-{i + 1}")
+
+
+class TestEssencePipeline(unittest.TestCase):
+    def scan(self, pipeline, count):
+        results = []
+        for i in range(count):
+            results.extend(pipeline.ready())
+            if pipeline.full:
+                results.append(pipeline.wait_one())
+            time.sleep(CLICK_LATENCY)  # 点击 + 等待面板
+            pipeline.submit(_cell(i), np.full((4, 4), i, dtype=np.uint8))
+        results.extend(pipeline.drain())
+        return results
+
+    def test_results_in_order_and_overlapped(self):
+        count = 12
+        pipeline = EssenceOcrPipeline(_fake_ocr)
+        try:
+            start = time.perf_counter()
+            results = self.scan(pipeline, count)
+            elapsed = time.perf_counter() - start
+        finally:
+            pipeline.close()
+        self.assertEqual([cell.col for cell, _ in results], list(range(count)))
+        self.assertEqual([info for _, info in results], list(range(count)))
+        # 理想情况约为逐格的一半; 只要求明显少于逐格耗时, 给负载较高的机器留余量
+        sequential = count * (CLICK_LATENCY + OCR_LATENCY)
+        self.assertLess(elapsed, sequential * 0.9)
+        self.assertGreater(pipeline.ocr_time, 0)
+
+    def test_cancel_drops_pending(self):
+        pipeline = EssenceOcrPipeline(_fake_ocr, depth=4)
+        try:
+            for i in range(3):
+                pipeline.submit(_cell(i), np.full((4, 4), i, dtype=np.uint8))
+            self.assertEqual(len(pipeline), 3)
+            pipeline.cancel()
+            self.assertEqual(list(pipeline.drain()), [])
+        finally:
+            pipeline.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
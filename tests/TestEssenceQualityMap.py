@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import cv2
+import numpy as np
+
+from src.essence.quality_grid import classify_quality_grid
+
+
+class TestEssenceQualityMap(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.frame = rng.integers(0, 60, (720, 1280, 3), dtype=np.uint8)
+        self.template = rng.integers(0, 255, (18, 30, 3), dtype=np.uint8)
+        self.rows, self.cols = 3, 5
+        self.cells = np.zeros((self.rows, self.cols, 4), dtype=np.int32)
+        for r in range(self.rows):
+            for c in range(self.cols):
+                # 相邻格子的搜索框有重叠, 与游戏内的网格设置一致
+                self.cells[r, c] = (100 + c * 120, 80 + r * 130, 140, 140)
+        self.gold = {(0, 0), (0, 1), (1, 3), (2, 4)}
+        for r, c in self.gold:
+            x, y = self.cells[r, c][:2]
+            self.frame[y + 100:y + 118, x + 95:x + 125] = self.template
+
+    def per_cell(self, threshold):
+        expected = np.zeros((self.rows, self.cols), dtype=bool)
+        for r in range(self.rows):
+            for c in range(self.cols):
+                x, y, w, h = self.cells[r, c]
+                result = cv2.matchTemplate(self.frame[y:y + h, x:x + w], self.template, cv2.TM_CCOEFF_NORMED)
+                expected[r, c] = result.max() >= threshold
+        return expected
+
+    def test_same_as_per_cell_search(self):
+        quality = classify_quality_grid(self.frame, self.cells, [(self.template, None)], 0.75)
+        np.testing.assert_array_equal(quality.gold, self.per_cell(0.75))
+        self.assertEqual({tuple(p) for p in np.argwhere(quality.gold)}, self.gold)
+        self.assertEqual(quality.gold_count, len(self.gold))
+        self.assertFalse(quality.is_gold(5, 0))
+
+    def test_no_templates(self):
+        quality = classify_quality_grid(self.frame, self.cells, [], 0.75)
+        self.assertEqual(quality.gold_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
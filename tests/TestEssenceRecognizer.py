@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import unittest
 
-from src.essence.essence_recognizer import _attach_levels, parse_essence_panel
+from src.essence.essence_recognizer import _attach_levels, _parse_level, parse_essence_panel
 
 
 class _Box:
@@ -74,6 +74,13 @@ class TestEssenceRecognizer(unittest.TestCase):
         self.assertEqual(panel.entry_names, ("意志提升", "攻击提升", "流转"))
         self.assertEqual(len(panel.entry_boxes), 3)
 
+    def test_parse_level_prefers_plus_number(self):
+        # 等级小框里的分隔竖线可能被识别成 1
+        self.assertEqual(_parse_level(_Box(0, 0, 60, 18, "1+3")), 3)
+        self.assertEqual(_parse_level(_Box(0, 0, 60, 18, " | + 2 °")), 2)
+        self.assertEqual(_parse_level(_Box(0, 0, 60, 18, "+1")), 1)
+        self.assertIsNone(_parse_level(_Box(0, 0, 60, 18, "+")))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from types import SimpleNamespace
+
+from src.image.feature_window import search_window
+
+
+class TestSearchWindow(unittest.TestCase):
+    def feature_set(self, variance):
+        return SimpleNamespace(width=1920, height=1080, default_horizontal_variance=variance,
+                               default_vertical_variance=variance)
+
+    def test_variance(self):
+        feature = SimpleNamespace(x=100, y=200, width=40, height=20, scaling=1)
+        self.assertEqual(search_window(self.feature_set(0.01), feature), (81, 189, 159, 231))
+        self.assertEqual(search_window(self.feature_set(0), feature), (100, 200, 140, 220))
+
+    def test_scaled_feature_without_variance(self):
+        # 与 find_one_feature 一致: 缩放过的特征在 variance 为 0 时四周留 1 像素
+        feature = SimpleNamespace(x=100, y=200, width=40, height=20, scaling=1.5)
+        self.assertEqual(search_window(self.feature_set(0), feature), (99, 199, 141, 221))
+        self.assertEqual(search_window(self.feature_set(0.01), feature), (81, 189, 159, 231))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# Test case
+import glob
+import time
+import unittest
+
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.combat.hud_matcher import HUD_FEATURES
+from src.config import config
+from src.tasks.AutoCombatTask import AutoCombatTask
+
+
+class TestHudMatcher(TaskTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    def images(self):
+        return sorted(glob.glob('tests/images/in_combat_*.png') + glob.glob('tests/images/no_combat*.png'))
+
+    def find_one_each(self, frame):
+        return {name: self.task.find_one(name, threshold=threshold, frame=frame)
+                for name, threshold in HUD_FEATURES.items()}
+
+    def test_same_results_as_find_one(self):
+        for image in self.images():
+            self.set_image(image)
+            frame = self.task.frame
+            batched = self.task.detect_hud_icons(frame)
+            expected = self.find_one_each(frame)
+            self.assertEqual(set(batched.keys()), set(expected.keys()))
+            for name, box in expected.items():
+                self.assertEqual(bool(batched[name]), bool(box), f'{image} {name}')
+                if box:
+                    self.assertEqual((batched[name].x, batched[name].y), (box.x, box.y), f'{image} {name}')
+                    self.assertAlmostEqual(batched[name].confidence, box.confidence, places=4)
+
+    def test_benchmark(self):
+        rounds = 20
+        find_one_cost = 0
+        batched_cost = 0
+        for image in self.images():
+            self.set_image(image)
+            frame = self.task.frame
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.find_one_each(frame)
+            find_one_cost += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.task.detect_hud_icons(frame)
+            batched_cost += time.perf_counter() - start
+
+        frames = max(1, len(self.images()) * rounds)
+        print(f'\nhud icons per frame: find_one x{len(HUD_FEATURES)} {find_one_cost / frames * 1000:.3f}ms '
+              f'batched {batched_cost / frames * 1000:.3f}ms')
+        self.assertLess(batched_cost, find_one_cost)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.interaction.timeline import InputScheduler, InputTimeline, RecordingBackend, coalesce
+
+
+class FakeClock:
+    """sleep 直接推进时间的模拟时钟, 调度结果与机器负载无关。"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestInputTimeline(unittest.TestCase):
+    def test_press_order(self):
+        timeline = InputTimeline().activate(settle=0.5).press('wd', 0.01)
+        self.assertEqual([e.kind for e in timeline.events],
+                         ['activate', 'key_down', 'key_down', 'key_up', 'key_up'])
+        self.assertAlmostEqual(timeline.duration, 0.01)
+
+    def test_coalesce_clicks(self):
+        timeline = InputTimeline().activate()
+        for i in range(3):
+            timeline.activate(at=i * 0.2)
+            timeline.click(100 + i, 200, lparam=i, at=i * 0.2, restore_after=0.1)
+        kinds = [e.kind for e in coalesce(timeline.events)]
+        self.assertEqual(kinds.count('activate'), 1)
+        self.assertEqual(kinds.count('cursor_save'), 1)
+        self.assertEqual(kinds.count('cursor_restore'), 1)
+        self.assertEqual(kinds[-1], 'cursor_restore')
+        self.assertEqual(kinds.count('button_down'), 3)
+
+    def test_dispatch_pacing(self):
+        clock = FakeClock()
+        backend = RecordingBackend(clock=clock)
+        scheduler = InputScheduler(backend, sleep=clock.sleep, spin=0, clock=clock)
+        timeline = InputTimeline().mouse_delta(30, -12, steps=10, interval=0.003)
+        report = scheduler.run(timeline)
+        self.assertEqual(backend.kinds, ['mouse_move'] * 10)
+        self.assertEqual(sum(args[0] for _, _, args in backend.records), 30)
+        for i, (t, _, _) in enumerate(backend.records):
+            self.assertAlmostEqual(t, i * 0.003)
+        self.assertAlmostEqual(report.max_lateness, 0)
+
+    def test_real_clock_keeps_order(self):
+        backend = RecordingBackend()
+        report = InputScheduler(backend).run(InputTimeline().mouse_delta(30, -12, steps=10, interval=0.003))
+        times = [t for t, _, _ in backend.records]
+        self.assertEqual(times, sorted(times))
+        # 只检查最后一个事件不会早于计划时刻, 不对真实时钟的延迟做断言
+        self.assertGreaterEqual(report.elapsed, 9 * 0.003)
+
+    def test_activation_settle_shifts_events(self):
+        clock = FakeClock()
+        backend = RecordingBackend(activation_settle=0.02, clock=clock)
+        InputScheduler(backend, sleep=clock.sleep, spin=0, clock=clock).run(
+            InputTimeline().activate(settle=0.5).press('w', 0.005))
+        times = {kind: t for t, kind, _ in backend.records}
+        self.assertAlmostEqual(times['key_down'] - times['activate'], 0.02)
+        self.assertAlmostEqual(times['key_up'] - times['key_down'], 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
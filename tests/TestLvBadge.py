@@ -0,0 +1,57 @@
+# Test case
+import glob
+import time
+import unittest
+
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.combat.lv_badge import has_lv_badge
+from src.config import config
+from src.tasks.AutoCombatTask import AutoCombatTask
+
+
+class TestLvBadge(TaskTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    def lv_region(self):
+        return self.task.box_of_screen(0.02, 0.89, 0.23, 0.93, name='lv_text').crop_frame(self.task.frame)
+
+    def test_candidate_matches_fixtures(self):
+        for image in sorted(glob.glob('tests/images/no_combat*.png')):
+            self.set_image(image)
+            self.assertTrue(has_lv_badge(self.lv_region()), image)
+            self.assertTrue(self.task.ocr_lv(), image)
+
+        for image in sorted(glob.glob('tests/images/in_combat_*.png')):
+            self.set_image(image)
+            self.assertFalse(has_lv_badge(self.lv_region()), image)
+            self.assertFalse(self.task.ocr_lv(), image)
+
+    def test_latency_against_ocr(self):
+        images = sorted(glob.glob('tests/images/no_combat*.png') + glob.glob('tests/images/in_combat_*.png'))
+        rounds = 5
+        ocr_cost = 0
+        glyph_cost = 0
+        for image in images:
+            self.set_image(image)
+            frame = self.task.frame
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.task.ocr_lv_text(frame)
+            ocr_cost += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.task.detect_lv(frame)
+            glyph_cost += time.perf_counter() - start
+
+        frames = max(1, len(images) * rounds)
+        print(f'\nlv check per frame: ocr {ocr_cost / frames * 1000:.3f}ms '
+              f'glyph+confirm {glyph_cost / frames * 1000:.3f}ms')
+        self.assertLess(glyph_cost, ocr_cost)
+
+
+if __name__ == '__main__':
+    unittest.main()
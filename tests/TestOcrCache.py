@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from src.image.ocr_cache import OcrCache, difference_hash, hamming_distance
+
+
+class TestOcrCache(unittest.TestCase):
+    def setUp(self):
+        frame = cv2.imread('tests/images/take_delivery_example.png')
+        self.zone = frame[400:520, 1200:1700]
+        self.other = frame[600:720, 1200:1700]
+
+    def test_hash_ignores_noise(self):
+        noise = np.random.default_rng(0).integers(-2, 3, self.zone.shape)
+        noisy = np.clip(self.zone.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        self.assertLessEqual(hamming_distance(difference_hash(self.zone), difference_hash(noisy)), 8)
+        self.assertGreater(hamming_distance(difference_hash(self.zone), difference_hash(self.other)), 8)
+
+    def test_hit_miss_and_saved_time(self):
+        cache = OcrCache()
+        key = cache.key(self.zone)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, ['采集'], cost=0.05)
+        self.assertEqual(cache.get(cache.key(self.zone.copy())), ['采集'])
+        self.assertIsNone(cache.get(cache.key(self.other)))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.saved_time, 0.025)
+
+    def test_exact_only(self):
+        noise = np.random.default_rng(0).integers(-2, 3, self.zone.shape)
+        noisy = np.clip(self.zone.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        key, near = OcrCache.key(self.zone), OcrCache.key(noisy)
+        self.assertNotEqual(key, near)
+
+        cache = OcrCache(max_distance=0)
+        cache.put(key, ['采集'])
+        self.assertIsNone(cache.get(near))
+        self.assertEqual(cache.get(OcrCache.key(self.zone.copy())), ['采集'])
+
+        # 默认允许相近指纹命中
+        cache = OcrCache()
+        cache.put(key, ['采集'])
+        self.assertEqual(cache.get(near), ['采集'])
+
+    def test_ttl_and_lru(self):
+        cache = OcrCache(max_size=1, ttl=0.05)
+        zone, other = cache.key(self.zone), cache.key(self.other)
+        cache.put(zone, 1)
+        cache.put(other, 2)
+        self.assertIsNone(cache.get(zone))
+        self.assertEqual(cache.get(other), 2)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
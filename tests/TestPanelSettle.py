@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import cv2
+import numpy as np
+
+from src.essence.panel_settle import PanelSettleDetector, panel_signature
+
+
+def _panel(text, fade=1.0):
+    panel = np.full((300, 400, 3), 40, dtype=np.uint8)
+    overlay = panel.copy()
+    cv2.putText(overlay, text, (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+    cv2.putText(overlay, text[::-1], (20, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (200, 200, 200), 2)
+    return cv2.addWeighted(overlay, fade, panel, 1 - fade, 0)
+
+
+class TestPanelSettle(unittest.TestCase):
+    def run_frames(self, previous, frames, interval=1 / 60):
+        detector = PanelSettleDetector()
+        detector.start(panel_signature(previous))
+        for i, frame in enumerate(frames):
+            if detector.update(panel_signature(frame), timestamp=i * interval):
+                return i
+        return None
+
+    def test_settles_after_redraw(self):
+        old = _panel('ESSENCE A')
+        # 点击后前两帧仍是旧面板, 然后淡入新面板
+        frames = [old, old, _panel('ESSENCE B', 0.3), _panel('ESSENCE B', 0.7), _panel('ESSENCE B'),
+                  _panel('ESSENCE B'), _panel('ESSENCE B')]
+        # 第 4 帧起稳定, 到第 6 帧时跨度 2/60 秒 >= 30ms
+        self.assertEqual(self.run_frames(old, frames), 6)
+
+    def test_repeated_capture_is_not_settled(self):
+        old = _panel('ESSENCE A')
+        fading = _panel('ESSENCE B', 0.5)
+        # 5ms 内两次截到同一个淡入中的画面, 不能算稳定
+        self.assertIsNone(self.run_frames(old, [fading, fading, fading], interval=0.005))
+        self.assertEqual(self.run_frames(old, [fading, fading, fading], interval=0.02), 2)
+
+    def test_unchanged_panel_never_settles(self):
+        old = _panel('ESSENCE A')
+        self.assertIsNone(self.run_frames(old, [old] * 10))
+
+    def test_unknown_previous(self):
+        new = _panel('ESSENCE B')
+        self.assertEqual(self.run_frames(None, [new, new], interval=0.04), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
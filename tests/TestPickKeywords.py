@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+from src.pick.keywords import BLACK, DEFAULT_KEYWORDS_CSV, WHITE, KeywordMatch, KeywordMatcher, load_pick_keywords
+
+
+class TestPickKeywords(unittest.TestCase):
+    def test_default_lists(self):
+        matcher = KeywordMatcher.from_csv(DEFAULT_KEYWORDS_CSV)
+        self.assertEqual(matcher.match('采集 灰芦麦'), KeywordMatch('采集', WHITE))
+        self.assertEqual(matcher.match('激活'), KeywordMatch('激活', WHITE))
+        self.assertEqual(matcher.match('激活箱子'), KeywordMatch('激活箱子', BLACK))
+        self.assertEqual(matcher.category('打开协议核心'), BLACK)
+        self.assertIsNone(matcher.match('对话'))
+
+    def test_same_result_as_substring_scan(self):
+        keywords = load_pick_keywords(DEFAULT_KEYWORDS_CSV)
+        matcher = KeywordMatcher(keywords)
+        texts = ['采集', '萤壳虫', '打开宝箱', '协议核心', '激活箱子', '激活装置', '酮化灌木丛', '触碰', '传送', '']
+        for text in texts:
+            if any(k in text for k in keywords[BLACK]):
+                expected = BLACK
+            elif any(k in text for k in keywords[WHITE]):
+                expected = WHITE
+            else:
+                expected = None
+            self.assertEqual(matcher.category(text), expected, text)
+
+    def test_user_csv(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'keywords.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('关键词,类别\n采药,白名单\n采集,白名单\n采集箱,黑名单\n未知,其它\n')
+            matcher = KeywordMatcher.from_csv(path)
+        self.assertEqual(matcher.match('采药'), KeywordMatch('采药', WHITE))
+        self.assertEqual(matcher.match('采集箱'), KeywordMatch('采集箱', BLACK))
+        self.assertIsNone(matcher.match('未知'))
+
+
+if __name__ == '__main__':
+    unittest.main()
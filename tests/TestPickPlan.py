@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.tasks.AutoPickTask import BLACK, PICK, SCROLL_DOWN, WHITE, plan_pick_actions
+
+
+class TestPickPlan(unittest.TestCase):
+    def test_all_white(self):
+        self.assertEqual(plan_pick_actions([WHITE, WHITE, WHITE]), [PICK, PICK, PICK])
+
+    def test_skip_black_and_unknown(self):
+        self.assertEqual(plan_pick_actions([BLACK, WHITE, None, WHITE]),
+                         [SCROLL_DOWN, PICK, SCROLL_DOWN, PICK])
+
+    def test_trailing_lines_are_left(self):
+        self.assertEqual(plan_pick_actions([WHITE, BLACK, None]), [PICK])
+        self.assertEqual(plan_pick_actions([BLACK, None]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# Test case
+import time
+import unittest
+
+from ok import Box
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.config import config
+from src.tasks.AutoPickTask import AutoPickTask
+
+
+class TestRoiChange(TaskTestCase):
+    task_class = AutoPickTask
+
+    config = config
+
+    def test_wait_for_roi_change(self):
+        box = Box(800, 950, 400, 100, name='roi')
+        self.set_images('tests/images/in_combat_2.png', 'tests/images/no_combat.png')
+        self.assertTrue(self.task.wait_for_roi_change(box, timeout=0.5))
+
+        # 截图停留在最后一张, 区域不再变化
+        start = time.time()
+        self.assertFalse(self.task.wait_for_roi_change(box, timeout=0.1))
+        self.assertGreaterEqual(time.time() - start, 0.1)
+
+    def test_checksum(self):
+        box = Box(800, 950, 400, 100, name='roi')
+        self.set_image('tests/images/in_combat_2.png')
+        first = self.task.roi_checksum(box)
+        self.set_image('tests/images/in_combat_2.png')
+        self.assertEqual(first, self.task.roi_checksum(box))
+        self.set_image('tests/images/no_combat.png')
+        self.assertNotEqual(first, self.task.roi_checksum(box))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from src.image.roi_gate import RoiGate, roi_signature
+
+
+class _Roi:
+    def __init__(self, x, y, width, height):
+        self.x, self.y, self.width, self.height = x, y, width, height
+
+    def crop_frame(self, frame):
+        return frame[self.y:self.y + self.height, self.x:self.x + self.width]
+
+
+class TestRoiGate(unittest.TestCase):
+    def setUp(self):
+        self.frame = cv2.imread('tests/images/in_combat_2.png')
+        self.other = cv2.imread('tests/images/no_combat.png')
+        self.boxes = [_Roi(800, 950, 400, 100), _Roi(0, 0, 200, 100)]
+
+    def test_signature_ignores_noise(self):
+        crop = self.boxes[0].crop_frame(self.frame)
+        noisy = np.clip(crop.astype(np.int16) + np.random.default_rng(0).integers(-1, 2, crop.shape), 0, 255)
+        changed = np.count_nonzero(np.frombuffer(roi_signature(crop), np.uint8) !=
+                                np.frombuffer(roi_signature(noisy.astype(np.uint8)), np.uint8))
+        self.assertLessEqual(changed, 2)
+        self.assertNotEqual(roi_signature(crop), roi_signature(self.boxes[0].crop_frame(self.other)))
+
+    def test_skips_until_roi_changes(self):
+        gate = RoiGate()
+        self.assertFalse(gate.unchanged(self.frame, self.boxes))
+        gate.mark_negative(self.frame, self.boxes)
+        self.assertTrue(gate.unchanged(self.frame.copy(), self.boxes))
+        self.assertFalse(gate.unchanged(self.other, self.boxes))
+        gate.reset()
+        self.assertFalse(gate.unchanged(self.frame, self.boxes))
+        self.assertEqual((gate.skipped, gate.evaluated), (1, 3))
+
+    def test_changed_after_negative(self):
+        gate = RoiGate()
+        self.assertFalse(gate.changed(self.other, self.boxes))
+        gate.mark_negative(self.frame, self.boxes)
+        self.assertFalse(gate.changed(self.frame.copy(), self.boxes))
+        self.assertTrue(gate.changed(self.other, self.boxes))
+        self.assertEqual((gate.skipped, gate.evaluated), (0, 0))
+
+    def test_max_skip(self):
+        gate = RoiGate(max_skip=0.05)
+        gate.mark_negative(self.frame, self.boxes)
+        self.assertTrue(gate.unchanged(self.frame, self.boxes))
+        time.sleep(0.06)
+        self.assertFalse(gate.unchanged(self.frame, self.boxes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# Test case
+import glob
+import unittest
+
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.config import config
+from src.screen.classifier import SCREEN_FEATURES, Screen, ScreenState
+from src.tasks.AutoCombatTask import AutoCombatTask
+
+
+class TestScreenClassifier(TaskTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    def images(self):
+        return sorted(glob.glob('tests/images/in_combat_*.png') + glob.glob('tests/images/no_combat*.png'))
+
+    def test_same_results_as_find_one(self):
+        for image in self.images():
+            self.set_image(image)
+            frame = self.task.frame
+            state = ScreenState(self.task.executor.feature_set, frame).evaluate()
+            for name, spec in SCREEN_FEATURES.items():
+                expected = self.task.find_one(name, threshold=spec.threshold,
+                                              horizontal_variance=spec.horizontal_variance,
+                                              vertical_variance=spec.vertical_variance, frame=frame)
+                box = state.matches[name]
+                self.assertEqual(bool(box), bool(expected), f'{image} {name}')
+                if expected:
+                    self.assertEqual((box.x, box.y), (expected.x, expected.y), f'{image} {name}')
+
+    def test_world_screen(self):
+        for image in self.images():
+            self.set_image(image)
+            in_world = bool(self.task.find_one('esc') and self.task.find_one('b') and self.task.find_one('c'))
+            self.assertEqual(self.task.current_screen() == Screen.WORLD, in_world, image)
+            self.assertEqual(bool(self.task.in_world()), in_world, image)
+
+    def test_lazy_matching(self):
+        # 没有识别出界面时, 匹配的特征不超过原先 wait_login 逐个 find_one 的范围 (esc 不在时不再匹配 b / c)
+        baseline = {'esc', 'monthly_card', 'logout', 'reward_ok', 'one_click_claim', 'check_in_close'}
+        for image in self.images():
+            self.set_image(image)
+            state = ScreenState(self.task.executor.feature_set, self.task.frame)
+            if state.screen == Screen.UNKNOWN and not state.matches['esc']:
+                self.assertLessEqual(set(state.matches), baseline, image)
+
+    def test_state_cached_per_frame(self):
+        self.set_image('tests/images/no_combat.png')
+        state = self.task.screen_state
+        state.screen
+        self.assertIs(self.task.screen_state, state)
+        self.assertIn('esc', state.matches)
+        self.task.next_frame()
+        self.assertIsNot(self.task.screen_state, state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# Test case
+import glob
+import time
+import unittest
+
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.config import config
+from src.combat.skill_bar import white_skill_color, yellow_skill_color
+from src.tasks.AutoCombatTask import AutoCombatTask
+from tests._legacy_skill_bar import check_is_pure_color_in_4k, has_rectangles
+
+# 与 TestAutoCombat.test_skill_bars 中的断言保持一致
+EXPECTED_COUNTS = {
+    'tests/images/in_combat_5.png': 1,
+    'tests/images/in_combat_2_bars.png': 2,
+    'tests/images/in_combat_2.png': 2,
+    'tests/images/in_combat_white_red.png': 0,
+}
+
+
+class TestSkillBarAnalyzer(TaskTestCase):
+    task_class = AutoCombatTask
+
+    config = config
+
+    def legacy_skill_bar_count(self):
+        task = self.task
+        skill_area = task.box_of_screen_scaled(3840, 2160, 1586, 1940, 2266, 1983).crop_frame(task.frame)
+        if not has_rectangles(skill_area):
+            return -1
+        count = 0
+        for x1, x2 in [(1604, 1796), (1824, 2013), (2043, 2231)]:
+            if check_is_pure_color_in_4k(task, x1, 1958, x2, 1970, yellow_skill_color):
+                count += 1
+            else:
+                break
+        if count == 0 and not check_is_pure_color_in_4k(task, 1604, 1958, 1614, 1970, white_skill_color,
+                                                        threshold=0.1):
+            count = -1
+        return count
+
+    def test_same_counts_as_legacy(self):
+        for image in sorted(glob.glob('tests/images/in_combat_*.png')):
+            self.set_image(image)
+            count = self.task.get_skill_bar_count()
+            self.assertEqual(count, self.legacy_skill_bar_count(), image)
+            if image in EXPECTED_COUNTS:
+                self.assertEqual(count, EXPECTED_COUNTS[image], image)
+
+    def test_benchmark(self):
+        images = sorted(glob.glob('tests/images/in_combat_*.png'))
+        rounds = 20
+        legacy_cost = 0
+        vectorized_cost = 0
+        for image in images:
+            self.set_image(image)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.legacy_skill_bar_count()
+            legacy_cost += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                self.task.detect_skill_bar_count(self.task.frame)
+            vectorized_cost += time.perf_counter() - start
+
+        frames = max(1, len(images) * rounds)
+        print(f'\nget_skill_bar_count per frame: legacy {legacy_cost / frames * 1000:.3f}ms '
+              f'vectorized {vectorized_cost / frames * 1000:.3f}ms')
+        self.assertLess(vectorized_cost, legacy_cost)
+
+
+if __name__ == '__main__':
+    unittest.main()
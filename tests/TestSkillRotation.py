@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.combat.rotation import SkillRotation, SkillSpec
+
+
+class TestSkillRotation(unittest.TestCase):
+    def test_waits_for_start_points(self):
+        rotation = SkillRotation.from_sequence('123', start_points=2)
+        self.assertIsNone(rotation.next_skill(1, now=0))
+        self.assertFalse(rotation.active)
+        self.assertEqual(rotation.next_skill(2, now=0), '1')
+        self.assertTrue(rotation.active)
+
+    def test_sequence_order_and_global_cooldown(self):
+        rotation = SkillRotation.from_sequence('123', start_points=2, global_cooldown=1.0)
+        casts = []
+        now = 0.0
+        points = 3
+        while len(casts) < 3 and now < 10:
+            key = rotation.next_skill(points, now)
+            if key:
+                rotation.on_cast(key, now)
+                casts.append((key, now))
+                points -= 1
+            now += 0.25
+        self.assertEqual([key for key, _ in casts], ['1', '2', '3'])
+        self.assertEqual([t for _, t in casts], [0.0, 1.0, 2.0])
+        self.assertFalse(rotation.active)
+        # 技能点不足启动点数时回到充能状态
+        self.assertIsNone(rotation.next_skill(1, now))
+
+    def test_mid_rotation_needs_only_cost(self):
+        rotation = SkillRotation.from_sequence('12', start_points=2, global_cooldown=0)
+        rotation.on_cast(rotation.next_skill(2, now=0), now=0)
+        self.assertIsNone(rotation.next_skill(0, now=1))
+        self.assertEqual(rotation.next_skill(1, now=1), '2')
+
+    def test_priority_skips_skill_on_cooldown(self):
+        rotation = SkillRotation([SkillSpec('3', priority=0, cooldown=5), SkillSpec('1', priority=1),
+                                  SkillSpec('2', priority=2, cost=2)], start_points=1, global_cooldown=0)
+        rotation.on_cast('3', now=0)
+        rotation.reset()
+        self.assertEqual(rotation.next_skill(1, now=1), '1')
+        rotation.on_cast('1', now=1)
+        self.assertIsNone(rotation.next_skill(1, now=2))
+        self.assertEqual(rotation.next_skill(2, now=2), '2')
+
+    def test_reset_keeps_cooldowns(self):
+        rotation = SkillRotation.from_sequence('1', start_points=1, global_cooldown=1.0)
+        rotation.on_cast(rotation.next_skill(1, now=0), now=0)
+        rotation.reset()
+        self.assertIsNone(rotation.next_skill(1, now=0.5))
+        self.assertEqual(rotation.next_skill(1, now=1.0), '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+
+from src.image.text_templates import DEFAULT_TEXT_TEMPLATES, TextTemplateStore
+
+
+def _label(frame, text, x, y, scale=1.0):
+    frame = frame.copy()
+    cv2.rectangle(frame, (x - 6, y - round(30 * scale)), (x + round(160 * scale), y + round(10 * scale)), (30, 30, 30), -1)
+    cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), max(1, round(2 * scale)))
+    return frame
+
+
+class TestTextTemplates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = Path(self.tmp.name) / 'text_templates.json'
+        self.base = cv2.imread('tests/images/no_combat.png')
+        self.labelled = _label(self.base, 'LINKED', 200, 150)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def store_with_label(self):
+        store = TextTemplateStore(self.index)
+        store.register('已连接', self.labelled, 190, 118, 150, 40)
+        store.save()
+        return store
+
+    def test_covers(self):
+        store = self.store_with_label()
+        self.assertTrue(store.covers('已连接'))
+        # 正则可能匹配没有模板的其他文字, 不能用模板回答
+        self.assertFalse(store.covers([re.compile('连接')]))
+        self.assertFalse(store.covers(['已连接', '工业']))
+        self.assertFalse(store.covers(None))
+
+    def test_match_and_reload(self):
+        self.store_with_label()
+        store = TextTemplateStore(self.index)
+        moved = _label(self.base, 'LINKED', 260, 180)
+        found = store.match(moved, '已连接')
+        self.assertEqual(len(found), 1)
+        self.assertEqual((found[0].x, found[0].y), (250, 148))
+        self.assertEqual(store.match(self.base, '已连接'), [])
+
+    def test_match_every_occurrence(self):
+        store = self.store_with_label()
+        twice = _label(self.labelled, 'LINKED', 500, 400)
+        found = store.match(twice, '已连接')
+        self.assertEqual([(m.x, m.y) for m in found], [(190, 118), (490, 368)])
+
+    def test_shipped_templates(self):
+        store = TextTemplateStore(DEFAULT_TEXT_TEMPLATES)
+        self.assertTrue(store.covers(['运送委托列表']))
+        self.assertTrue(store.covers('仓储节点'))
+        frame = cv2.imread('tests/images/take_delivery_example.png')
+        for size in ((1920, 1080), (2560, 1440), (3840, 2160)):
+            scale = size[1] / frame.shape[0]
+            found = store.match(cv2.resize(frame, size), '运送委托列表')
+            self.assertEqual(len(found), 1, size)
+            self.assertLessEqual(abs(found[0].x - 416 * scale) + abs(found[0].y - 102 * scale), 4 * scale, size)
+        self.assertEqual(store.match(self.base, '运送委托列表'), [])
+
+    def test_match_scaled_frame(self):
+        store = self.store_with_label()
+        h, w = self.base.shape[:2]
+        big = _label(cv2.resize(self.base, (w * 2, h * 2)), 'LINKED', 400, 300, scale=2.0)
+        found = store.match(big, '已连接', 0, 0, w, h)
+        self.assertEqual(len(found), 1)
+        self.assertLessEqual(abs(found[0].x - 380) + abs(found[0].y - 236), 4)
+
+    def test_scaled_template_cached(self):
+        store = self.store_with_label()
+        h, w = self.base.shape[:2]
+        big = cv2.resize(self.labelled, (w * 2, h * 2))
+        store.match(big, '已连接')
+        scaled = dict(store._scaled)
+        store.match(big, '已连接')
+        self.assertEqual(list(store._scaled), [('已连接', 0, h * 2)])
+        self.assertIs(store._scaled[('已连接', 0, h * 2)], scaled[('已连接', 0, h * 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
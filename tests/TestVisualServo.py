@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import cv2
+
+from src.navigation.servo import AxisGain, TrackedTarget, VisualServo, crop_template, track_local
+
+
+class _Camera:
+    """用一张大图模拟镜头: 鼠标移动 (mx, my) 使视野平移 (gain_x * mx, gain_y * my) 像素。"""
+
+    def __init__(self, world, gain_x, gain_y, view=(960, 540)):
+        self.world = world
+        self.gain_x, self.gain_y = gain_x, gain_y
+        self.view_w, self.view_h = view
+        self.cx, self.cy = 600.0, 400.0
+
+    def move(self, mx, my):
+        self.cx += self.gain_x * mx
+        self.cy += self.gain_y * my
+
+    def frame(self):
+        x, y = round(self.cx), round(self.cy)
+        return self.world[y:y + self.view_h, x:x + self.view_w]
+
+    def target_in_view(self, wx, wy, w, h):
+        return TrackedTarget(round(wx - self.cx), round(wy - self.cy), w, h)
+
+
+class TestVisualServo(unittest.TestCase):
+    def setUp(self):
+        self.world = cv2.resize(cv2.imread('tests/images/no_combat.png'), (2560, 1440))
+        # 世界坐标中的目标 (取画面上一块有纹理的区域)
+        self.target = (1300, 700, 60, 40)
+
+    def align(self, gain_x, gain_y, max_time=20):
+        camera = _Camera(self.world, gain_x, gain_y)
+        servo = VisualServo(tolerance=20)
+        center = (camera.view_w / 2, camera.view_h / 2)
+        target = camera.target_in_view(*self.target)
+        template = crop_template(camera.frame(), target)
+        for i in range(max_time):
+            if servo.converged(target.center, center):
+                return i, servo
+            command = servo.command(target.center, center)
+            predicted = servo.predict(target, command)
+            camera.move(*command)
+            tracked = track_local(camera.frame(), template, predicted, servo.search_margin(command, 40))
+            self.assertIsNotNone(tracked)
+            truth = camera.target_in_view(*self.target)
+            self.assertLessEqual(abs(tracked.x - truth.x) + abs(tracked.y - truth.y), 2)
+            servo.observe(target, tracked, command)
+            template = crop_template(camera.frame(), tracked)
+            target = tracked
+        self.fail('not converged')
+
+    def test_converges_with_unknown_gain(self):
+        for gain_x, gain_y in ((0.4, 0.4), (1.0, 1.3), (2.5, 2.0)):
+            frames, servo = self.align(gain_x, gain_y)
+            self.assertLessEqual(frames, 8, (gain_x, gain_y))
+            self.assertAlmostEqual(servo.gain_x.gain, gain_x, delta=gain_x * 0.2)
+
+    def test_gain_ignores_small_or_inconsistent_moves(self):
+        gain = AxisGain(1.0)
+        self.assertFalse(gain.observe(3, -10))
+        self.assertFalse(gain.observe(50, 20))
+        self.assertTrue(gain.observe(50, -100))
+        self.assertAlmostEqual(gain.gain, 2.0)
+
+    def test_command_matches_mouse_steps(self):
+        servo = VisualServo()
+        dx, dy = servo.command((1000, 300), (960, 540))
+        self.assertEqual(dx % servo.mouse_steps, 0)
+        self.assertEqual(dy % servo.mouse_steps, 0)
+        self.assertLessEqual(abs(dy), servo.probe_step)
+
+
+if __name__ == '__main__':
+    unittest.main()
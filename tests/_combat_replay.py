@@ -0,0 +1,267 @@
+"""
+离线战斗回放: 把录制的截图序列 (PNG 目录 / 图片列表 / 视频) 逐帧喂给 AutoCombatTask,
+记录任务发出的全部按键和点击, 统计每秒决策次数、技能条充满后到放技能的延迟以及各检测函数的总耗时。
+
+用法 (也可以在 TaskTestCase 子类中调用 CombatReplayTestCase.replay):
+    python -m unittest tests.TestCombatReplay
+"""
+from __future__ import annotations
+
+import glob
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import cv2
+import numpy as np
+from ok import BaseCaptureMethod, BaseInteraction
+from ok.test.TaskTestCase import TaskTestCase
+
+from src.combat.telemetry import STAGES
+
+# 回放时计入“检测耗时”的阶段 (action / sleep 不算)
+DETECTOR_STAGES = tuple(stage for stage in STAGES if stage not in ('action', 'sleep'))
+SKILL_KEYS = ('1', '2', '3', '4')
+
+
+class ReplayFinished(Exception):
+    """回放帧已全部用完。"""
+
+
+def iter_replay_frames(source):
+    """
+    按顺序产出回放帧。source 可以是 PNG 目录、glob 通配符、视频文件路径或图片路径/ndarray 的列表。
+    图片只在需要时才读取, 视频用 cv2.VideoCapture 顺序解码。
+    """
+    if isinstance(source, (list, tuple)):
+        for item in source:
+            yield item if isinstance(item, np.ndarray) else _read_image(item)
+        return
+
+    path = Path(source)
+    if path.is_dir():
+        for image in sorted(path.glob('*.png')):
+            yield _read_image(image)
+    elif path.is_file() and path.suffix.lower() != '.png':
+        capture = cv2.VideoCapture(str(path))
+        try:
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield frame
+        finally:
+            capture.release()
+    else:
+        for image in sorted(glob.glob(str(source))):
+            yield _read_image(image)
+
+
+def _read_image(path):
+    frame = cv2.imdecode(np.fromfile(str(path), dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError(f'Cannot load image: {path}')
+    return frame
+
+
+class ReplayCaptureMethod(BaseCaptureMethod):
+    """
+    回放截图: 默认每次截图前进一帧 (结果可复现); 指定 fps 时按实际经过的时间跳帧, 模拟游戏实时运行。
+    帧用完后 get_frame 直接抛 ReplayFinished (不经过基类的异常包装), 由回放循环结束任务。
+    served 记录每一帧第一次被截到的时间 (perf_counter) 和帧序号。
+    """
+    name = "Replay capture method"
+    description = "for offline combat replay"
+
+    def __init__(self, exit_event, source, fps: float | None = None):
+        super().__init__()
+        self.exit_event = exit_event
+        self.fps = fps
+        self._frames = iter_replay_frames(source)
+        self.frames: list[np.ndarray] = []
+        self.served: list[tuple[float, int]] = []
+        self.index = -1
+        self.finished = False
+        self._start = None
+
+    def _target_index(self):
+        if self.fps is None or self._start is None:
+            return self.index + 1
+        return max(self.index + 1, int((time.perf_counter() - self._start) * self.fps))
+
+    def _load_until(self, index):
+        while len(self.frames) <= index:
+            frame = next(self._frames, None)
+            if frame is None:
+                return False
+            self.frames.append(frame)
+        return True
+
+    def get_frame(self):
+        if self.finished:
+            raise ReplayFinished()
+        target = self._target_index()
+        if not self._load_until(target):
+            self.finished = True
+            raise ReplayFinished()
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        self.index = target
+        self.served.append((now, target))
+        frame = self.frames[target]
+        self._size = (frame.shape[1], frame.shape[0])
+        return frame
+
+    def get_abs_cords(self, x, y):
+        return x, y
+
+    def connected(self):
+        return True
+
+
+@dataclass
+class RecordedAction:
+    time: float
+    action: str
+    key: str | None
+    frame_index: int
+
+
+class RecordingInteraction(BaseInteraction):
+    """代替 EfInteraction, 不真正发送输入, 只按时间顺序记录按键和点击 (附带当时的回放帧序号)。"""
+
+    def __init__(self, capture: ReplayCaptureMethod):
+        super().__init__(capture)
+        self.actions: list[RecordedAction] = []
+
+    def _record(self, action, key=None):
+        self.actions.append(RecordedAction(time.perf_counter(), action, key, self.capture.index))
+
+    def send_key(self, key, down_time=0.02):
+        self._record('send_key', str(key))
+
+    def send_key_down(self, key):
+        self._record('key_down', str(key))
+
+    def send_key_up(self, key):
+        self._record('key_up', str(key))
+
+    def click(self, x=-1, y=-1, move_back=False, name=None, move=True, down_time=0.05, key="left"):
+        self._record('click', key)
+
+    def move(self, x, y):
+        pass
+
+    def scroll(self, x, y, scroll_amount):
+        self._record('scroll')
+
+
+@dataclass
+class ReplayReport:
+    frames: int
+    duration: float
+    decisions: int
+    actions: list[RecordedAction]
+    cast_latencies: list[float]
+    stage_totals: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def decisions_per_second(self) -> float:
+        return self.decisions / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def detector_time(self) -> float:
+        return sum(self.stage_totals.get(stage, 0.0) for stage in DETECTOR_STAGES)
+
+    @property
+    def skill_casts(self) -> list[RecordedAction]:
+        return [a for a in self.actions if a.action in ('send_key', 'key_down') and a.key in SKILL_KEYS]
+
+    @property
+    def casts_per_minute(self) -> float:
+        return len(self.skill_casts) * 60 / self.duration if self.duration > 0 else 0.0
+
+    def summary(self) -> str:
+        latency = 'n/a'
+        if self.cast_latencies:
+            latency = f'{np.mean(self.cast_latencies) * 1000:.1f}ms avg / {max(self.cast_latencies) * 1000:.1f}ms max'
+        stages = ', '.join(f'{stage} {self.stage_totals[stage] * 1000:.1f}ms' for stage in DETECTOR_STAGES
+                           if self.stage_totals.get(stage))
+        return (f'frames {self.frames}, {self.duration:.2f}s, decisions {self.decisions} '
+                f'({self.decisions_per_second:.1f}/s), actions {len(self.actions)}, '
+                f'skill casts {len(self.skill_casts)} ({self.casts_per_minute:.1f}/min), cast latency {latency}, '
+                f'detector {self.detector_time * 1000:.1f}ms [{stages}]')
+
+
+def cast_latencies(served, bar_counts, actions, trigger_count) -> list[float]:
+    """
+    技能条充满 (某帧的技能点数从 < trigger_count 变为 >= trigger_count) 后,
+    到下一次技能键 (1-4) 被按下的时间。served 为 [(时间, 帧序号)], bar_counts 为每帧的真实技能点数。
+    """
+    casts = [a.time for a in actions if a.action in ('send_key', 'key_down') and a.key in SKILL_KEYS]
+    latencies = []
+    previous = None
+    for served_time, index in served:
+        count = bar_counts[index]
+        if count == previous:
+            continue
+        if count >= trigger_count and (previous is None or previous < trigger_count):
+            cast = next((t for t in casts if t >= served_time), None)
+            if cast is not None:
+                latencies.append(cast - served_time)
+        previous = count
+    return latencies
+
+
+class CombatReplayTestCase(TaskTestCase):
+    """在 TaskTestCase 的基础上临时替换截图和输入, 在测试线程里直接驱动 AutoCombatTask.run。"""
+
+    def replay(self, source, fps: float | None = None, timeout: float = 60) -> ReplayReport:
+        from ok.test import ok
+        device_manager = ok.device_manager
+        original = device_manager.capture_method, device_manager.interaction
+        capture = ReplayCaptureMethod(original[0].exit_event, source, fps=fps)
+        interaction = RecordingInteraction(capture)
+        task = self.task
+        telemetry_before = task.config.get('战斗耗时统计')
+        telemetry_folder = task.telemetry_folder
+        rows = []
+        start = time.perf_counter()
+        device_manager.capture_method, device_manager.interaction = capture, interaction
+        task.config['战斗耗时统计'] = True
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                task.telemetry_folder = Path(folder)
+                while time.perf_counter() - start < timeout:
+                    try:
+                        task.next_frame()
+                        task.run()
+                    except ReplayFinished:
+                        break
+                    finally:
+                        rows.extend(task.telemetry.rows)
+                        task.telemetry.reset()
+        finally:
+            duration = time.perf_counter() - start
+            device_manager.capture_method, device_manager.interaction = original
+            task.config['战斗耗时统计'] = telemetry_before
+            task.telemetry_folder = telemetry_folder
+            task.next_frame()
+
+        stage_totals = {}
+        for row in rows:
+            for stage, value in row.items():
+                if stage != 'time':
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + value
+        bar_counts = [task.detect_skill_bar_count(frame) for frame in capture.frames]
+        trigger = task.config.get('启动技能点数', 2)
+        return ReplayReport(
+            frames=len(capture.served),
+            duration=duration,
+            decisions=len(rows),
+            actions=interaction.actions,
+            cast_latencies=cast_latencies(capture.served, bar_counts, interaction.actions, trigger),
+            stage_totals=stage_totals,
+        )
@@ -0,0 +1,65 @@
+"""
+旧版技能条检测 (向量化之前 AutoCombatTask 中的实现) 的冻结副本, 只作为测试里的对照基准。
+不要修改这里的逻辑, 否则对比测试就失去意义。
+"""
+import cv2
+import numpy as np
+
+
+def check_is_pure_color_in_4k(task, x1, y1, x2, y2, color_range=None, threshold=0.9):
+    skill_area_box = task.box_of_screen_scaled(3840, 2160, x1, y1, x2, y2)
+    bar = skill_area_box.crop_frame(task.frame)
+
+    if bar.size == 0:
+        return False
+
+    height, width, _ = bar.shape
+    consecutive_matches = 0
+
+    for i in range(height):
+        row_pixels = bar[i]
+        unique_colors, counts = np.unique(row_pixels, axis=0, return_counts=True)
+        most_frequent_index = np.argmax(counts)
+        dominant_count = counts[most_frequent_index]
+        dominant_color = unique_colors[most_frequent_index]
+
+        is_valid_row = (dominant_count / width) >= threshold
+
+        if is_valid_row and color_range:
+            b, g, r = dominant_color
+            if not (color_range['r'][0] <= r <= color_range['r'][1] and
+                    color_range['g'][0] <= g <= color_range['g'][1] and
+                    color_range['b'][0] <= b <= color_range['b'][1]):
+                is_valid_row = False
+
+        if is_valid_row:
+            consecutive_matches += 1
+            if consecutive_matches >= 2:
+                return True
+        else:
+            consecutive_matches = 0
+
+    return False
+
+
+def has_rectangles(frame):
+    if frame is None:
+        return False
+
+    original_h, original_w = frame.shape[:2]
+    scale_factor = 4
+    resized = cv2.resize(frame, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_CUBIC)
+    gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 100)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+    closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_width = (original_w * scale_factor) * 0.25
+
+    for cnt in contours:
+        x, y, w, h = cv2.boundingRect(cnt)
+        if w > min_width and w > h and h > 10:
+            return True
+
+    return False